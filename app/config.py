@@ -4,3 +4,24 @@ from decouple import config
 
 DEBUG: Final[bool] = config("DEBUG", default=False, cast=bool)
 DATABASE_URL: Final[str] = config("DATABASE_URL", default="sqlite:///db.sqlite3")
+READONLY_DATABASE_URL: Final[str] = config("READONLY_DATABASE_URL", default=DATABASE_URL)
+
+SQLITE_JOURNAL_MODE: Final[str] = config("SQLITE_JOURNAL_MODE", default="WAL")
+SQLITE_SYNCHRONOUS: Final[str] = config("SQLITE_SYNCHRONOUS", default="NORMAL")
+SQLITE_CACHE_SIZE: Final[int] = config("SQLITE_CACHE_SIZE", default=-64000, cast=int)
+SQLITE_MMAP_SIZE: Final[int] = config("SQLITE_MMAP_SIZE", default=256 * 1024 * 1024, cast=int)
+
+DATABASE_POOL_SIZE: Final[int] = config("DATABASE_POOL_SIZE", default=5, cast=int)
+DATABASE_MAX_OVERFLOW: Final[int] = config("DATABASE_MAX_OVERFLOW", default=10, cast=int)
+DATABASE_POOL_RECYCLE: Final[int] = config("DATABASE_POOL_RECYCLE", default=1800, cast=int)
+
+CHANGE_POLL_INTERVAL: Final[int] = config("CHANGE_POLL_INTERVAL", default=2000, cast=int)
+CHANGE_LOG_RETENTION_DAYS: Final[int] = config("CHANGE_LOG_RETENTION_DAYS", default=7, cast=int)
+CHANGE_LOG_PRUNE_INTERVAL: Final[int] = config("CHANGE_LOG_PRUNE_INTERVAL", default=60 * 60 * 1000, cast=int)
+
+SCHEDULE_HORIZON_WEEKS: Final[int] = config("SCHEDULE_HORIZON_WEEKS", default=12, cast=int)
+
+UI_CACHE_DIR: Final[str] = config("UI_CACHE_DIR", default="app/ui/__uicache__")
+PROFILE_STARTUP: Final[bool] = config("PROFILE_STARTUP", default=False, cast=bool)
+PROFILE_SQL: Final[bool] = config("PROFILE_SQL", default=False, cast=bool)
+PROFILE_SQL_TRACE: Final[str] = config("PROFILE_SQL_TRACE", default="")
@@ -1,8 +1,141 @@
-from typing import Final
+import warnings
+from typing import Dict, Final
 
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.pool import StaticPool
 from sqlmodel import create_engine
 from sqlalchemy.future.engine import Engine
 
-from app.config import DEBUG, DATABASE_URL
+from app.config import (
+    DEBUG,
+    DATABASE_URL,
+    READONLY_DATABASE_URL,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+    DATABASE_POOL_SIZE,
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_RECYCLE,
+)
 
-ENGINE: Final[Engine] = create_engine(DATABASE_URL, echo=DEBUG)
+_READ_ONLY_SESSIONS: Final[Dict[str, str]] = {
+    "postgresql": "SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY",
+    "mysql": "SET SESSION TRANSACTION READ ONLY",
+    "mariadb": "SET SESSION TRANSACTION READ ONLY",
+}
+"""Statements making the transactions of a connection read-only, by backend."""
+
+FOREIGN_KEYS_CHECKED: Final[int] = 1
+"""The SQLite `user_version` of a database whose foreign keys are enforced."""
+
+
+def make_engine(url: str, read_only: bool = False) -> Engine:
+    """
+    Creates an engine tuned for the database backend of the URL.
+
+    SQLite connections get the pragmas from `app.config` applied on connect,
+    and enforce foreign keys once `enable_foreign_keys` found none violated;
+    an in-memory database lives in a single connection shared by all
+    threads. Server databases get a sized connection pool with pre-ping.
+
+    Read-only connections use `PRAGMA query_only` on SQLite and read-only
+    sessions on PostgreSQL and MySQL. Other backends have no read-only mode,
+    so a warning is issued and their connections accept writes.
+
+    Args:
+        url (str): The database URL.
+        read_only (bool): Whether the connections must reject writes.
+
+    Returns:
+        Engine: The configured engine.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        engine = create_engine(
+            url,
+            echo=DEBUG,
+            pool_size=DATABASE_POOL_SIZE,
+            max_overflow=DATABASE_MAX_OVERFLOW,
+            pool_recycle=DATABASE_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+        if not read_only:
+            return engine
+        statement = _READ_ONLY_SESSIONS.get(parsed.get_backend_name())
+        if statement is None:
+            warnings.warn(
+                f"{parsed.get_backend_name()} has no read-only mode, the connections accept writes",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            return engine
+
+        @event.listens_for(engine, "connect")
+        def set_read_only(connection, _) -> None:
+            # Committed, so the pool's rollback on return does not undo it.
+            cursor = connection.cursor()
+            cursor.execute(statement)
+            cursor.close()
+            connection.commit()
+
+        return engine
+
+    if parsed.database in (None, "", ":memory:"):
+        engine = create_engine(
+            url, echo=DEBUG, poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+    else:
+        engine = create_engine(url, echo=DEBUG)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(connection, _) -> None:
+        cursor = connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        if cursor.execute("PRAGMA user_version").fetchone()[0] >= FOREIGN_KEYS_CHECKED:
+            cursor.execute("PRAGMA foreign_keys = ON")
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+    return engine
+
+
+def enable_foreign_keys(connection: Connection) -> bool:
+    """
+    Makes SQLite enforce the foreign keys of the database if no row violates them.
+
+    Databases written while foreign keys were not enforced may hold rows
+    referencing deleted ones, and enforcing them would fail later unrelated
+    writes. Such databases keep foreign keys off with a warning naming the
+    tables to repair, and this can be run again once they are. Connections
+    opened afterwards enforce the foreign keys.
+
+    Args:
+        connection (Connection): The connection to check and mark the database with.
+
+    Returns:
+        bool: Whether the foreign keys are enforced.
+    """
+    if connection.dialect.name != "sqlite":
+        return True
+    violations = connection.exec_driver_sql("PRAGMA foreign_key_check").all()
+    if violations:
+        tables = sorted({row[0] for row in violations})
+        warnings.warn(
+            f"Foreign keys are not enforced, {len(violations)} rows reference missing rows in: {', '.join(tables)}",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return False
+    connection.exec_driver_sql(f"PRAGMA user_version = {FOREIGN_KEYS_CHECKED}")
+    return True
+
+
+ENGINE: Final[Engine] = make_engine(DATABASE_URL)
+READONLY_ENGINE: Final[Engine] = make_engine(READONLY_DATABASE_URL, read_only=True)
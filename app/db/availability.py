@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import List, Set
+
+from sqlalchemy import ColumnElement, Select
+from sqlmodel import Session, select, and_, exists
+
+from app.db.models import Area, AreaReservationLink, Location, Reservation
+
+__all__ = ["overlaps", "free_locations", "busy_area_ids"]
+
+
+def overlaps(start_at: datetime, end_at: datetime) -> ColumnElement[bool]:
+    """
+    Builds a predicate matching reservations that intersect the half-open period.
+
+    Args:
+        start_at (datetime): The start of the requested period.
+        end_at (datetime): The end of the requested period.
+
+    Returns:
+        ColumnElement[bool]: The SQL condition on the `Reservation` table.
+    """
+    return and_(Reservation.start_at < end_at, Reservation.end_at > start_at)
+
+
+def _whole_location_reservations(start_at: datetime, end_at: datetime) -> Select:
+    # A reservation without linked areas occupies the whole location.
+    return select(Reservation.location_id).where(
+        Reservation.location_id.is_not(None),
+        overlaps(start_at, end_at),
+        ~exists().where(AreaReservationLink.reservation_id == Reservation.id),
+    )
+
+
+def _reserved_areas(start_at: datetime, end_at: datetime) -> Select:
+    return (
+        select(AreaReservationLink.area_id)
+        .join(Reservation, AreaReservationLink.reservation_id == Reservation.id)
+        .where(overlaps(start_at, end_at))
+    )
+
+
+def free_locations(session: Session, start_at: datetime, end_at: datetime) -> List[Location]:
+    """
+    Finds locations that can be reserved in [start_at, end_at) with a single query.
+
+    A location is free when it is not reserved as a whole during the period and
+    either has no areas or has at least one area without overlapping reservations.
+
+    Args:
+        session (Session): The session to run the query in.
+        start_at (datetime): The start of the requested period.
+        end_at (datetime): The end of the requested period.
+
+    Returns:
+        List[Location]: The free locations ordered by name.
+    """
+    areas = select(Area.location_id).where(Area.location_id.is_not(None))
+    free_areas = areas.where(Area.id.not_in(_reserved_areas(start_at, end_at)))
+    statement = (
+        select(Location)
+        .where(
+            Location.id.not_in(_whole_location_reservations(start_at, end_at)),
+            Location.id.not_in(areas) | Location.id.in_(free_areas),
+        )
+        .order_by(Location.name)
+    )
+    return session.exec(statement).all()
+
+
+def busy_area_ids(
+    session: Session, location_id: int, start_at: datetime, end_at: datetime
+) -> Set[int]:
+    """
+    Finds areas of the location that cannot be reserved in [start_at, end_at).
+
+    Args:
+        session (Session): The session to run the query in.
+        location_id (int): The unique identifier of the location.
+        start_at (datetime): The start of the requested period.
+        end_at (datetime): The end of the requested period.
+
+    Returns:
+        Set[int]: The unique identifiers of the busy areas.
+    """
+    statement = select(Area.id).where(
+        Area.location_id == location_id,
+        Area.id.in_(_reserved_areas(start_at, end_at))
+        | Area.location_id.in_(_whole_location_reservations(start_at, end_at)),
+    )
+    return set(session.exec(statement).all())
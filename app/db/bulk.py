@@ -0,0 +1,112 @@
+from typing import Any, Iterable, Iterator, List, Sequence, Type
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import RelationshipDirection
+from sqlmodel import Session, SQLModel, select, delete, update
+
+from app.db import changes, conflicts
+from app.db.models import Reservation
+
+__all__ = ["CHUNK_SIZE", "chunked", "delete_by_ids", "update_by_ids"]
+
+CHUNK_SIZE = 500
+"""The number of bound identifiers per statement, well below SQLite's parameter limit."""
+
+
+def chunked(ids: Iterable[int], size: int = CHUNK_SIZE) -> Iterator[List[int]]:
+    """
+    Splits identifiers into lists of at most `size` elements.
+
+    Args:
+        ids (Iterable[int]): The identifiers to split.
+        size (int): The maximum length of a chunk.
+
+    Yields:
+        List[int]: The next chunk of identifiers.
+    """
+    chunk: List[int] = []
+    for id in ids:
+        chunk.append(id)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def delete_by_ids(session: Session, model: Type[SQLModel], ids: Sequence[int]) -> None:
+    """
+    Deletes rows by primary key with set-based statements.
+
+    Relationships declared on the model are honoured the same way the ORM would
+    handle `session.delete`: association rows are removed, children of
+    relationships with the `delete` cascade are deleted recursively and the
+    foreign keys of other children are set to NULL.
+
+    Args:
+        session (Session): The session to run the statements in.
+        model (Type[SQLModel]): The model class of the rows.
+        ids (Sequence[int]): The unique identifiers of the rows to delete.
+    """
+    for chunk in chunked(ids):
+        _delete_chunk(session, model, chunk)
+
+
+def _delete_chunk(session: Session, model: Type[SQLModel], ids: List[int]) -> None:
+    for relationship in inspect(model).relationships:
+        if relationship.secondary is not None:
+            (_, column), = relationship.synchronize_pairs
+            session.exec(delete(relationship.secondary).where(column.in_(ids)))
+            continue
+
+        if relationship.direction != RelationshipDirection.ONETOMANY:
+            continue
+
+        child = relationship.mapper.class_
+        (_, column), = relationship.synchronize_pairs
+        child_ids = session.exec(select(child.id).where(column.in_(ids))).all()
+        if relationship.cascade.delete:
+            delete_by_ids(session, child, child_ids)
+        elif child_ids:
+            session.exec(
+                update(child)
+                .where(column.in_(ids))
+                .values({column.key: None})
+                .execution_options(synchronize_session=False)
+            )
+            changes.record(session, child, updated=child_ids)
+
+    session.exec(
+        delete(model)
+        .where(model.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    changes.record(session, model, deleted=ids)
+
+
+def update_by_ids(session: Session, model: Type[SQLModel], ids: Sequence[int], **values: Any) -> None:
+    """
+    Assigns the same column values to rows selected by primary key.
+
+    The statements bypass the flush, so reservations moved to another
+    location or period are checked for overlaps here.
+
+    Args:
+        session (Session): The session to run the statements in.
+        model (Type[SQLModel]): The model class of the rows.
+        ids (Sequence[int]): The unique identifiers of the rows to update.
+        **values (Any): The new column values by attribute name.
+
+    Raises:
+        ReservationConflict: If a moved reservation overlaps another one.
+    """
+    for chunk in chunked(ids):
+        session.exec(
+            update(model)
+            .where(model.id.in_(chunk))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        changes.record(session, model, updated=chunk)
+    if model is Reservation and conflicts.PERIOD_COLUMNS & values.keys():
+        conflicts.check(session, set(ids))
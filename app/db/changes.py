@@ -0,0 +1,316 @@
+"""
+Changes committed to the database.
+
+Every transaction collects the rows it inserts, updates and deletes. On
+commit they are handed to the subscribers of this process, and they are
+written to the `ChangeLog` table in the same transaction, so other clients
+sharing the database can read them with a `ChangeFeed`. On PostgreSQL the
+commit also sends a `NOTIFY` on the channel `CHANNEL`.
+
+A transaction changing more than `LOG_ROWS_LIMIT` rows of a table, e.g. a
+bulk delete with its cascades, logs the table once as changed as a whole,
+and other clients reload what they show of it.
+"""
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Final, Iterable, List, NamedTuple, Set, Type
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, Integer, String, Table, delete, event, func, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.db.models import BaseModel
+
+__all__ = [
+    "CLIENT_ID",
+    "CHANNEL",
+    "LOG_ROWS_LIMIT",
+    "ModelChanges",
+    "Changes",
+    "ChangeLog",
+    "ChangeFeed",
+    "create_change_log",
+    "record",
+    "merge",
+    "publish",
+    "subscribe",
+    "latest_version",
+    "prune",
+]
+
+CLIENT_ID: Final[str] = uuid4().hex
+"""Identifies this process in the change log, so it does not read its own changes back."""
+
+CHANNEL: Final[str] = "ChangeLog"
+"""The PostgreSQL notification channel announcing new change log entries."""
+
+LOG_ROWS_LIMIT: Final[int] = 256
+"""The most rows of a table a transaction logs one by one."""
+
+_TABLE_CHANGED = "table"
+
+ChangeLog = Table(
+    "ChangeLog",
+    BaseModel.metadata,
+    Column("version", Integer, primary_key=True, autoincrement=True),
+    Column("table", String(64), nullable=False),
+    Column("row_id", Integer, nullable=False),
+    Column("kind", String(8), nullable=False),
+    Column("client", String(32), nullable=False),
+    Column("created_at", DateTime, nullable=False, default=datetime.now, index=True),
+    # Versions of pruned entries must never be reused.
+    sqlite_autoincrement=True,
+)
+
+
+class ModelChanges(NamedTuple):
+    """
+    The identifiers of the rows of one model changed by a transaction.
+
+    `whole` is set when another client changed too many rows to list them,
+    see `LOG_ROWS_LIMIT`; any row of the table may have changed then.
+    """
+
+    inserted: Set[int]
+    updated: Set[int]
+    deleted: Set[int]
+    whole: bool = False
+
+    @property
+    def ids(self) -> Set[int]:
+        return self.inserted | self.updated | self.deleted
+
+
+Changes = Dict[Type[BaseModel], ModelChanges]
+
+_listeners: List[Callable[[Changes], None]] = []
+_models: Dict[str, Type[BaseModel]] = {}
+
+
+def _model_of(table: str) -> Type[BaseModel] | None:
+    if not _models:
+        _models.update(
+            (mapper.local_table.name, mapper.class_)
+            for mapper in BaseModel._sa_registry.mappers
+            if issubclass(mapper.class_, BaseModel)
+        )
+    return _models.get(table)
+
+
+def _pending(session: Session) -> Changes:
+    return session.info.setdefault("changes", {})
+
+
+def record(
+    session: Session,
+    model: Type[BaseModel],
+    inserted: Iterable[int] = (),
+    updated: Iterable[int] = (),
+    deleted: Iterable[int] = (),
+) -> None:
+    """
+    Remembers rows changed by the session's transaction and logs them.
+
+    Objects flushed by the session are recorded automatically; bulk statements
+    that bypass the unit of work record the rows they change with this function.
+
+    Args:
+        session (Session): The session running the transaction.
+        model (Type[BaseModel]): The model class of the rows.
+        inserted (Iterable[int]): The identifiers of new rows.
+        updated (Iterable[int]): The identifiers of changed rows.
+        deleted (Iterable[int]): The identifiers of deleted rows.
+    """
+    changes = ModelChanges(set(inserted), set(updated), set(deleted))
+    pending = _pending(session)
+    merge(pending, {model: changes})
+
+    table = model.__table__.name
+    logged: Set[str] = session.info.setdefault("logged_tables", set())
+    if table in logged:
+        return
+    if len(pending[model].ids) > LOG_ROWS_LIMIT:
+        # Entries already logged for the table stay; readers reload it anyway.
+        logged.add(table)
+        entries = [{"table": table, "row_id": 0, "kind": _TABLE_CHANGED, "client": CLIENT_ID}]
+    else:
+        entries = [
+            {"table": table, "row_id": id, "kind": kind, "client": CLIENT_ID}
+            for kind, ids in changes._asdict().items()
+            if kind != "whole"
+            for id in ids
+        ]
+    if not entries:
+        return
+    connection = session.connection()
+    connection.execute(insert(ChangeLog), entries)
+    if connection.dialect.name == "postgresql" and not session.info.get("notified"):
+        # Notifications are delivered on commit and dropped on rollback.
+        connection.execute(text(f'NOTIFY "{CHANNEL}"'))
+        session.info["notified"] = True
+
+
+def merge(changes: Changes, other: Changes) -> None:
+    """
+    Adds the changes of another transaction to a set of changes.
+
+    Args:
+        changes (Changes): The changes to extend in place.
+        other (Changes): The changes to add.
+    """
+    for model, model_changes in other.items():
+        target = changes.setdefault(model, ModelChanges(set(), set(), set()))
+        target.inserted.update(model_changes.inserted)
+        target.updated.update(model_changes.updated)
+        target.deleted.update(model_changes.deleted)
+        if model_changes.whole and not target.whole:
+            changes[model] = target._replace(whole=True)
+
+
+def publish(changes: Changes) -> None:
+    """
+    Hands committed changes to the subscribers.
+
+    Called after every commit of this process and with the changes of
+    other clients read from the change log.
+
+    Args:
+        changes (Changes): The committed changes.
+    """
+    for listener in _listeners:
+        listener(changes)
+
+
+def subscribe(listener: Callable[[Changes], None]) -> None:
+    """
+    Registers a function called with the changes of every committed transaction.
+
+    The function is called in the thread that committed, right after the commit.
+
+    Args:
+        listener (Callable[[Changes], None]): The function to call.
+    """
+    _listeners.append(listener)
+
+
+def create_change_log(connection: Connection) -> None:
+    """
+    Creates the `ChangeLog` table and its indexes if they are missing.
+
+    The table is created by `create_all` only when this module was imported
+    before it ran, so databases created without it get it from this migration.
+
+    Args:
+        connection (Connection): The connection to run the DDL in.
+    """
+    ChangeLog.create(connection, checkfirst=True)
+    for index in ChangeLog.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def latest_version(session: Session) -> int:
+    """
+    Returns the version of the newest change log entry.
+
+    Args:
+        session (Session): The session to query with.
+
+    Returns:
+        int: The version, 0 if the log is empty.
+    """
+    return session.execute(select(func.max(ChangeLog.c.version))).scalar() or 0
+
+
+def prune(connection: Connection, days: int) -> None:
+    """
+    Deletes change log entries older than the given number of days.
+
+    Args:
+        connection (Connection): The connection to delete with.
+        days (int): How long entries are kept.
+    """
+    connection.execute(delete(ChangeLog).where(ChangeLog.c.created_at < datetime.now() - timedelta(days=days)))
+
+
+class ChangeFeed:
+    """
+    Reads the changes other clients committed since the previous read.
+
+    On a server database versions are allocated when a row is inserted, not
+    when it is committed, so a slow transaction can commit a version lower
+    than one already read. For such databases pass a `window`: the feed then
+    rereads that many versions before the newest one and skips the entries
+    it has already returned. SQLite serializes writers, so it needs none.
+
+    Args:
+        version (int): The version the caller's data is up to date with.
+        window (int): How many already read versions to read again.
+    """
+
+    def __init__(self, version: int, window: int = 0) -> None:
+        self._start = version
+        self._window = window
+        self.version = version
+        self._seen: Set[int] = set()
+
+    def read(self, session: Session) -> Changes:
+        """
+        Reads the new entries of the change log.
+
+        Args:
+            session (Session): The session to query with.
+
+        Returns:
+            Changes: The changes of other clients, empty if there are none.
+        """
+        floor = max(self.version - self._window, self._start)
+        entries = session.execute(
+            select(ChangeLog.c.version, ChangeLog.c.table, ChangeLog.c.row_id, ChangeLog.c.kind, ChangeLog.c.client)
+            .where(ChangeLog.c.version > floor)
+            .order_by(ChangeLog.c.version)
+        ).all()
+
+        changes: Changes = {}
+        for version, table, row_id, kind, client in entries:
+            if version in self._seen:
+                continue
+            self._seen.add(version)
+            model = _model_of(table)
+            if client == CLIENT_ID or model is None:
+                continue
+            if kind == _TABLE_CHANGED:
+                merge(changes, {model: ModelChanges(set(), set(), set(), whole=True)})
+            else:
+                merge(changes, {model: ModelChanges(set(), set(), set())._replace(**{kind: {row_id}})})
+
+        if entries:
+            self.version = max(self.version, entries[-1].version)
+        self._seen = {version for version in self._seen if version > self.version - self._window}
+        return changes
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session: Session, _) -> None:
+    flushed: Dict[Type[BaseModel], Dict[str, List[int]]] = {}
+    for objects, kind in ((session.new, "inserted"), (session.dirty, "updated"), (session.deleted, "deleted")):
+        for obj in objects:
+            if isinstance(obj, BaseModel):
+                flushed.setdefault(type(obj), {}).setdefault(kind, []).append(obj.id)
+    for model, ids in flushed.items():
+        record(session, model, **ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session: Session) -> None:
+    committed = session.info.pop("changes", None)
+    if committed:
+        publish(committed)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _on_transaction_end(session: Session, transaction: SessionTransaction) -> None:
+    # Changes of a rolled back or abandoned transaction are never published.
+    if transaction.parent is None:
+        session.info.pop("changes", None)
+        session.info.pop("notified", None)
+        session.info.pop("logged_tables", None)
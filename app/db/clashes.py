@@ -0,0 +1,299 @@
+"""
+Finds clashes between the weekly schedules of clubs and with reservations.
+
+Every `DaySchedule` is expanded into its weekly occurrences from the later
+of the club's start and the start of the horizon. The occurrences are
+grouped by location and by teacher, the reservations of the locations are
+added to the location groups, and each group is swept in order of start
+with a heap of the occurrences still running: every occurrence clashes
+with exactly the ones left on the heap, so n occurrences with k clashes
+take O((n + k) log n). Clashes repeating every week are reported once,
+with the first occurrence and their number within the horizon.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from enum import Enum, auto
+from heapq import heappop, heappush
+from typing import Dict, Hashable, Iterable, Iterator, List, NamedTuple, Tuple, TypeVar
+
+from sqlalchemy import or_, select
+from sqlmodel import Session
+
+from app.config import SCHEDULE_HORIZON_WEEKS
+from app.db.conflicts import overlapping
+from app.db.models import Club, DaySchedule, Event, Location, Reservation, Teacher
+
+__all__ = ["ClashKind", "Clash", "sweep", "schedule_clashes", "describe"]
+
+T = TypeVar("T")
+
+
+class ClashKind(Enum):
+    LOCATION = auto()
+    TEACHER = auto()
+
+
+class Clash(NamedTuple):
+    """
+    Occurrences of a club day overlapping another club day or a reservation.
+
+    Attributes:
+        kind (ClashKind): Whether the location or the teacher is shared.
+        club_id (int): The unique identifier of the club.
+        club (str): The title of the club.
+        day_id (int | None): The unique identifier of the club day, None if it is not saved yet.
+        other_club_id (int | None): The other club, None for a reservation.
+        reservation_id (int | None): The reservation, None for another club.
+        other (str): The title of the other club or of the event of the reservation.
+        place (str): The name of the shared location or teacher.
+        start_at (datetime): The start of the first clashing occurrence of the club day.
+        end_at (datetime): The end of the first clashing occurrence of the club day.
+        count (int): The number of clashing occurrences within the horizon.
+    """
+
+    kind: ClashKind
+    club_id: int
+    club: str
+    day_id: int | None
+    other_club_id: int | None
+    reservation_id: int | None
+    other: str
+    place: str
+    start_at: datetime
+    end_at: datetime
+    count: int
+
+
+class _ClubDay(NamedTuple):
+    club_id: int
+    club: str
+    day_id: int | None
+    weekday: int
+    start_at: time
+    end_at: time
+    location_id: int | None
+    location: str | None
+    teacher_id: int | None
+    teacher: str | None
+
+
+class _Booking(NamedTuple):
+    # An occurrence of a club day, or a reservation when `day` is None.
+    day: _ClubDay | None
+    reservation_id: int | None
+    title: str
+    start_at: datetime
+    end_at: datetime
+
+
+def sweep(intervals: Iterable[Tuple[Hashable, datetime, datetime, T]]) -> Iterator[Tuple[T, T]]:
+    """
+    Finds the overlapping pairs of intervals with equal keys.
+
+    Args:
+        intervals (Iterable[Tuple[Hashable, datetime, datetime, T]]): The sortable keys,
+            starts, ends and payloads of the half-open intervals.
+
+    Yields:
+        Tuple[T, T]: The payloads of an overlapping pair, the earlier started first.
+    """
+    # The heap holds the running intervals by end; the position breaks ties between equal ends.
+    active: List[Tuple[datetime, int, T]] = []
+    current = None
+    ordered = sorted(enumerate(intervals), key=lambda item: (item[1][0], item[1][1]))
+    for index, (key, start_at, end_at, payload) in ordered:
+        if key != current:
+            active, current = [], key
+        while active and active[0][0] <= start_at:
+            heappop(active)
+        for _, _, other in active:
+            yield other, payload
+        heappush(active, (end_at, index, payload))
+
+
+def _occurrences(day: _ClubDay, since: date, until: date) -> Iterator[_Booking]:
+    if day.end_at <= day.start_at:
+        return
+    current = since + timedelta(days=(day.weekday - since.isoweekday()) % 7)
+    while current < until:
+        yield _Booking(
+            day, None, day.club, datetime.combine(current, day.start_at), datetime.combine(current, day.end_at)
+        )
+        current += timedelta(days=7)
+
+
+def _club_days(session: Session, until: date, club: Club | None) -> Iterator[Tuple[_ClubDay, date]]:
+    statement = (
+        select(
+            Club.id,
+            Club.title,
+            DaySchedule.id,
+            DaySchedule.weekday,
+            DaySchedule.start_at,
+            DaySchedule.end_at,
+            Club.location_id,
+            Location.name,
+            Club.teacher_id,
+            Teacher.name,
+            Club.start_at,
+        )
+        .join(DaySchedule, DaySchedule.club_id == Club.id)
+        .outerjoin(Location, Club.location_id == Location.id)
+        .outerjoin(Teacher, Club.teacher_id == Teacher.id)
+        .where(Club.start_at < until)
+    )
+    if club is not None:
+        location = session.get(Location, club.location_id) if club.location_id else None
+        teacher = session.get(Teacher, club.teacher_id) if club.teacher_id else None
+        for schedule in club.days:
+            day = _ClubDay(
+                club.id or 0,
+                club.title,
+                schedule.id,
+                schedule.weekday.value,
+                schedule.start_at,
+                schedule.end_at,
+                club.location_id,
+                location and location.name,
+                club.teacher_id,
+                teacher and teacher.name,
+            )
+            yield day, club.start_at
+
+        # Only the clubs sharing the location or the teacher can clash with the edited one.
+        shared = [column == id for column, id in ((Club.location_id, club.location_id), (Club.teacher_id, club.teacher_id)) if id]
+        if not shared:
+            return
+        statement = statement.where(or_(*shared))
+        if club.id is not None:
+            statement = statement.where(Club.id != club.id)
+
+    for *columns, start_at in session.execute(statement):
+        columns[3] = columns[3].value
+        yield _ClubDay(*columns), start_at
+
+
+def _reservations(
+    session: Session, since: date, until: date, location_ids: Iterable[int], club: Club | None
+) -> Iterator[Tuple[int, _Booking]]:
+    if club is not None and club.location_id is None:
+        return
+    statement = (
+        overlapping(
+            session.connection(),
+            datetime.combine(since, time.min),
+            datetime.combine(until, time.min),
+            None if club is None else club.location_id,
+        )
+        .add_columns(Event.title)
+        .outerjoin(Event, Event.id == Reservation.event_id)
+    )
+    location_ids = set(location_ids)
+    for id, location_id, start_at, end_at, title in session.execute(statement):
+        if location_id in location_ids:
+            yield location_id, _Booking(None, id, title or "", start_at, end_at)
+
+
+def _other(booking: _Booking) -> Hashable:
+    return (booking.day.club_id, booking.day.day_id, booking.day.weekday) if booking.day else booking.reservation_id
+
+
+def schedule_clashes(
+    session: Session,
+    since: date | None = None,
+    weeks: int = SCHEDULE_HORIZON_WEEKS,
+    club: Club | None = None,
+) -> List[Clash]:
+    """
+    Finds the clashes of club schedules within a horizon.
+
+    Club days clash when they overlap another club day in the same location
+    or with the same teacher, or a reservation of the location.
+
+    Args:
+        session (Session): The session to run the queries in.
+        since (date | None): The first day of the horizon, None for today.
+        weeks (int): The length of the horizon.
+        club (Club | None): A club being edited, possibly unsaved; only its clashes are reported,
+            with its days and attributes taken from the object instead of the database.
+
+    Returns:
+        List[Clash]: The clashes ordered by their first occurrence.
+    """
+    since = since or date.today()
+    if club is not None:
+        since = max(since, club.start_at)
+    until = since + timedelta(weeks=weeks)
+
+    intervals: Dict[ClashKind, List[Tuple[int, datetime, datetime, _Booking]]] = {kind: [] for kind in ClashKind}
+    location_ids = set()
+    for day, start_at in _club_days(session, until, club):
+        for booking in _occurrences(day, max(since, start_at), until):
+            if day.location_id is not None:
+                intervals[ClashKind.LOCATION].append((day.location_id, booking.start_at, booking.end_at, booking))
+            if day.teacher_id is not None:
+                intervals[ClashKind.TEACHER].append((day.teacher_id, booking.start_at, booking.end_at, booking))
+        if day.location_id is not None:
+            location_ids.add(day.location_id)
+    for location_id, booking in _reservations(session, since, until, location_ids, club):
+        intervals[ClashKind.LOCATION].append((location_id, booking.start_at, booking.end_at, booking))
+
+    candidate = None if club is None else club.id or 0
+    clashes = []
+    for kind, group in intervals.items():
+        found: Dict[tuple, List[_Booking]] = {}
+        counts: Dict[tuple, int] = defaultdict(int)
+        for first, second in sweep(group):
+            if first.day is None and second.day is None:
+                continue
+            if first.day is not None and second.day is not None and first.day.club_id == second.day.club_id:
+                continue
+            # The club day is reported first: the edited club's, a club's over a reservation's,
+            # and of two clubs the one with the lower identifier.
+            if (
+                first.day is None
+                or candidate is not None and first.day.club_id != candidate
+                or candidate is None and second.day is not None and first.day.club_id > second.day.club_id
+            ):
+                first, second = second, first
+            if candidate is not None and (first.day is None or first.day.club_id != candidate):
+                continue
+
+            key = (first.day.club_id, first.day.day_id, first.day.weekday, _other(second))
+            counts[key] += 1
+            if key not in found or first.start_at < found[key][0].start_at:
+                found[key] = [first, second]
+
+        for key, (first, second) in found.items():
+            day = first.day
+            clashes.append(
+                Clash(
+                    kind=kind,
+                    club_id=day.club_id,
+                    club=day.club,
+                    day_id=day.day_id,
+                    other_club_id=second.day and second.day.club_id,
+                    reservation_id=second.reservation_id,
+                    other=second.title,
+                    place=(day.location if kind is ClashKind.LOCATION else day.teacher) or "",
+                    start_at=first.start_at,
+                    end_at=first.end_at,
+                    count=counts[key],
+                )
+            )
+    clashes.sort(key=lambda clash: (clash.start_at, clash.club, clash.other))
+    return clashes
+
+
+def describe(clash: Clash) -> str:
+    """Returns a message about the clash for the user."""
+    period = f"{clash.start_at:%d.%m.%Y %H:%M}–{clash.end_at:%H:%M}"
+    if clash.kind is ClashKind.TEACHER:
+        text = f"{period}: «{clash.club}» и «{clash.other}» у преподавателя «{clash.place}»"
+    elif clash.reservation_id is not None:
+        text = f"{period}: «{clash.club}» и бронирование «{clash.other}» в помещении «{clash.place}»"
+    else:
+        text = f"{period}: «{clash.club}» и «{clash.other}» в помещении «{clash.place}»"
+    if clash.count > 1:
+        text += f", совпадений: {clash.count}"
+    return text
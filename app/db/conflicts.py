@@ -0,0 +1,286 @@
+"""
+Rejects reservations that overlap other reservations of the same location.
+
+A reservation without areas occupies the whole location, so it conflicts
+with every reservation of the location in its period; a reservation of
+areas conflicts with whole-location reservations and with reservations
+sharing one of its areas.
+
+Every flush that inserts or changes reservations checks them in the same
+transaction, after their rows are written: on SQLite the write lock is
+then held until commit, on PostgreSQL the locations are locked with
+`SELECT ... FOR UPDATE` first, so concurrent writers cannot both book
+the same period. The check is a range query on an overlap index: an
+R*Tree of the periods on SQLite, a GiST index on PostgreSQL.
+"""
+from datetime import datetime
+from typing import Iterable, List, NamedTuple, Set
+
+from sqlalchemy import Column, Integer, MetaData, Select, Table, event, exists, func, inspect, or_, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.db.availability import overlaps
+from app.db.models import AreaReservationLink, Location, Reservation
+
+__all__ = [
+    "PERIOD_COLUMNS",
+    "Conflict",
+    "ReservationConflict",
+    "create_reservation_index",
+    "overlapping",
+    "conflicts",
+    "check",
+]
+
+metadata = MetaData()
+
+# Periods in minutes since `EPOCH`, truncated; the candidates found with a minute
+# of slack are checked against the exact times of the reservations.
+SPANS = Table(
+    "ReservationSpan",
+    metadata,
+    Column("id", Integer),
+    Column("location_from", Integer),
+    Column("location_to", Integer),
+    Column("start_at", Integer),
+    Column("end_at", Integer),
+)
+
+PERIOD_COLUMNS = frozenset({"location_id", "start_at", "end_at"})
+"""The columns of `Reservation` that move it to another place or time."""
+
+EPOCH = datetime(2000, 1, 1)
+_JULIAN_EPOCH = 2451544.5
+
+
+class Conflict(NamedTuple):
+    """A reservation overlapping the checked one."""
+
+    id: int
+    start_at: datetime
+    end_at: datetime
+
+
+class ReservationConflict(Exception):
+    """
+    Raised on flush when a reservation overlaps others of the same location.
+
+    Attributes:
+        conflicts (List[Conflict]): The overlapping reservations.
+    """
+
+    def __init__(self, conflicts: List[Conflict]) -> None:
+        self.conflicts = conflicts
+        periods = ", ".join(
+            f"{conflict.start_at:%d.%m.%Y %H:%M} – {conflict.end_at:%d.%m.%Y %H:%M}" for conflict in conflicts[:3]
+        )
+        super().__init__(f"Помещение уже забронировано на это время: {periods}")
+
+
+def _minutes(value: datetime) -> int:
+    return int((value - EPOCH).total_seconds() // 60)
+
+
+def _sql_minutes(column: str) -> str:
+    return f"CAST((julianday({column}) - {_JULIAN_EPOCH}) * 1440 AS INTEGER)"
+
+
+def create_reservation_index(connection: Connection) -> None:
+    """
+    Creates the overlap index of reservation periods.
+
+    On SQLite it is an R*Tree of (location, period) boxes kept in sync by
+    triggers; on PostgreSQL a GiST index on the location and the period,
+    which needs the `btree_gist` extension for the location and falls back
+    to the period alone without it.
+
+    Args:
+        connection (Connection): The connection to run the DDL in.
+    """
+    if connection.dialect.name == "postgresql":
+        columns = "location_id, tsrange(start_at, end_at)"
+        try:
+            with connection.begin_nested():
+                connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        except DBAPIError:
+            columns = "tsrange(start_at, end_at)"
+        connection.exec_driver_sql(
+            f'CREATE INDEX IF NOT EXISTS "ix_Reservation_period" ON "Reservation" USING gist ({columns})'
+        )
+        return
+    if connection.dialect.name != "sqlite":
+        return
+
+    start, end = _sql_minutes("new.start_at"), _sql_minutes("new.end_at")
+    span = f"new.id, new.location_id, new.location_id, min({start}, {end}), max({start}, {end})"
+    statements = (
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS "{SPANS.name}" USING rtree_i32(
+            id, location_from, location_to, start_at, end_at
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS "{SPANS.name}_insert" AFTER INSERT ON "Reservation"
+            WHEN new.location_id IS NOT NULL BEGIN
+                INSERT INTO "{SPANS.name}" VALUES ({span});
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS "{SPANS.name}_delete" AFTER DELETE ON "Reservation" BEGIN
+                DELETE FROM "{SPANS.name}" WHERE id = old.id;
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS "{SPANS.name}_update"
+            AFTER UPDATE OF start_at, end_at, location_id ON "Reservation" BEGIN
+                DELETE FROM "{SPANS.name}" WHERE id = old.id;
+                INSERT INTO "{SPANS.name}" SELECT {span} WHERE new.location_id IS NOT NULL;
+            END""",
+        f"""INSERT INTO "{SPANS.name}" SELECT {span.replace("new.", "")}
+            FROM "Reservation" WHERE location_id IS NOT NULL""",
+    )
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def _has_spans(connection: Connection) -> bool:
+    # Cached per pooled connection; the table appears once, when the database is migrated.
+    if "reservation_spans" not in connection.info:
+        connection.info["reservation_spans"] = bool(
+            connection.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SPANS.name,)
+            ).first()
+        )
+    return connection.info["reservation_spans"]
+
+
+def overlapping(
+    connection: Connection, start_at: datetime, end_at: datetime, location_id: int | None = None
+) -> Select:
+    """
+    Builds a query of the reservations intersecting a period through the overlap index.
+
+    Args:
+        connection (Connection): The connection the query will run on; it selects the index.
+        start_at (datetime): The start of the period.
+        end_at (datetime): The end of the period.
+        location_id (int | None): The location to search, None for all of them.
+
+    Returns:
+        Select: The `id`, `location_id`, `start_at` and `end_at` of the reservations.
+    """
+    statement = select(Reservation.id, Reservation.location_id, Reservation.start_at, Reservation.end_at)
+    location = Reservation.location_id.is_not(None) if location_id is None else Reservation.location_id == location_id
+    if connection.dialect.name == "postgresql":
+        return statement.where(
+            location,
+            func.tsrange(Reservation.start_at, Reservation.end_at).op("&&")(func.tsrange(start_at, end_at)),
+        )
+    if connection.dialect.name != "sqlite" or not _has_spans(connection):
+        return statement.where(location, overlaps(start_at, end_at))
+
+    statement = (
+        statement.select_from(SPANS)
+        .join(Reservation, Reservation.id == SPANS.c.id)
+        .where(
+            SPANS.c.start_at <= _minutes(end_at) + 1,
+            SPANS.c.end_at >= _minutes(start_at) - 1,
+            overlaps(start_at, end_at),
+        )
+    )
+    if location_id is not None:
+        # `+ 0` keeps SQLite from scanning the location's history in the B-tree index,
+        # so the R*Tree drives the query and the rows are looked up by id.
+        statement = statement.where(
+            SPANS.c.location_from <= location_id,
+            SPANS.c.location_to >= location_id,
+            Reservation.location_id + 0 == location_id,
+        )
+    return statement
+
+
+def conflicts(
+    connection: Connection,
+    location_id: int,
+    start_at: datetime,
+    end_at: datetime,
+    area_ids: Iterable[int] = (),
+    exclude_id: int | None = None,
+) -> List[Conflict]:
+    """
+    Finds the reservations a reservation of the location would overlap.
+
+    Args:
+        connection (Connection): The connection to query with, e.g. `session.connection()`.
+        location_id (int): The unique identifier of the location.
+        start_at (datetime): The start of the period.
+        end_at (datetime): The end of the period.
+        area_ids (Iterable[int]): The reserved areas; none reserves the whole location.
+        exclude_id (int | None): The reservation being checked, which never conflicts with itself.
+
+    Returns:
+        List[Conflict]: The overlapping reservations ordered by start.
+    """
+    area_ids = set(area_ids)
+    linked = AreaReservationLink.reservation_id == Reservation.id
+    statement = overlapping(connection, start_at, end_at, location_id).order_by(Reservation.start_at)
+    if exclude_id is not None:
+        statement = statement.where(Reservation.id != exclude_id)
+    if area_ids:
+        statement = statement.where(
+            or_(~exists().where(linked), exists().where(linked, AreaReservationLink.area_id.in_(area_ids)))
+        )
+    return [Conflict(row.id, row.start_at, row.end_at) for row in connection.execute(statement)]
+
+
+def check(session: Session, reservation_ids: Set[int]) -> None:
+    """
+    Rejects written reservations that overlap others of their location.
+
+    Flushes check the reservations they write by themselves; statements
+    bypassing the unit of work must call this before committing.
+
+    Args:
+        session (Session): The session holding the written rows.
+        reservation_ids (Set[int]): The unique identifiers of the written reservations.
+
+    Raises:
+        ReservationConflict: If one of the reservations overlaps another one.
+    """
+    connection = session.connection()
+    reservations = connection.execute(
+        select(Reservation.id, Reservation.location_id, Reservation.start_at, Reservation.end_at).where(
+            Reservation.id.in_(reservation_ids), Reservation.location_id.is_not(None)
+        )
+    ).all()
+    if not reservations:
+        return
+
+    if connection.dialect.name == "postgresql":
+        # Writers booking the same location wait for each other from here until commit.
+        location_ids = sorted({reservation.location_id for reservation in reservations})
+        connection.execute(
+            select(Location.id).where(Location.id.in_(location_ids)).order_by(Location.id).with_for_update()
+        )
+
+    links = connection.execute(
+        select(AreaReservationLink.reservation_id, AreaReservationLink.area_id).where(
+            AreaReservationLink.reservation_id.in_(reservation_ids)
+        )
+    ).all()
+    for id, location_id, start_at, end_at in reservations:
+        area_ids = {area_id for reservation_id, area_id in links if reservation_id == id}
+        found = conflicts(connection, location_id, start_at, end_at, area_ids, exclude_id=id)
+        if found:
+            raise ReservationConflict(found)
+
+
+def _moved(reservation: Reservation) -> bool:
+    # Rows overlapping since before the check existed can still be edited otherwise.
+    state = inspect(reservation)
+    return any(state.attrs[name].history.has_changes() for name in (*PERIOD_COLUMNS, "areas"))
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session: Session, _) -> None:
+    reservation_ids = {obj.id for obj in session.new if isinstance(obj, Reservation)}
+    reservation_ids |= {obj.id for obj in session.dirty if isinstance(obj, Reservation) and _moved(obj)}
+    reservation_ids |= {obj.reservation_id for obj in session.new if isinstance(obj, AreaReservationLink)}
+    if reservation_ids:
+        # Raising here rolls the flush back.
+        check(session, reservation_ids)
@@ -0,0 +1,93 @@
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Type
+
+from sqlmodel import Session, select
+
+from app.db import ENGINE, changes
+from app.db.models import UniqueNamedModel
+
+__all__ = ["names", "id_of", "invalidate", "subscribe"]
+
+_maps: Dict[Type[UniqueNamedModel], Dict[str, int]] = {}
+# Bumped by every invalidation; names loaded across one are returned but not cached.
+_generations: Dict[Type[UniqueNamedModel], int] = defaultdict(int)
+_listeners: List[Callable[[Type[UniqueNamedModel]], None]] = []
+
+
+def _map_of(model: Type[UniqueNamedModel], session: Session | None = None) -> Dict[str, int]:
+    if model in _maps:
+        return _maps[model]
+    generation = _generations[model]
+    statement = select(model.name, model.id).order_by(model.id)
+    if session is None:
+        with Session(ENGINE) as session:
+            rows = session.exec(statement).all()
+    else:
+        rows = session.exec(statement).all()
+    loaded = dict(rows)
+    if generation == _generations[model]:
+        _maps[model] = loaded
+    return loaded
+
+
+def names(model: Type[UniqueNamedModel], session: Session | None = None) -> List[str]:
+    """
+    Returns the names of all objects of a unique named model.
+
+    The names are loaded once and kept until the model's table changes.
+
+    Args:
+        model (Type[UniqueNamedModel]): The model class, e.g. `Location`.
+        session (Session | None): The session to load uncached names with, e.g. of
+            a query task; None opens one in the calling thread.
+
+    Returns:
+        List[str]: The names in creation order.
+    """
+    return list(_map_of(model, session))
+
+
+def id_of(model: Type[UniqueNamedModel], name: str) -> Optional[int]:
+    """
+    Resolves a name to the unique identifier of the object without a query.
+
+    Args:
+        model (Type[UniqueNamedModel]): The model class, e.g. `Location`.
+        name (str): The unique name of the object.
+
+    Returns:
+        Optional[int]: The identifier, or None if there is no such object.
+    """
+    return _map_of(model).get(name)
+
+
+def invalidate(model: Type[UniqueNamedModel]) -> None:
+    """
+    Drops the cached names of a model and notifies the subscribers.
+
+    Args:
+        model (Type[UniqueNamedModel]): The model class whose table has changed.
+    """
+    _generations[model] += 1
+    _maps.pop(model, None)
+    for listener in _listeners:
+        listener(model)
+
+
+def subscribe(listener: Callable[[Type[UniqueNamedModel]], None]) -> None:
+    """
+    Registers a function called with the model class after each invalidation.
+
+    Args:
+        listener (Callable[[Type[UniqueNamedModel]], None]): The function to call.
+    """
+    _listeners.append(listener)
+
+
+def _on_committed(committed: changes.Changes) -> None:
+    for model in committed:
+        if issubclass(model, UniqueNamedModel):
+            invalidate(model)
+
+
+changes.subscribe(_on_committed)
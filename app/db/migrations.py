@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import Column, DateTime, Integer, Table, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.future.engine import Engine
+
+from app.db import FOREIGN_KEYS_CHECKED, enable_foreign_keys
+from app.db.changes import create_change_log
+from app.db.conflicts import create_reservation_index
+from app.db.models import BaseModel
+from app.db.search import create_search_index
+
+__all__ = ["MIGRATIONS", "migrate"]
+
+SchemaVersion = Table(
+    "SchemaVersion",
+    BaseModel.metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _create_declared_indexes(connection: Connection) -> None:
+    # `create_all` skips existing tables together with their indexes,
+    # so databases created before an index was declared never get it.
+    for table in BaseModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+_RENAMED_INDEXES = (
+    "ix_areareservationlink_reservation_id_area_id",
+    "ix_Reservation_location_id_start_at",
+)
+"""Old names of indexes now declared as `ix_<Model>_<columns>`."""
+
+
+def _rename_indexes(connection: Connection) -> None:
+    # SQLite cannot rename an index, so the old one is dropped and the declared one created.
+    for name in _RENAMED_INDEXES:
+        connection.exec_driver_sql(f'DROP INDEX IF EXISTS "{name}"')
+    _create_declared_indexes(connection)
+
+
+def _enable_foreign_keys(connection: Connection) -> None:
+    # A database with violations keeps them off; `enable_foreign_keys` can be run again once repaired.
+    enable_foreign_keys(connection)
+
+
+MIGRATIONS: List[Callable[[Connection], None]] = [
+    _create_declared_indexes,
+    create_search_index,
+    create_reservation_index,
+    create_change_log,
+    _rename_indexes,
+    _enable_foreign_keys,
+]
+"""Schema migrations in order; the version of a migration is its position starting at 1."""
+
+
+def migrate(engine: Engine) -> int:
+    """
+    Applies the pending migrations in one transaction.
+
+    Applied versions are recorded in the `SchemaVersion` table, so each
+    migration runs at most once per database.
+
+    Args:
+        engine (Engine): The engine of the database to migrate.
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    with engine.begin() as connection:
+        SchemaVersion.create(connection, checkfirst=True)
+        current = connection.execute(select(func.max(SchemaVersion.c.version))).scalar() or 0
+        for version, migration in enumerate(MIGRATIONS, start=1):
+            if version <= current:
+                continue
+            migration(connection)
+            connection.execute(insert(SchemaVersion).values(version=version, applied_at=datetime.now()))
+            current = version
+
+    # SQLite ignores `PRAGMA foreign_keys` inside the transaction, and the
+    # pooled connection was opened before the foreign keys were checked.
+    with engine.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            if connection.exec_driver_sql("PRAGMA user_version").scalar() >= FOREIGN_KEYS_CHECKED:
+                connection.exec_driver_sql("PRAGMA foreign_keys = ON")
+    return current
@@ -4,7 +4,7 @@ from datetime import date, time, datetime
 
 from sqlmodel import SQLModel, Field, Relationship
 
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 from sqlalchemy.orm import declared_attr
 
 
@@ -45,7 +45,7 @@ class BaseModel(SQLModel):
     """
 
     id: int = Field(primary_key=True)
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
 
     @declared_attr  # type: ignore
     def __tablename__(cls) -> str:
@@ -77,6 +77,10 @@ class AreaReservationLink(SQLModel, table=True):
         default=None, foreign_key="Reservation.id", primary_key=True
     )
 
+    __table_args__ = (
+        Index("ix_AreaReservationLink_reservation_id_area_id", "reservation_id", "area_id"),
+    )
+
 
 class Location(UniqueNamedModel, table=True):
     """A class representing a location.
@@ -155,7 +159,7 @@ class Event(BaseModel, table=True):
 
     title: str = Field(max_length=256, index=True)
     description: Optional[str] = Field(default=None, max_length=1028)
-    start_at: datetime
+    start_at: datetime = Field(index=True)
     scope: Scope
 
     type_id: Optional[int] = Field(default=None, foreign_key="EventType.id")
@@ -170,6 +174,8 @@ class Event(BaseModel, table=True):
         sa_relationship_kwargs={"cascade": "all, delete"},
     )
 
+    __table_args__ = (Index("ix_Event_type_id_created_at", "type_id", "created_at"),)
+
 
 class AssignmentType(UniqueNamedModel, table=True):
     """A class representing an assignment type.
@@ -210,7 +216,7 @@ class Assignment(BaseModel, table=True):
         COMPLETED = auto()
 
     state: State = State.DRAFT
-    deadline: datetime
+    deadline: datetime = Field(index=True)
     description: Optional[str] = Field(default=None, max_length=1028)
 
     type_id: Optional[int] = Field(default=None, foreign_key="AssignmentType.id")
@@ -222,6 +228,11 @@ class Assignment(BaseModel, table=True):
     event_id: Optional[int] = Field(default=None, foreign_key="Event.id")
     event: Optional[Event] = Relationship(back_populates="assignments")
 
+    __table_args__ = (
+        Index("ix_Assignment_state_created_at", "state", "created_at"),
+        Index("ix_Assignment_state_deadline", "state", "deadline"),
+    )
+
 
 class Reservation(BaseModel, table=True):
     """A class representing a location reservation for an event.
@@ -237,7 +248,7 @@ class Reservation(BaseModel, table=True):
         areas (List[Area]): The list of areas associated with this reservation.
     """
 
-    start_at: datetime
+    start_at: datetime = Field(index=True)
     end_at: datetime
     comment: Optional[str] = Field(default=None, max_length=1028)
 
@@ -251,6 +262,11 @@ class Reservation(BaseModel, table=True):
         back_populates="reservations", link_model=AreaReservationLink
     )
 
+    __table_args__ = (
+        Index("ix_Reservation_location_id_start_at_end_at", "location_id", "start_at", "end_at"),
+        Index("ix_Reservation_event_id", "event_id"),
+    )
+
 
 class Teacher(UniqueNamedModel, table=True):
     """A class representing a teacher.
@@ -290,6 +306,8 @@ class DaySchedule(BaseModel, table=True):
     club_id: Optional[int] = Field(default=None, foreign_key="Club.id")
     club: Optional["Club"] = Relationship(back_populates="days")
 
+    __table_args__ = (Index("ix_DaySchedule_club_id_weekday", "club_id", "weekday"),)
+
 
 class Club(BaseModel, table=True):
     """Represents a club registered on a specific date.
@@ -0,0 +1,326 @@
+"""
+Counts and times the SQL statements the application executes.
+
+Every statement is recorded with the stack of application functions that
+executed it. The outermost of them is the UI action, e.g. the slot of a
+clicked button; the innermost one in `app/ui` is the call site, e.g.
+`BaseTableModel.data`. Jobs run on the thread pool are attributed to the
+stack that scheduled them, see `called_from`.
+
+The profiler is started with `PROFILE_SQL`; it costs a stack walk per
+statement, so it is off by default.
+"""
+import json
+import os
+import re
+import sys
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from heapq import heappush, heappushpop, nlargest
+from itertools import islice
+from time import perf_counter
+from typing import ContextManager, Deque, Dict, Iterator, List, NamedTuple, TextIO, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import PROFILE_SQL
+
+__all__ = [
+    "Statement",
+    "Summary",
+    "QueryProfiler",
+    "start",
+    "current",
+    "call_stack",
+    "called_from",
+    "describe",
+]
+
+_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_UI = os.path.join(_APP, "ui")
+# Frames that only pass the work along and would hide the real call site.
+_SKIPPED = {
+    os.path.abspath(__file__),
+    os.path.join(_APP, "startup.py"),
+    os.path.join(_UI, "tasks.py"),
+}
+
+UNKNOWN = "?"
+"""The action and call site of statements executed outside the application."""
+
+Frame = Tuple[str, bool]
+
+
+class Statement(NamedTuple):
+    """
+    An executed statement.
+
+    Attributes:
+        action (str): The outermost application function of the stack.
+        site (str): The innermost UI function of the stack.
+        stack (Tuple[str, ...]): The application functions, outermost first.
+        sql (str): The statement.
+        thread (int): The identifier of the executing thread.
+        started (float): When it started, in seconds since the profiler started.
+        duration (float): How long it took, in seconds.
+    """
+
+    action: str
+    site: str
+    stack: Tuple[str, ...]
+    sql: str
+    thread: int
+    started: float
+    duration: float
+
+
+class Summary(NamedTuple):
+    """The number of statements of a group and the time they took in seconds."""
+
+    count: int
+    duration: float
+
+
+_local = threading.local()
+
+
+def _frames() -> Tuple[Frame, ...]:
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(_APP) and path not in _SKIPPED:
+            frames.append((frame.f_code.co_qualname, path.startswith(_UI)))
+        frame = frame.f_back
+    frames.reverse()
+    return getattr(_local, "origin", ()) + tuple(frames)
+
+
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+(\"?\w+\"?)", re.IGNORECASE)
+
+
+def describe(sql: str) -> str:
+    """Returns the verb and the first table of a statement, e.g. `SELECT "Event"`."""
+    verb = sql.split(None, 1)[0].upper() if sql.strip() else UNKNOWN
+    match = _TABLE.search(sql)
+    return f"{verb} {match.group(1)}" if match else verb
+
+
+class QueryProfiler:
+    """
+    Records the statements executed by engines.
+
+    Besides the latest statements, it keeps running totals per action and
+    call site and the slowest statements since it started, so reading them
+    does not walk the recorded statements.
+
+    Args:
+        limit (int): How many of the latest statements are kept.
+        slowest (int): How many of the slowest statements are kept.
+    """
+
+    def __init__(self, limit: int = 200000, slowest: int = 20) -> None:
+        self._started = perf_counter()
+        self._lock = threading.Lock()
+        self._statements: Deque[Statement] = deque(maxlen=limit)
+        self._taken = 0
+        self._recorded = 0
+        self._counts: Dict[str, Counter[str]] = {"action": Counter(), "site": Counter()}
+        self._durations: Dict[str, Counter[str]] = {"action": Counter(), "site": Counter()}
+        # A min-heap, so the fastest of the kept statements is the one replaced.
+        self._slowest: List[Tuple[float, int, Statement]] = []
+        self._slowest_limit = slowest
+
+    def attach(self, engine: Engine) -> None:
+        """Starts recording the statements of an engine."""
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        context._profiler_frames = _frames()
+        context._profiler_started = perf_counter()
+
+    def _after(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        ended = perf_counter()
+        frames = context._profiler_frames
+        stack = tuple(name for name, _ in frames)
+        site = next((name for name, is_ui in reversed(frames) if is_ui), stack[-1] if stack else UNKNOWN)
+        record = Statement(
+            action=stack[0] if stack else UNKNOWN,
+            site=site,
+            stack=stack,
+            sql=statement,
+            thread=threading.get_ident(),
+            started=context._profiler_started - self._started,
+            duration=ended - context._profiler_started,
+        )
+        with self._lock:
+            self._statements.append(record)
+            self._recorded += 1
+            for key in ("action", "site"):
+                group = getattr(record, key)
+                self._counts[key][group] += 1
+                self._durations[key][group] += record.duration
+            entry = (record.duration, self._recorded, record)
+            if len(self._slowest) < self._slowest_limit:
+                heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heappushpop(self._slowest, entry)
+
+    def statements(self) -> List[Statement]:
+        """Returns the recorded statements, oldest first."""
+        with self._lock:
+            return list(self._statements)
+
+    def take(self) -> List[Statement]:
+        """Returns the statements recorded since the previous call."""
+        with self._lock:
+            count = min(self._recorded - self._taken, len(self._statements))
+            self._taken = self._recorded
+            latest = list(islice(reversed(self._statements), count))
+        latest.reverse()
+        return latest
+
+    def totals(self, key: str, count: int | None = None) -> Dict[str, Summary]:
+        """
+        Returns the running totals of all statements so far, the most expensive group first.
+
+        Args:
+            key (str): `action` or `site`.
+            count (int | None): How many groups to return, None for all of them.
+
+        Returns:
+            Dict[str, Summary]: The number and time of the statements of each group.
+        """
+        with self._lock:
+            counts, durations = self._counts[key].copy(), self._durations[key].copy()
+        groups = durations.most_common(count)
+        return {group: Summary(counts[group], duration) for group, duration in groups}
+
+    @staticmethod
+    def summarize(statements: List[Statement], key: str) -> Dict[str, Summary]:
+        """
+        Groups statements by one of their attributes, the most expensive group first.
+
+        Args:
+            statements (List[Statement]): The statements to group.
+            key (str): `action` or `site`.
+
+        Returns:
+            Dict[str, Summary]: The number and time of the statements of each group.
+        """
+        counts: Counter[str] = Counter()
+        durations: Counter[str] = Counter()
+        for statement in statements:
+            group = getattr(statement, key)
+            counts[group] += 1
+            durations[group] += statement.duration
+        return {group: Summary(counts[group], durations[group]) for group, _ in durations.most_common()}
+
+    @staticmethod
+    def repeated(statements: List[Statement], threshold: int = 10) -> List[Tuple[str, str, int]]:
+        """
+        Finds statements executed again and again by one call site, the signature of N+1 queries.
+
+        Args:
+            statements (List[Statement]): The statements to search.
+            threshold (int): How many executions of the same statement make a hot spot.
+
+        Returns:
+            List[Tuple[str, str, int]]: The call sites, statements and counts, the most frequent first.
+        """
+        counts = Counter((statement.site, statement.sql) for statement in statements)
+        return [(site, sql, count) for (site, sql), count in counts.most_common() if count >= threshold]
+
+    def slowest(self, count: int = 10) -> List[Statement]:
+        """Returns the statements that took the longest so far, at most as many as are kept."""
+        with self._lock:
+            return [statement for _, _, statement in nlargest(count, self._slowest)]
+
+    def report(self, file: TextIO = sys.stderr) -> None:
+        """Prints the statements per action and call site, the hot spots and the slowest statements."""
+        statements = self.statements()
+        for title, key in (("action", "action"), ("call site", "site")):
+            print(f"{title:<64}{'statements':>12}{'time':>12}", file=file)
+            for group, summary in self.totals(key).items():
+                print(f"{group[:63]:<64}{summary.count:>12}{summary.duration * 1000:>9.1f} ms", file=file)
+            print(file=file)
+        for site, sql, count in self.repeated(statements):
+            print(f"repeated {count} times by {site}: {describe(sql)}", file=file)
+        for statement in self.slowest():
+            print(f"{statement.duration * 1000:9.1f} ms  {statement.site}: {describe(statement.sql)}", file=file)
+
+    def write_trace(self, path: str) -> None:
+        """
+        Writes the statements to a trace file.
+
+        A `.json` file is in the Chrome trace event format, which `chrome://tracing`,
+        Perfetto and speedscope open as a timeline per thread. Any other file gets
+        collapsed stacks weighted by microseconds, the input of `flamegraph.pl`.
+
+        Args:
+            path (str): The file to write.
+        """
+        statements = self.statements()
+        with open(path, "w", encoding="UTF-8") as file:
+            if os.path.splitext(path)[1].lower() == ".json":
+                events = [
+                    {
+                        "name": statement.site,
+                        "cat": statement.action,
+                        "ph": "X",
+                        "ts": round(statement.started * 1e6),
+                        "dur": round(statement.duration * 1e6),
+                        "pid": os.getpid(),
+                        "tid": statement.thread,
+                        "args": {"sql": statement.sql, "stack": list(statement.stack)},
+                    }
+                    for statement in statements
+                ]
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, ensure_ascii=False)
+                return
+
+            weights: Counter[str] = Counter()
+            for statement in statements:
+                frames = (*(statement.stack or (UNKNOWN,)), describe(statement.sql))
+                weights[";".join(frame.replace(";", ",") for frame in frames)] += statement.duration
+            for stack, duration in weights.items():
+                file.write(f"{stack} {max(round(duration * 1e6), 1)}\n")
+
+
+_profiler: QueryProfiler | None = None
+
+
+def start(*engines: Engine) -> None:
+    """Starts recording the statements of the engines if `PROFILE_SQL` is set."""
+    global _profiler
+    if PROFILE_SQL:
+        _profiler = QueryProfiler()
+        for engine in engines:
+            _profiler.attach(engine)
+
+
+def current() -> QueryProfiler | None:
+    """Returns the running profiler, None if profiling is off."""
+    return _profiler
+
+
+def call_stack() -> Tuple[Frame, ...]:
+    """Returns the application functions calling this one, empty if profiling is off."""
+    return _frames() if _profiler else ()
+
+
+def called_from(stack: Tuple[Frame, ...]) -> ContextManager[None]:
+    """Attributes the statements of the block, run on another thread, to the stack that scheduled it."""
+    return _origin(stack) if stack else nullcontext()
+
+
+@contextmanager
+def _origin(stack: Tuple[Frame, ...]) -> Iterator[None]:
+    _local.origin = stack
+    try:
+        yield
+    finally:
+        del _local.origin
@@ -0,0 +1,115 @@
+from functools import lru_cache
+from typing import Iterable, List, Tuple, Type
+
+from sqlalchemy import ColumnElement, inspect
+from sqlalchemy.orm import RelationshipProperty
+from sqlmodel import SQLModel
+from sqlmodel.sql.expression import SelectOfScalar
+
+__all__ = ["RelationshipPath", "relationship_path", "where_related"]
+
+RelationshipPath = Tuple[RelationshipProperty, ...]
+
+
+def _chain(path: RelationshipPath) -> str:
+    return ".".join(relationship.key for relationship in path)
+
+
+@lru_cache
+def relationship_path(
+    model: Type[SQLModel], target: Type[SQLModel], via: Tuple[str, ...] | None = None
+) -> RelationshipPath:
+    """
+    Finds the chain of relationships leading from one model to another.
+
+    Without `via` the shortest chain is taken; of several, the one going
+    through the fewest collections, so e.g. `Event.location.areas` wins
+    over `Event.reservations.areas`.
+
+    Args:
+        model (Type[SQLModel]): The model to start from, e.g. `Event`.
+        target (Type[SQLModel]): The related model, e.g. `Reservation`.
+        via (Tuple[str, ...] | None): The names of the relationships to follow, e.g. `("reservations", "areas")`.
+
+    Returns:
+        RelationshipPath: The relationships in order, empty if the models are the same.
+
+    Raises:
+        ValueError: If `via` does not lead to the target, the models are not related
+            or several chains tie.
+    """
+    if via is not None:
+        path: RelationshipPath = ()
+        current = model
+        for key in via:
+            relationships = inspect(current).relationships
+            if key not in relationships:
+                raise ValueError(f"{current.__name__} has no relationship {key!r}")
+            path += (relationships[key],)
+            current = relationships[key].mapper.class_
+        if current is not target:
+            raise ValueError(f"{model.__name__}.{_chain(path)} does not lead to {target.__name__}")
+        return path
+
+    level: List[Tuple[Type[SQLModel], RelationshipPath]] = [(model, ())]
+    visited = {model}
+    while level:
+        found = [path for current, path in level if current is target]
+        if found:
+            fewest = min(sum(relationship.uselist for relationship in path) for path in found)
+            found = [path for path in found if sum(relationship.uselist for relationship in path) == fewest]
+        if len(found) > 1:
+            chains = ", ".join(_chain(path) for path in found)
+            raise ValueError(
+                f"{model.__name__} is related to {target.__name__} in several ways: {chains}; pass `via`"
+            )
+        if found:
+            return found[0]
+
+        next_level = []
+        for current, path in level:
+            for relationship in inspect(current).relationships:
+                if relationship.mapper.class_ not in visited:
+                    next_level.append((relationship.mapper.class_, path + (relationship,)))
+        visited.update(related for related, _ in next_level)
+        level = next_level
+    raise ValueError(f"{model.__name__} is not related to {target.__name__}")
+
+
+def where_related(
+    statement: SelectOfScalar,
+    model: Type[SQLModel],
+    conditions: Iterable[Tuple[RelationshipPath, ColumnElement[bool]]],
+) -> SelectOfScalar:
+    """
+    Adds conditions on the model and on related models to a statement of the model.
+
+    A condition on a directly referenced model (many-to-one) joins that model
+    once, however many conditions refer to it. Conditions reached through a
+    collection or several hops become EXISTS subqueries, so the result never
+    contains the same row twice and needs no DISTINCT.
+
+    Args:
+        statement (SelectOfScalar): The statement selecting the model.
+        model (Type[SQLModel]): The selected model.
+        conditions (Iterable[Tuple[RelationshipPath, ColumnElement[bool]]]): Conditions with the path
+            to the model they refer to, see `relationship_path`.
+
+    Returns:
+        SelectOfScalar: The filtered statement.
+    """
+    joined = set()
+    for path, condition in conditions:
+        if not path:
+            statement = statement.where(condition)
+        elif len(path) == 1 and not path[0].uselist:
+            if path not in joined:
+                statement = statement.join(getattr(model, path[0].key))
+                joined.add(path)
+            statement = statement.where(condition)
+        else:
+            for relationship in reversed(path):
+                attribute = getattr(relationship.parent.class_, relationship.key)
+                condition = attribute.any(condition) if relationship.uselist else attribute.has(condition)
+            statement = statement.where(condition)
+    return statement
@@ -0,0 +1,194 @@
+from typing import Dict, FrozenSet, List, NamedTuple, Tuple, Type
+
+from sqlalchemy import Column, ColumnElement, Float, Integer, MetaData, String, Table, literal_column, or_
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlmodel import Session, select, func
+
+from app.db import ENGINE
+from app.db.models import Assignment, BaseModel, Club, Event, Reservation
+
+__all__ = ["SEARCH_FIELDS", "SearchHit", "create_search_index", "is_indexed", "contains", "search"]
+
+SEARCH_FIELDS: Dict[Type[BaseModel], Tuple[str, ...]] = {
+    Event: ("title", "description"),
+    Assignment: ("description",),
+    Reservation: ("comment",),
+    Club: ("title",),
+}
+"""The text columns of each model covered by the full-text index."""
+
+MIN_LENGTH = 3
+"""The trigram tokenizer cannot match shorter strings, those fall back to LIKE."""
+
+metadata = MetaData()
+
+SEARCH_TABLES: Dict[Type[BaseModel], Table] = {
+    model: Table(
+        f"{model.__tablename__}Search",
+        metadata,
+        Column("rowid", Integer),
+        Column("rank", Float),
+        *(Column(field, String) for field in fields),
+    )
+    for model, fields in SEARCH_FIELDS.items()
+}
+
+
+class SearchHit(NamedTuple):
+    model: Type[BaseModel]
+    id: int
+    text: str
+    rank: float
+
+
+def create_search_index(connection: Connection) -> None:
+    """
+    Creates the FTS5 tables and the triggers that keep them in sync, then fills them.
+
+    Each model gets an external content table with the trigram tokenizer, so
+    substring search works for any alphabet and the text is not stored twice.
+    Other backends are left untouched and keep using LIKE.
+
+    Args:
+        connection (Connection): The connection to run the DDL in.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+
+    for model, fields in SEARCH_FIELDS.items():
+        table, search_table = model.__tablename__, SEARCH_TABLES[model].name
+        columns = ", ".join(fields)
+        new = ", ".join(f"new.{field}" for field in fields)
+        old = ", ".join(f"old.{field}" for field in fields)
+        statements = (
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS "{search_table}" USING fts5(
+                {columns}, content="{table}", content_rowid="id", tokenize="trigram"
+            )""",
+            f"""CREATE TRIGGER IF NOT EXISTS "{search_table}_insert" AFTER INSERT ON "{table}" BEGIN
+                INSERT INTO "{search_table}"(rowid, {columns}) VALUES (new.id, {new});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS "{search_table}_delete" AFTER DELETE ON "{table}" BEGIN
+                INSERT INTO "{search_table}"("{search_table}", rowid, {columns}) VALUES ('delete', old.id, {old});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS "{search_table}_update" AFTER UPDATE OF {columns} ON "{table}" BEGIN
+                INSERT INTO "{search_table}"("{search_table}", rowid, {columns}) VALUES ('delete', old.id, {old});
+                INSERT INTO "{search_table}"(rowid, {columns}) VALUES (new.id, {new});
+            END""",
+            f"""INSERT INTO "{search_table}"("{search_table}") VALUES ('rebuild')""",
+        )
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+    connection.info.pop("search_tables", None)
+
+
+def _phrase(text: str) -> str:
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+def _search_tables(connection: Connection) -> FrozenSet[str]:
+    # Cached per pooled connection; the tables appear once, when the database is migrated.
+    if "search_tables" not in connection.info:
+        names = [table.name for table in SEARCH_TABLES.values()]
+        connection.info["search_tables"] = frozenset(
+            name
+            for name, in connection.exec_driver_sql(
+                f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({', '.join('?' * len(names))})",
+                tuple(names),
+            )
+        )
+    return connection.info["search_tables"]
+
+
+def _has_index(model: Type[BaseModel], connection: Connection | None = None) -> bool:
+    if ENGINE.dialect.name != "sqlite" or model not in SEARCH_TABLES:
+        return False
+    if connection is None:
+        with ENGINE.connect() as connection:
+            return SEARCH_TABLES[model].name in _search_tables(connection)
+    return SEARCH_TABLES[model].name in _search_tables(connection)
+
+
+def is_indexed(column: InstrumentedAttribute, text: str) -> bool:
+    """
+    Tells whether `contains` matches the text through the full-text index.
+
+    Indexed matching is case-insensitive for any alphabet, while the LIKE
+    fallback folds ASCII letters only. A database not migrated yet has no
+    index and always falls back.
+
+    Args:
+        column (InstrumentedAttribute): The model column, e.g. `Event.title`.
+        text (str): The substring to find.
+
+    Returns:
+        bool: True if the index is used.
+    """
+    fields = SEARCH_FIELDS.get(column.class_, ())
+    return column.key in fields and len(text) >= MIN_LENGTH and _has_index(column.class_)
+
+
+def contains(column: InstrumentedAttribute, text: str) -> ColumnElement[bool]:
+    """
+    Builds a case-insensitive substring condition on a text column.
+
+    Indexed columns are matched through the full-text index instead of a
+    `LIKE '%text%'` scan of the whole table.
+
+    Args:
+        column (InstrumentedAttribute): The model column, e.g. `Event.title`.
+        text (str): The substring to find.
+
+    Returns:
+        ColumnElement[bool]: The SQL condition on the column's table.
+    """
+    if not is_indexed(column, text):
+        return column.contains(text)
+
+    search_table = SEARCH_TABLES[column.class_]
+    return column.class_.id.in_(
+        select(search_table.c.rowid).where(search_table.c[column.key].op("MATCH")(_phrase(text)))
+    )
+
+
+def search(session: Session, text: str, limit: int = 20) -> List[SearchHit]:
+    """
+    Finds objects of all indexed models containing the text in any indexed column.
+
+    Models without the index, on another backend or in a database not migrated
+    yet, are scanned with LIKE and ranked after the indexed hits.
+
+    Args:
+        session (Session): The session to run the queries in.
+        text (str): The substring to find, at least `MIN_LENGTH` characters long.
+        limit (int): The maximum number of hits.
+
+    Returns:
+        List[SearchHit]: The best hits of all models ordered by relevance.
+    """
+    if len(text) < MIN_LENGTH:
+        return []
+
+    hits: List[SearchHit] = []
+    connection = session.connection()
+    for model, search_table in SEARCH_TABLES.items():
+        if not _has_index(model, connection):
+            # Ranked after every indexed hit, whose bm25 ranks are negative.
+            columns = [getattr(model, field) for field in SEARCH_FIELDS[model]]
+            statement = (
+                select(model.id, func.coalesce(*columns, ""))
+                .where(or_(*(column.contains(text) for column in columns)))
+                .limit(limit)
+            )
+            hits.extend(SearchHit(model, id, value, 0.0) for id, value in session.exec(statement))
+            continue
+
+        fields = (search_table.c[field] for field in SEARCH_FIELDS[model])
+        statement = (
+            select(search_table.c.rowid, func.coalesce(*fields, ""), search_table.c.rank)
+            .where(literal_column(f'"{search_table.name}"').op("MATCH")(_phrase(text)))
+            .order_by(search_table.c.rank)
+            .limit(limit)
+        )
+        hits.extend(SearchHit(model, *row) for row in session.exec(statement))
+    return sorted(hits, key=lambda hit: hit.rank)[:limit]
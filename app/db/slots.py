@@ -0,0 +1,258 @@
+"""
+Finds the earliest free periods of a given duration across all locations.
+
+The reservations intersecting the search window are read with one query
+through the overlap index. Per location, the busy intervals of the whole
+location and of every area are merged and the free gaps between them are
+swept: a gap long enough for the duration gives a range of possible
+starts, aligned to `step`. The earliest start covered by the ranges of
+enough areas is the location's candidate; areas without reservations share
+the gaps of the location, so the work grows with the reservations in the
+window, not with the number of areas.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlmodel import Session
+
+from app.db.conflicts import overlapping
+from app.db.models import Area, AreaReservationLink, Location, Reservation
+
+__all__ = ["Slot", "merge", "gaps", "find_slots"]
+
+Interval = Tuple[datetime, datetime]
+
+_ALIGNMENT = datetime(2000, 1, 1)
+
+
+class Slot(NamedTuple):
+    """
+    A free period of a location.
+
+    Attributes:
+        location_id (int): The unique identifier of the location.
+        location (str): The name of the location.
+        start_at (datetime): The start of the period.
+        end_at (datetime): The end of the period.
+        free_area_ids (FrozenSet[int]): The areas free during the period, empty for a whole location.
+    """
+
+    location_id: int
+    location: str
+    start_at: datetime
+    end_at: datetime
+    free_area_ids: FrozenSet[int]
+
+
+def merge(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    Merges overlapping and adjacent intervals.
+
+    Args:
+        intervals (Iterable[Interval]): The intervals in any order.
+
+    Returns:
+        List[Interval]: The disjoint intervals ordered by start.
+    """
+    merged: List[Interval] = []
+    for start_at, end_at in sorted(intervals):
+        if merged and start_at <= merged[-1][1]:
+            if end_at > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end_at)
+        else:
+            merged.append((start_at, end_at))
+    return merged
+
+
+def gaps(busy: Sequence[Interval], start_at: datetime, end_at: datetime) -> List[Interval]:
+    """
+    Finds the free intervals of a window between merged busy intervals.
+
+    Args:
+        busy (Sequence[Interval]): The busy intervals as returned by `merge`.
+        start_at (datetime): The start of the window.
+        end_at (datetime): The end of the window.
+
+    Returns:
+        List[Interval]: The free intervals ordered by start.
+    """
+    free: List[Interval] = []
+    cursor = start_at
+    for busy_from, busy_to in busy:
+        if busy_to <= cursor:
+            continue
+        if busy_from >= end_at:
+            break
+        if busy_from > cursor:
+            free.append((cursor, busy_from))
+        cursor = max(cursor, busy_to)
+    if cursor < end_at:
+        free.append((cursor, end_at))
+    return free
+
+
+def _closed_hours(
+    start_at: datetime, end_at: datetime, day_start: time | None, day_end: time | None
+) -> List[Interval]:
+    # Midnight closes the day at its end; closing before opening keeps the
+    # locations open past midnight, so they are closed from closing to opening.
+    opens, closes = day_start or time.min, day_end or time.min
+    if opens == closes:
+        if opens == time.min:
+            return []
+        raise ValueError(f"The locations open and close at the same time: {opens:%H:%M}")
+    overnight = time.min < closes < opens
+
+    closed: List[Interval] = []
+    day: date = start_at.date()
+    while datetime.combine(day, time.min) < end_at:
+        midnight = datetime.combine(day, time.min)
+        if overnight:
+            closed.append((datetime.combine(day, closes), datetime.combine(day, opens)))
+        else:
+            if opens > time.min:
+                closed.append((midnight, datetime.combine(day, opens)))
+            if closes > time.min:
+                closed.append((datetime.combine(day, closes), midnight + timedelta(days=1)))
+        day += timedelta(days=1)
+    return closed
+
+
+def _starts(free: Iterable[Interval], duration: timedelta, step: timedelta) -> List[Interval]:
+    # The closed ranges of the starts, aligned to `step`, that fit the duration into a gap.
+    ranges: List[Interval] = []
+    for free_from, free_to in free:
+        first = _ALIGNMENT - (_ALIGNMENT - free_from) // step * step
+        last = free_to - duration
+        if first <= last:
+            ranges.append((first, last))
+    return ranges
+
+
+def _earliest(groups: List[Tuple[List[Interval], int]], needed: int) -> datetime | None:
+    # Sweeps the start ranges of groups of areas; opens sort before closes at the same time.
+    events = sorted(
+        (point, closing, index)
+        for index, (ranges, _) in enumerate(groups)
+        for start_at, end_at in ranges
+        for point, closing in ((start_at, False), (end_at, True))
+    )
+    count = 0
+    for point, closing, index in events:
+        if closing:
+            count -= groups[index][1]
+            continue
+        count += groups[index][1]
+        if count >= needed:
+            return point
+    return None
+
+
+def _free_at(ranges: List[Interval], point: datetime) -> bool:
+    return any(start_at <= point <= end_at for start_at, end_at in ranges)
+
+
+def find_slots(
+    session: Session,
+    start_at: datetime,
+    end_at: datetime,
+    duration: timedelta,
+    areas: int = 0,
+    day_start: time | None = None,
+    day_end: time | None = None,
+    step: timedelta = timedelta(minutes=15),
+    limit: int = 20,
+    location_ids: Iterable[int] | None = None,
+) -> List[Slot]:
+    """
+    Finds the earliest free period of every location and ranks them.
+
+    Args:
+        session (Session): The session to run the queries in.
+        start_at (datetime): The earliest start of a period.
+        end_at (datetime): The latest end of a period.
+        duration (timedelta): The length of a period.
+        areas (int): The number of areas that must be free; 0 requires the whole location.
+        day_start (time | None): The opening time of the locations, None for midnight.
+        day_end (time | None): The closing time of the locations, None for midnight; an earlier
+            time than `day_start` closes them on the next day.
+        step (timedelta): The granularity of the starts.
+        limit (int): The maximum number of slots.
+        location_ids (Iterable[int] | None): The locations to search, None for all of them.
+
+    Returns:
+        List[Slot]: The slots, the earliest first, then those with more free areas, then by name.
+
+    Raises:
+        ValueError: If the locations open and close at the same time other than midnight.
+    """
+    closed = _closed_hours(start_at, end_at, day_start, day_end)
+    if duration <= timedelta(0) or start_at + duration > end_at:
+        return []
+    location_ids = None if location_ids is None else set(location_ids)
+
+    locations = select(Location.id, Location.name)
+    area_rows = select(Area.id, Area.location_id).where(Area.location_id.is_not(None))
+    if location_ids is not None:
+        locations = locations.where(Location.id.in_(location_ids))
+        area_rows = area_rows.where(Area.location_id.in_(location_ids))
+
+    connection = session.connection()
+    reserved = overlapping(connection, start_at, end_at)
+    if location_ids is not None:
+        reserved = reserved.where(Reservation.location_id.in_(location_ids))
+    reserved = reserved.subquery()
+    reservations = connection.execute(select(reserved)).all()
+    links = connection.execute(
+        select(AreaReservationLink.reservation_id, AreaReservationLink.area_id).join(
+            reserved, reserved.c.id == AreaReservationLink.reservation_id
+        )
+    ).all()
+
+    area_ids: Dict[int, List[int]] = defaultdict(list)
+    for area_id, location_id in connection.execute(area_rows):
+        area_ids[location_id].append(area_id)
+    linked: Dict[int, List[int]] = defaultdict(list)
+    for reservation_id, area_id in links:
+        linked[reservation_id].append(area_id)
+
+    whole: Dict[int, List[Interval]] = defaultdict(list)
+    partial: Dict[int, Dict[int, List[Interval]]] = defaultdict(lambda: defaultdict(list))
+    for id, location_id, reserved_from, reserved_to in reservations:
+        if id in linked:
+            for area_id in linked[id]:
+                partial[location_id][area_id].append((reserved_from, reserved_to))
+        else:
+            whole[location_id].append((reserved_from, reserved_to))
+
+    slots: List[Slot] = []
+    for location_id, name in connection.execute(locations):
+        busy = closed + whole[location_id]
+        if areas <= 0:
+            busy += [interval for intervals in partial[location_id].values() for interval in intervals]
+            ranges = _starts(gaps(merge(busy), start_at, end_at), duration, step)
+            if ranges:
+                slots.append(Slot(location_id, name, ranges[0][0], ranges[0][0] + duration, frozenset()))
+            continue
+
+        if len(area_ids[location_id]) < areas:
+            continue
+        shared = _starts(gaps(merge(busy), start_at, end_at), duration, step)
+        untouched = [area_id for area_id in area_ids[location_id] if area_id not in partial[location_id]]
+        groups = [(shared, len(untouched))]
+        own = set(area_ids[location_id])
+        touched = [(area_id, intervals) for area_id, intervals in partial[location_id].items() if area_id in own]
+        for _, intervals in touched:
+            groups.append((_starts(gaps(merge(busy + intervals), start_at, end_at), duration, step), 1))
+
+        point = _earliest(groups, areas)
+        if point is None:
+            continue
+        free = set(untouched) if _free_at(shared, point) else set()
+        free.update(area_id for (area_id, _), (ranges, _) in zip(touched, groups[1:]) if _free_at(ranges, point))
+        slots.append(Slot(location_id, name, point, point + duration, frozenset(free)))
+
+    slots.sort(key=lambda slot: (slot.start_at, -len(slot.free_area_ids), slot.location))
+    return slots[:limit]
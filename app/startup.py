@@ -1,11 +1,16 @@
 import sys
 
 from PyQt6.QtGui import QIcon
-from PyQt6.QtCore import QTranslator, QLocale, QLibraryInfo
+from PyQt6.QtCore import QTranslator, QLocale, QLibraryInfo, QThreadPool
 from PyQt6.QtWidgets import QApplication
 
-from app.db import ENGINE
+from app.config import CHANGE_LOG_RETENTION_DAYS, PROFILE_SQL_TRACE
+from app.db import ENGINE, READONLY_ENGINE, changes, profiler
+from app.db.migrations import migrate
 from app.db.models import BaseModel
+from app.ui import profiling
+from app.ui.changes import ChangePoller
+from app.ui.lookups import preload_names
 from app.ui.widgets.windows import MainWindow
 
 
@@ -16,7 +21,13 @@ def run() -> int:
     Returns:
         int: The exit status code.
     """
-    BaseModel.metadata.create_all(ENGINE)
+    profiling.start()
+    profiler.start(ENGINE, READONLY_ENGINE)
+    with profiling.measure("database"):
+        BaseModel.metadata.create_all(ENGINE)
+        migrate(ENGINE)
+        with ENGINE.begin() as connection:
+            changes.prune(connection, CHANGE_LOG_RETENTION_DAYS)
 
     app: QApplication = QApplication(sys.argv)
     app.setWindowIcon(QIcon("app/ui/resourses/favicon.ico"))
@@ -30,7 +41,19 @@ def run() -> int:
     ):
         app.installTranslator(translator)
 
-    window: MainWindow = MainWindow()
+    with profiling.measure("main window"):
+        window: MainWindow = MainWindow()
+    profiling.first_paint(window, "main window")
     window.show()
-
-    return sys.exit(app.exec())
+    ChangePoller(app).start()
+    preload_names()
+
+    status = app.exec()
+    # Queries still running on the pool must finish before the interpreter shuts down.
+    QThreadPool.globalInstance().waitForDone()
+
+    if profiler.current() is not None:
+        profiler.current().report()
+        if PROFILE_SQL_TRACE:
+            profiler.current().write_trace(PROFILE_SQL_TRACE)
+    return sys.exit(status)
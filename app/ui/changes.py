@@ -0,0 +1,144 @@
+from PyQt6.QtCore import QObject, QSocketNotifier, QTimer, pyqtSignal
+from sqlmodel import Session
+
+from app.config import CHANGE_LOG_PRUNE_INTERVAL, CHANGE_LOG_RETENTION_DAYS, CHANGE_POLL_INTERVAL
+from app.db import ENGINE, changes
+from app.db.changes import Changes
+from app.ui.tasks import QueryTask, run_query
+
+__all__ = ["ChangeBus", "ChangePoller", "change_bus"]
+
+
+class ChangeBus(QObject):
+    """
+    Delivers committed database changes to widgets in the GUI thread.
+
+    Commits from any thread are merged until the event loop runs, so the
+    subscribers get a single `changed` signal per tick however many
+    transactions were committed in between.
+    """
+
+    changed = pyqtSignal(object)
+    _committed = pyqtSignal(object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._pending: Changes = {}
+        self._committed.connect(self._on_committed)
+        changes.subscribe(self._committed.emit)
+
+    def _on_committed(self, committed: Changes) -> None:
+        if not self._pending:
+            QTimer.singleShot(0, self._publish)
+        changes.merge(self._pending, committed)
+
+    def _publish(self) -> None:
+        pending, self._pending = self._pending, {}
+        self.changed.emit(pending)
+
+
+class ChangePoller(QObject):
+    """
+    Reads the changes other clients sharing the database have committed.
+
+    The change log is read every `CHANGE_POLL_INTERVAL` milliseconds. On
+    PostgreSQL with psycopg2 the poller listens for the notifications sent
+    on commit instead and reads the log only when one arrives. The changes
+    are published like local ones, so views patch just the changed rows.
+    Entries older than `CHANGE_LOG_RETENTION_DAYS` are deleted every
+    `CHANGE_LOG_PRUNE_INTERVAL` milliseconds.
+    """
+
+    # Versions are not committed in order on a server, see `ChangeFeed`.
+    SERVER_WINDOW: int = 1000
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        with Session(ENGINE) as session:
+            version = changes.latest_version(session)
+        window = 0 if ENGINE.dialect.name == "sqlite" else self.SERVER_WINDOW
+        self._feed = changes.ChangeFeed(version, window)
+        self._task: QueryTask | None = None
+        self._again = False
+        self._connection = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(CHANGE_POLL_INTERVAL)
+        self._timer.timeout.connect(self.poll)
+        self._prune_timer = QTimer(self)
+        self._prune_timer.setInterval(CHANGE_LOG_PRUNE_INTERVAL)
+        self._prune_timer.timeout.connect(self.prune)
+
+    def start(self) -> None:
+        """Starts listening or polling, unless `CHANGE_POLL_INTERVAL` is 0, and pruning."""
+        if CHANGE_POLL_INTERVAL > 0 and not self._listen():
+            self._timer.start()
+        if CHANGE_LOG_PRUNE_INTERVAL > 0:
+            self._prune_timer.start()
+
+    def _listen(self) -> bool:
+        if ENGINE.dialect.name != "postgresql":
+            return False
+        connection = ENGINE.raw_connection()
+        driver = connection.driver_connection
+        if not hasattr(driver, "poll"):
+            connection.close()
+            return False
+        # The connection stays out of the pool for as long as the application runs.
+        driver.autocommit = True
+        with driver.cursor() as cursor:
+            cursor.execute(f'LISTEN "{changes.CHANNEL}"')
+        self._connection = connection
+        self._notifier = QSocketNotifier(driver.fileno(), QSocketNotifier.Type.Read, self)
+        self._notifier.activated.connect(self._on_notified)
+        return True
+
+    def _on_notified(self) -> None:
+        driver = self._connection.driver_connection
+        driver.poll()
+        driver.notifies.clear()
+        self.poll()
+
+    def poll(self) -> None:
+        """Reads the change log now, or right after the read in progress."""
+        if self._task is not None:
+            self._again = True
+            return
+        self._task = run_query(self._feed.read, self._on_read, self._on_failed)
+
+    def _on_read(self, committed: Changes) -> None:
+        self._task = None
+        if committed:
+            changes.publish(committed)
+        if self._again:
+            self._again = False
+            self.poll()
+
+    def _on_failed(self, message: str) -> None:
+        # The database may be unreachable for a moment; the next poll retries.
+        self._task = None
+
+    def prune(self) -> None:
+        """Deletes the expired change log entries off the GUI thread."""
+
+        def job(session: Session) -> None:
+            changes.prune(session.connection(), CHANGE_LOG_RETENTION_DAYS)
+            session.commit()
+
+        # A failed prune is retried on the next interval.
+        run_query(job, lambda _: None, lambda _: None)
+
+
+_instance: ChangeBus | None = None
+
+
+def change_bus() -> ChangeBus:
+    """
+    Returns the bus publishing the changes committed by this application.
+
+    Returns:
+        ChangeBus: The shared bus; connect to its `changed` signal.
+    """
+    global _instance
+    if _instance is None:
+        _instance = ChangeBus()
+    return _instance
@@ -0,0 +1,200 @@
+import csv
+import json
+from os import remove
+from os.path import expanduser, splitext
+from typing import Any, Sequence, Type
+
+from PyQt6 import QtCore, QtWidgets
+from PyQt6.QtCore import pyqtSignal, pyqtSlot
+from sqlmodel import Session
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.db import READONLY_ENGINE
+from app.ui.models import BaseTableModel
+
+__all__ = ["export_table", "export_statement"]
+
+FILE_FILTERS = "CSV (*.csv);;Excel (*.xlsx);;JSON (*.json)"
+CHUNK_SIZE = 1000
+
+
+class CsvWriter:
+    def __init__(self, path: str, headers: Sequence[str]) -> None:
+        self._file = open(path, "w", encoding="UTF-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+
+    def write(self, row: Sequence[Any]) -> None:
+        self._writer.writerow(row)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonWriter:
+    def __init__(self, path: str, headers: Sequence[str]) -> None:
+        self._file = open(path, "w", encoding="UTF-8")
+        self._headers = headers
+        self._separator = "\n"
+        self._file.write("[")
+
+    def write(self, row: Sequence[Any]) -> None:
+        self._file.write(self._separator)
+        self._file.write(json.dumps(dict(zip(self._headers, row)), ensure_ascii=False))
+        self._separator = ",\n"
+
+    def close(self) -> None:
+        self._file.write("\n]\n")
+        self._file.close()
+
+
+class XlsxWriter:
+    def __init__(self, path: str, headers: Sequence[str]) -> None:
+        from openpyxl import Workbook
+
+        self._path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+        self._sheet.append(list(headers))
+
+    def write(self, row: Sequence[Any]) -> None:
+        self._sheet.append(list(row))
+
+    def close(self) -> None:
+        self._workbook.save(self._path)
+
+
+WRITERS = {
+    ".csv": CsvWriter,
+    ".xlsx": XlsxWriter,
+    ".json": JsonWriter,
+}
+
+
+def export_statement(
+    model: Type[BaseTableModel],
+    statement: SelectOfScalar,
+    path: str,
+    progress=None,
+    is_cancelled=None,
+) -> bool:
+    """
+    Streams the rows of a statement into a file formatted by the model's `GENERATORS`.
+
+    Rows are fetched in chunks with `yield_per`, rendered and written one by one,
+    so memory usage does not depend on the number of rows.
+
+    Args:
+        model (Type[BaseTableModel]): The table model that defines the columns.
+        statement (SelectOfScalar): The ordered statement to export.
+        path (str): The destination file; its extension selects the format.
+        progress (Callable[[int], None] | None): Called with the number of written rows after each chunk.
+        is_cancelled (Callable[[], bool] | None): Polled after each chunk to stop the export.
+
+    Returns:
+        bool: False if the export was cancelled and the file was removed.
+    """
+    writer = WRITERS[splitext(path)[1].lower()](path, list(model.GENERATORS.keys()))
+    count = 0
+    completed = False
+    try:
+        with Session(READONLY_ENGINE) as session:
+            for item in session.exec(statement.execution_options(yield_per=CHUNK_SIZE)):
+                writer.write(model.render(item))
+                count += 1
+                if count % CHUNK_SIZE == 0:
+                    if progress:
+                        progress(count)
+                    if is_cancelled and is_cancelled():
+                        break
+            else:
+                completed = True
+        if progress:
+            progress(count)
+    finally:
+        writer.close()
+        if not completed:
+            remove(path)
+    return completed
+
+
+class ExportWorker(QtCore.QObject):
+    progressed = pyqtSignal(int)
+    finished = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+
+    def __init__(self, model: Type[BaseTableModel], statement: SelectOfScalar, path: str) -> None:
+        super().__init__()
+        self._model = model
+        self._statement = statement
+        self._path = path
+        self._cancelled = False
+
+    @pyqtSlot()
+    def run(self) -> None:
+        try:
+            completed = export_statement(
+                self._model,
+                self._statement,
+                self._path,
+                self.progressed.emit,
+                lambda: self._cancelled,
+            )
+        except Exception as error:
+            self.failed.emit(str(error))
+        else:
+            self.finished.emit(completed)
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+
+class ExportProgressDialog(QtWidgets.QProgressDialog):
+    def __init__(self, model: BaseTableModel, path: str, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__("Экспорт данных…", "Отмена", 0, model.total, parent)
+        self.setWindowTitle("Экспорт")
+        self.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.setAttribute(QtCore.Qt.WidgetAttribute.WA_DeleteOnClose)
+        self._path = path
+
+        self._thread = QtCore.QThread(self)
+        self._worker = ExportWorker(type(model), model.query, path)
+        self._worker.moveToThread(self._thread)
+
+        self._thread.started.connect(self._worker.run)
+        self._worker.progressed.connect(self.setValue)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.failed.connect(self._on_failed)
+        self.canceled.connect(self._worker.cancel, QtCore.Qt.ConnectionType.DirectConnection)
+
+        self._thread.start()
+
+    def _stop(self) -> None:
+        self._thread.quit()
+        self._thread.wait()
+        self.close()
+
+    def _on_finished(self, completed: bool) -> None:
+        self._stop()
+        if completed:
+            QtWidgets.QMessageBox.information(
+                self.parent(), "Экспорт завершён", f"Файл был успешно сохранён в '{self._path}'."
+            )
+
+    def _on_failed(self, message: str) -> None:
+        self._stop()
+        QtWidgets.QMessageBox.critical(self.parent(), "Ошибка экспорта", message)
+
+
+def export_table(model: BaseTableModel, parent: QtWidgets.QWidget) -> None:
+    path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
+        parent, "Укажите путь", expanduser("~"), FILE_FILTERS
+    )
+    if not path:
+        return
+    if splitext(path)[1].lower() not in WRITERS:
+        path += selected_filter[selected_filter.index("*") + 1:-1]
+
+    ExportProgressDialog(model, path, parent).show()
@@ -0,0 +1,112 @@
+"""
+Compiled `.ui` forms.
+
+Every `.ui` file is compiled to a Python module in `UI_CACHE_DIR` whose name
+contains a hash of the file, so an edited form is recompiled and an unchanged
+one never is. The modules can be built ahead of time:
+
+    python -m app.ui.forms [app/ui/assets]
+"""
+import glob
+import hashlib
+import importlib.util
+import io
+import os
+import sys
+from typing import Dict, List
+
+from PyQt6 import uic
+from PyQt6.QtWidgets import QWidget
+
+from app.config import UI_CACHE_DIR
+
+__all__ = ["load_ui", "build"]
+
+_forms: Dict[str, type] = {}
+
+
+def _module_name(ui_path: str) -> str:
+    return os.path.splitext(os.path.normpath(ui_path))[0].replace(os.sep, "_").replace("-", "_")
+
+
+def _module_path(ui_path: str) -> str:
+    with open(ui_path, "rb") as file:
+        digest = hashlib.sha1(file.read()).hexdigest()[:12]
+    return os.path.join(UI_CACHE_DIR, f"{_module_name(ui_path)}_{digest}.py")
+
+
+def _source(ui_path: str) -> str:
+    source = io.StringIO()
+    uic.compileUi(ui_path, source)
+    return source.getvalue()
+
+
+def _write(ui_path: str, module_path: str, source: str) -> None:
+    os.makedirs(UI_CACHE_DIR, exist_ok=True)
+    for outdated in glob.glob(os.path.join(UI_CACHE_DIR, f"{_module_name(ui_path)}_{'[0-9a-f]' * 12}.py")):
+        os.remove(outdated)
+    with open(f"{module_path}.tmp", "w", encoding="UTF-8") as file:
+        file.write(source)
+    os.replace(f"{module_path}.tmp", module_path)
+
+
+def _compile(ui_path: str) -> type:
+    module_path = _module_path(ui_path)
+    if os.path.exists(module_path):
+        spec = importlib.util.spec_from_file_location(os.path.basename(module_path)[:-3], module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        namespace = vars(module)
+    else:
+        source = _source(ui_path)
+        try:
+            _write(ui_path, module_path, source)
+        except OSError:
+            # A read-only installation still works, it just compiles on every start.
+            pass
+        namespace = {}
+        exec(compile(source, ui_path, "exec"), namespace)
+    return next(value for name, value in namespace.items() if name.startswith("Ui_"))
+
+
+def load_ui(ui_path: str, widget: QWidget) -> None:
+    """
+    Builds the form from a `.ui` file on the widget, like `uic.loadUi` does.
+
+    The file is compiled once and the compiled class is reused for every
+    widget built from it, so the XML is not parsed on every construction.
+
+    Args:
+        ui_path (str): The path of the `.ui` file.
+        widget (QWidget): The widget to set up; named children become its attributes.
+    """
+    if ui_path not in _forms:
+        _forms[ui_path] = _compile(ui_path)
+    form = _forms[ui_path]()
+    form.setupUi(widget)
+    for name, value in vars(form).items():
+        setattr(widget, name, value)
+
+
+def build(directory: str = "app/ui/assets") -> List[str]:
+    """
+    Compiles every `.ui` file of a directory whose module is missing or outdated.
+
+    Args:
+        directory (str): The directory searched recursively for `.ui` files.
+
+    Returns:
+        List[str]: The paths of the compiled modules.
+    """
+    built = []
+    for ui_path in sorted(glob.glob(os.path.join(directory, "**", "*.ui"), recursive=True)):
+        module_path = _module_path(ui_path)
+        if not os.path.exists(module_path):
+            _write(ui_path, module_path, _source(ui_path))
+            built.append(module_path)
+    return built
+
+
+if __name__ == "__main__":
+    for path in build(*sys.argv[1:]):
+        print(path)
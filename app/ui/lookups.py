@@ -0,0 +1,151 @@
+from typing import Dict, List, Set, Type
+
+from PyQt6.QtCore import QObject, QStringListModel, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QComboBox
+
+from app.db import lookup
+from app.db.models import UniqueNamedModel
+from app.ui.tasks import QueryTask, run_query
+
+__all__ = ["preload_names", "name_list_model", "keep_current_text", "set_name_list"]
+
+
+class NameListModels(QObject):
+    """
+    Keeps one shared list model of names per unique named model.
+
+    Every combobox listing e.g. locations uses the same model, so the names
+    are fetched once per change of the table instead of once per dialog.
+    Changes arrive from the lookup cache and are coalesced until the event
+    loop runs, so a burst of edits causes a single reload. Reloads run off
+    the GUI thread and refill the lookup cache of every changed model, one
+    at a time; changes arriving meanwhile are reloaded after it.
+    """
+
+    invalidated = pyqtSignal(object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._models: Dict[Type[UniqueNamedModel], QStringListModel] = {}
+        self._stale: Set[Type[UniqueNamedModel]] = set()
+        self._task: QueryTask | None = None
+        self.invalidated.connect(self.reload)
+        lookup.subscribe(self.invalidated.emit)
+
+    def get(self, model: Type[UniqueNamedModel]) -> QStringListModel:
+        if model not in self._models:
+            self._models[model] = QStringListModel(lookup.names(model), self)
+        return self._models[model]
+
+    def reload(self, model: Type[UniqueNamedModel]) -> None:
+        """Reloads the names of a model once the event loop runs."""
+        if not self._stale:
+            QTimer.singleShot(0, self._reload)
+        self._stale.add(model)
+
+    def _reload(self) -> None:
+        if self._task is not None or not self._stale:
+            return
+        stale, self._stale = self._stale, set()
+        self._task = run_query(
+            lambda session: {model: lookup.names(model, session) for model in stale},
+            self._on_reloaded,
+            self._on_failed,
+        )
+
+    def _on_reloaded(self, names: Dict[Type[UniqueNamedModel], List[str]]) -> None:
+        self._task = None
+        for model, model_names in names.items():
+            # A model changed again is set with the next reload.
+            if model in self._models and model not in self._stale:
+                self._models[model].setStringList(model_names)
+        self._reload()
+
+    def _on_failed(self, _: str) -> None:
+        # The lists keep the previous names until the next change.
+        self._task = None
+        self._reload()
+
+
+class _CurrentTextKeeper(QObject):
+    """
+    Keeps the choice of a combobox while its shared list model is reset.
+
+    A reset would otherwise select the first name, e.g. after another
+    dialog or client adds a location. The combobox does not report the
+    intermediate choice; if the chosen name is gone, the choice is cleared.
+    Being a child of the combobox, it disconnects from the model with it.
+    """
+
+    def __init__(self, combobox: QComboBox) -> None:
+        super().__init__(combobox)
+        self._combobox = combobox
+        self._text = ""
+        self._blocked = False
+        combobox.model().modelAboutToBeReset.connect(self._save)
+        combobox.model().modelReset.connect(self._restore)
+
+    def _save(self) -> None:
+        self._text = self._combobox.currentText()
+        self._blocked = self._combobox.blockSignals(True)
+
+    def _restore(self) -> None:
+        combobox = self._combobox
+        index = combobox.findText(self._text)
+        if combobox.isEditable():
+            combobox.setEditText(self._text)
+        elif index >= 0:
+            combobox.setCurrentIndex(index)
+        combobox.blockSignals(self._blocked)
+        if not combobox.isEditable() and index < 0:
+            combobox.setCurrentIndex(-1)
+
+
+_instance: NameListModels | None = None
+
+
+def _shared() -> NameListModels:
+    global _instance
+    if _instance is None:
+        _instance = NameListModels()
+    return _instance
+
+
+def preload_names() -> None:
+    """
+    Loads the names of all unique named models into the lookup cache off the GUI thread.
+
+    Called at startup, so the first dialogs and filters find the names cached.
+    """
+    for model in UniqueNamedModel.__subclasses__():
+        _shared().reload(model)
+
+
+def name_list_model(model: Type[UniqueNamedModel]) -> QStringListModel:
+    """
+    Returns the shared list model with the names of a unique named model.
+
+    Args:
+        model (Type[UniqueNamedModel]): The model class, e.g. `Location`.
+
+    Returns:
+        QStringListModel: The model to pass to `QComboBox.setModel`.
+    """
+    return _shared().get(model)
+
+
+def keep_current_text(combobox: QComboBox) -> None:
+    """Keeps the choice of a combobox across resets of its current model, see `_CurrentTextKeeper`."""
+    _CurrentTextKeeper(combobox)
+
+
+def set_name_list(combobox: QComboBox, model: Type[UniqueNamedModel]) -> None:
+    """
+    Makes a combobox list the names of a unique named model and keep its choice across reloads.
+
+    Args:
+        combobox (QComboBox): The combobox to fill.
+        model (Type[UniqueNamedModel]): The model class, e.g. `Location`.
+    """
+    combobox.setModel(name_list_model(model))
+    keep_current_text(combobox)
@@ -1,18 +1,41 @@
-from typing import Any, Callable, Dict, Set, TypeVar, Generic
+from typing import Any, Callable, Dict, List, Set, Tuple, TypeVar, Generic
 
 from PyQt6.QtCore import (
     QObject,
     Qt,
+    pyqtSignal,
     QAbstractListModel,
     QAbstractTableModel,
     QModelIndex,
 )
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import QMessageBox
-from sqlmodel import Session
+from sqlalchemy import ColumnElement
+from sqlalchemy.orm import InstrumentedAttribute, selectinload
+from sqlalchemy.sql.base import ExecutableOption
+from sqlmodel import Session, select, func, and_, or_
+from sqlmodel.sql.expression import SelectOfScalar
 
 from app.db import ENGINE
-from app.db.models import BaseModel, Club, Reservation, Scope, UniqueNamedModel, Event, Assignment, Weekday
+from app.db.bulk import chunked
+from app.db.changes import Changes
+from app.db.query import RelationshipPath
+from app.ui.tasks import QueryTask, run_query
+from app.db.models import (
+    AssignmentType,
+    BaseModel,
+    Club,
+    ClubType,
+    DaySchedule,
+    EventType,
+    Location,
+    Reservation,
+    Scope,
+    Teacher,
+    UniqueNamedModel,
+    Event,
+    Assignment,
+)
 from app.ui.widgets.schedule import WEEKDAY_NAMES
 
 TBaseNamedModel = TypeVar("TBaseNamedModel", bound=UniqueNamedModel)
@@ -146,13 +169,215 @@ class TypeListModel(Generic[TBaseNamedModel], QAbstractListModel):
         return self.__orig_class__.__args__[0]
 
 
+def _name_of(model: type[UniqueNamedModel], foreign_key: InstrumentedAttribute) -> ColumnElement:
+    return func.coalesce(
+        select(model.name)
+        .where(model.id == foreign_key)
+        .correlate(foreign_key.class_)
+        .scalar_subquery(),
+        "",
+    )
+
+
+def _reaches(item: BaseModel, path: RelationshipPath, ids: Set[int]) -> bool:
+    """Tells whether one of the objects at the end of a loaded relationship path has one of the ids."""
+    objects = [item]
+    for relationship in path:
+        step = []
+        for obj in objects:
+            value = getattr(obj, relationship.key)
+            if relationship.uselist:
+                step.extend(value)
+            elif value is not None:
+                step.append(value)
+        objects = step
+    return any(obj.id in ids for obj in objects)
+
+
 class BaseTableModel(Generic[TModel], QAbstractTableModel):
     GENERATORS: Dict[str, Callable[[TModel], Any]] | None = None
+    SORTING: Dict[str, ColumnElement] = {}
+    OPTIONS: Tuple[ExecutableOption, ...] = ()
+    PAGE_SIZE: int = 256
 
-    def __init__(self, data: Set[TModel], parent: QObject | None = None) -> None:
+    loadingChanged = pyqtSignal(bool)
+    totalChanged = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        statement: SelectOfScalar[TModel],
+        parent: QObject | None = None,
+        column: int = -1,
+        order: Qt.SortOrder = Qt.SortOrder.AscendingOrder,
+    ) -> None:
         super().__init__(parent)
-        self._data = data
+        self._statement = statement
+        self._entity = statement.column_descriptions[0]["entity"]
         self._headers = list(self.GENERATORS.keys())
+        self._task: QueryTask | None = None
+        # Patches and reloads in flight; their results only apply to the rows of their generation.
+        self._updates: Set[QueryTask] = set()
+        self._generation = 0
+        self.total: int | None = None
+        self._set_order(column, order)
+        self._reset()
+
+    @classmethod
+    def render(cls, item: TModel) -> Tuple[Any, ...]:
+        return tuple(generator(item) for generator in cls.GENERATORS.values())
+
+    @property
+    def loading(self) -> bool:
+        return self._task is not None
+
+    @property
+    def complete(self) -> bool:
+        return self._exhausted and self._task is None and self.total == len(self._data)
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.loadingChanged.emit(False)
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        self.beginResetModel()
+        self._set_order(column, order)
+        self._reset()
+        self.endResetModel()
+
+    def setStatement(self, statement: SelectOfScalar[TModel]) -> None:
+        self.beginResetModel()
+        self._statement = statement
+        self.total = None
+        self._reset()
+        self.endResetModel()
+
+    def narrow(self, statement: SelectOfScalar[TModel], accepts: Callable[[TModel], bool]) -> None:
+        """
+        Switches to a statement matching a subset of the loaded rows without a query.
+
+        Only valid when all rows are loaded (see `complete`) and `accepts`
+        mirrors the difference between the old and the new statement.
+        """
+        self.beginResetModel()
+        self._discard_updates()
+        self._statement = statement
+        kept = [(item, row) for item, row in zip(self._data, self._rows) if accepts(item)]
+        self._data = [item for item, _ in kept]
+        self._rows = [row for _, row in kept]
+        self.total = len(self._data)
+        self.endResetModel()
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted and self._task is None
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if self._task is None and not self._exhausted:
+            self._start(self._page_job(count=False))
+
+    def _set_order(self, column: int, order: Qt.SortOrder) -> None:
+        header = self._headers[column] if 0 <= column < len(self._headers) else None
+        self._key = self.SORTING.get(header, self._entity.created_at)
+        self._descending = header in self.SORTING and order == Qt.SortOrder.DescendingOrder
+
+    def _reset(self) -> None:
+        self.cancel()
+        self._discard_updates()
+        self._data: List[TModel] = []
+        self._rows: List[Tuple[Any, ...]] = []
+        self._cursor: Tuple[Any, Any] | None = None
+        self._exhausted = False
+        self._start(self._page_job(count=self.total is None))
+
+    def _start(self, job: Callable[[Session], Any], on_finished: Callable[[Any], None] | None = None) -> None:
+        self._task = run_query(job, on_finished or self._on_page_loaded, self._on_failed)
+        self.loadingChanged.emit(True)
+
+    def _discard_updates(self) -> None:
+        self._generation += 1
+        for task in self._updates:
+            task.cancel()
+        self._updates.clear()
+
+    def _update(self, job: Callable[[Session], Any], on_finished: Callable[[Any], None]) -> None:
+        """Runs a patch or reload, dropping its result if the rows were reset in the meantime."""
+        generation = self._generation
+
+        def finished(result) -> None:
+            self._updates.discard(task)
+            if generation == self._generation:
+                on_finished(result)
+
+        def failed(message: str) -> None:
+            self._updates.discard(task)
+            if generation == self._generation:
+                self.failed.emit(message)
+
+        task = run_query(job, finished, failed)
+        self._updates.add(task)
+
+    @property
+    def query(self) -> SelectOfScalar[TModel]:
+        key, id = self._key, self._entity.id
+        if self._descending:
+            statement = self._statement.order_by(key.desc(), id.desc())
+        else:
+            statement = self._statement.order_by(key.asc(), id.asc())
+        return statement.options(*self.OPTIONS)
+
+    def _follows(self, key_value: Any, id_value: int, after: bool = True) -> ColumnElement[bool]:
+        """Matches the rows ordered after (or before) the row with the given sort key and id."""
+        key, id = self._key, self._entity.id
+        if self._descending == after:
+            return or_(key < key_value, and_(key == key_value, id < id_value))
+        return or_(key > key_value, and_(key == key_value, id > id_value))
+
+    def _page_job(self, count: bool) -> Callable[[Session], Any]:
+        # The sort key is selected with the rows, so the last one gives the cursor.
+        statement = self.query.add_columns(self._key).limit(self.PAGE_SIZE)
+
+        if self._cursor is not None:
+            statement = statement.where(self._follows(*self._cursor))
+
+        total = select(func.count()).select_from(self._statement.subquery()) if count else None
+        render = self.render
+
+        def job(session: Session):
+            rows = session.execute(statement).all()
+            items = [item for item, _ in rows]
+            cursor = (rows[-1][1], items[-1].id) if rows else None
+            return (
+                items,
+                [render(item) for item in items],
+                cursor,
+                session.exec(total).one() if total is not None else None,
+            )
+
+        return job
+
+    def _on_page_loaded(self, result) -> None:
+        items, rows, cursor, total = result
+        self._task = None
+        if total is not None:
+            self.total = total
+        if cursor is not None:
+            self._cursor = cursor
+        if len(items) < self.PAGE_SIZE:
+            self._exhausted = True
+        if items:
+            self.beginInsertRows(QModelIndex(), len(self._data), len(self._data) + len(items) - 1)
+            self._data.extend(items)
+            self._rows.extend(rows)
+            self.endInsertRows()
+        self.loadingChanged.emit(False)
+
+    def _on_failed(self, message: str) -> None:
+        self._task = None
+        self._exhausted = True
+        self.loadingChanged.emit(False)
+        self.failed.emit(message)
 
     def headerData(
         self, section: int, orientation: Qt.Orientation, role: int = ...
@@ -172,28 +397,255 @@ class BaseTableModel(Generic[TModel], QAbstractTableModel):
 
     def data(self, index: QModelIndex, role: int = ...) -> Any:
         if role == Qt.ItemDataRole.DisplayRole:
-            item = self._data[index.row()]
-            with Session(ENGINE) as session:
-                session.add(item)
-                return list(self.GENERATORS.values())[index.column()](item)
+            return self._rows[index.row()][index.column()]
 
-    def removeRow(self, row: int, parent: QModelIndex = QModelIndex()) -> bool:
-        self.beginRemoveRows(parent, row, row)
-        item = self._data[row]
-        self._data.remove(item)
+    def removeRows(self, row: int, count: int, parent: QModelIndex = QModelIndex()) -> bool:
+        self.beginRemoveRows(parent, row, row + count - 1)
+        del self._data[row:row + count]
+        del self._rows[row:row + count]
+        self.total -= count
         self.endRemoveRows()
         return True
 
+    def removeRow(self, row: int, parent: QModelIndex = QModelIndex()) -> bool:
+        return self.removeRows(row, 1, parent)
+
+    def reloadRows(self, rows: List[int], referencing: Tuple[Tuple[RelationshipPath, Set[int]], ...] = ()) -> None:
+        """
+        Re-fetches the objects of the given rows in chunks.
+
+        Args:
+            rows (List[int]): The rows to reload.
+            referencing (Tuple[Tuple[RelationshipPath, Set[int]], ...]): Related objects whose
+                referencing rows are reloaded too, found with a query through the path.
+        """
+        ids = [self._data[row].id for row in rows]
+        loaded = {item.id for item in self._data}
+        statement = self._statement.options(*self.OPTIONS)
+        entity, render = self._entity, self.render
+
+        def job(session: Session):
+            reloaded = list(ids)
+            for path, related_ids in referencing:
+                parents = select(entity.id)
+                for relationship in path:
+                    parents = parents.join(relationship.class_attribute)
+                target = path[-1].mapper.class_
+                for chunk in chunked(related_ids):
+                    reloaded.extend(id for id in session.exec(parents.where(target.id.in_(chunk))) if id in loaded)
+            reloaded = list(dict.fromkeys(reloaded))
+            found = {}
+            for chunk in chunked(reloaded):
+                for item in session.exec(statement.where(entity.id.in_(chunk))).all():
+                    found[item.id] = (item, render(item))
+            return reloaded, found
+
+        self._update(job, lambda result: self._on_rows_reloaded(*result))
+
+    @classmethod
+    def relationshipPaths(cls) -> List[RelationshipPath]:
+        """Returns the relationship paths the rows are rendered from, as loaded by `OPTIONS`."""
+        paths: List[RelationshipPath] = []
+        for option in cls.OPTIONS:
+            for element in option.context:
+                # The path alternates mappers and relationships, starting with the entity's mapper.
+                path = tuple(element.path.path[1::2])
+                if path not in paths:
+                    paths.append(path)
+        return paths
+
+    def reloadRelated(self, committed: Changes) -> None:
+        """
+        Reloads the rows showing related objects of a change set.
+
+        Rows reaching an updated or deleted object through one of the
+        `relationshipPaths` are found in memory; new objects can only be
+        shown by rows reaching them through a collection, which are found
+        with a query. Objects of other models leave the rows alone. A model
+        changed as a whole reloads all loaded rows.
+        """
+        rows: Set[int] = set()
+        referencing = []
+        for path in self.relationshipPaths():
+            changes = committed.get(path[-1].mapper.class_)
+            if not changes:
+                continue
+            if changes.whole:
+                self.reloadLoaded()
+                return
+            changed = changes.updated | changes.deleted
+            if changed:
+                rows.update(row for row, item in enumerate(self._data) if _reaches(item, path, changed))
+            if changes.inserted and any(relationship.uselist for relationship in path):
+                referencing.append((path, set(changes.inserted)))
+        if rows or referencing:
+            self.reloadRows(sorted(rows), tuple(referencing))
+
+    def patchRows(self, ids: List[int]) -> None:
+        """
+        Re-fetches the given objects and patches only their rows.
+
+        Rows that still match the statement are replaced or moved to where the
+        ordering puts them, rows that no longer match are removed, and new
+        objects are inserted unless they sort after the loaded rows, in which
+        case a later page brings them. The cost does not depend on the size of
+        the table: one query for the objects, one per object for its position
+        and one for the total. A change set larger than a page reloads the
+        loaded rows instead (see `reloadLoaded`).
+        """
+        if len(ids) > self.PAGE_SIZE:
+            self.reloadLoaded()
+            return
+
+        statement = self._statement.options(*self.OPTIONS).add_columns(self._key)
+        total = select(func.count()).select_from(self._statement.subquery())
+        entity, key, render, follows = self._entity, self._key, self.render, self._follows
+        base = self._statement
+
+        def job(session: Session):
+            found = {}
+            for chunk in chunked(ids):
+                for item, key_value in session.execute(statement.where(entity.id.in_(chunk))).all():
+                    position = session.exec(
+                        select(func.count()).select_from(base.where(follows(key_value, item.id, False)).subquery())
+                    ).one()
+                    found[item.id] = (item, render(item), position)
+            return found, session.exec(total).one()
+
+        self._update(job, lambda result: self._on_rows_patched(ids, *result))
+
+    def reloadLoaded(self) -> None:
+        """
+        Re-fetches as many rows as are loaded, page by page, and replaces them at once.
+
+        Used for change sets too large to place row by row; it takes one
+        query per page and one for the total. Page loads wait for it.
+        """
+        self.cancel()
+        self._discard_updates()
+        count = max(len(self._data), self.PAGE_SIZE)
+        statement = self.query.add_columns(self._key).limit(self.PAGE_SIZE)
+        total = select(func.count()).select_from(self._statement.subquery())
+        render, follows, page_size = self.render, self._follows, self.PAGE_SIZE
+
+        def job(session: Session):
+            items, cursor, exhausted = [], None, False
+            while len(items) < count:
+                page = statement if cursor is None else statement.where(follows(*cursor))
+                chunk = session.execute(page).all()
+                items.extend(item for item, _ in chunk)
+                if len(chunk) < page_size:
+                    exhausted = True
+                if chunk:
+                    cursor = (chunk[-1][1], chunk[-1][0].id)
+                if exhausted:
+                    break
+            return items, [render(item) for item in items], cursor, exhausted, session.exec(total).one()
+
+        self._start(job, self._on_loaded_reloaded)
+
+    def _on_loaded_reloaded(self, result) -> None:
+        items, rows, cursor, exhausted, total = result
+        self._task = None
+        self.beginResetModel()
+        self._data, self._rows = items, rows
+        self._cursor, self._exhausted, self.total = cursor, exhausted, total
+        self.endResetModel()
+        self.totalChanged.emit()
+        self.loadingChanged.emit(False)
+
+    def _on_rows_patched(
+        self, ids: List[int], found: Dict[int, Tuple[TModel, Tuple[Any, ...], int]], total: int
+    ) -> None:
+        positions = {item.id: row for row, item in enumerate(self._data)}
+        if all(id in found and positions.get(id) == found[id][2] for id in ids):
+            # The usual edit: the rows stay where they are.
+            for id in ids:
+                row = positions[id]
+                self._data[row], self._rows[row], _ = found[id]
+                self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+            return
+
+        self.removeRowSet([positions[id] for id in ids if id in positions])
+        self.total = total
+        for id in sorted(found, key=lambda id: found[id][2]):
+            item, row, position = found[id]
+            if position < len(self._data) or self._exhausted:
+                position = min(position, len(self._data))
+                self.beginInsertRows(QModelIndex(), position, position)
+                self._data.insert(position, item)
+                self._rows.insert(position, row)
+                self.endInsertRows()
+        self.totalChanged.emit()
+
+    def _on_rows_reloaded(self, ids: List[int], found: Dict[int, Tuple[TModel, Tuple[Any, ...]]]) -> None:
+        positions = {item.id: row for row, item in enumerate(self._data)}
+        removed = []
+        for id in ids:
+            row = positions.get(id)
+            if row is None:
+                continue
+            if id not in found:
+                removed.append(row)
+                continue
+            self._data[row], self._rows[row] = found[id]
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+        self.removeRowSet(removed)
+
+    def removeRowSet(self, rows: List[int]) -> None:
+        ranges: List[List[int]] = []
+        for row in sorted(rows):
+            if ranges and ranges[-1][1] == row:
+                ranges[-1][1] += 1
+            else:
+                ranges.append([row, row + 1])
+        for start, stop in reversed(ranges):
+            self.removeRows(start, stop - start)
+
 
 class ScheduleTableModel(QAbstractTableModel):
     DATE_FMT = "%H:%M"
 
-    def __init__(self, data: list[Club], parent: QObject | None = None) -> None:
-        self._data = data
+    def __init__(self, titles: List[str], cells: List[str | None], parent: QObject | None = None) -> None:
+        self._titles = titles
+        self._cells = cells
         super().__init__(parent)
-        
+
+    @classmethod
+    def query(cls, session: Session) -> Tuple[List[str], List[str | None]]:
+        statement = (
+            select(
+                Club.id,
+                Club.title,
+                DaySchedule.weekday,
+                DaySchedule.start_at,
+                DaySchedule.end_at,
+                Location.name,
+                Teacher.name,
+            )
+            .outerjoin(DaySchedule, DaySchedule.club_id == Club.id)
+            .outerjoin(Location, Club.location_id == Location.id)
+            .outerjoin(Teacher, Club.teacher_id == Teacher.id)
+            .order_by(Club.id)
+        )
+
+        columns = len(WEEKDAY_NAMES)
+        titles: List[str] = []
+        cells: List[str | None] = []
+        last_id = None
+        for club_id, title, weekday, start_at, end_at, location, teacher in session.exec(statement):
+            if club_id != last_id:
+                last_id = club_id
+                titles.append(title)
+                cells.extend([None] * columns)
+            if weekday is not None:
+                cells[(len(titles) - 1) * columns + weekday.value - 1] = (
+                    f"{start_at.strftime(cls.DATE_FMT)} - {end_at.strftime(cls.DATE_FMT)} - {location} - {teacher}"
+                )
+        return titles, cells
+
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
-        return len(self._data)
+        return len(self._titles)
     
     def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
         return len(WEEKDAY_NAMES)
@@ -203,24 +655,20 @@ class ScheduleTableModel(QAbstractTableModel):
             return super().headerData(section, orientation, role)
 
         if orientation == Qt.Orientation.Vertical:
-            return self._data[section].title
+            return self._titles[section]
         return list(WEEKDAY_NAMES.values())[section]
     
     def data(self, index: QModelIndex, role: int = ...) -> Any:
         if role != Qt.ItemDataRole.DisplayRole:
             return
-        weekday = Weekday(index.column() + 1)
-        with Session(ENGINE) as session:
-            club: Club | None = session.get(Club, self._data[index.row()].id)
-            if club is None:
-                return
-            schedule_day = next((d for d in club.days if d.weekday == weekday), None)
-            if not schedule_day:
-                return
-            return f"{schedule_day.start_at.strftime(self.DATE_FMT)} - {schedule_day.end_at.strftime(self.DATE_FMT)} - {club.location.name if club.location else None} - {club.teacher.name if club.teacher else None}" 
+        return self._cells[index.row() * len(WEEKDAY_NAMES) + index.column()]
 
 
 class EventTableModel(BaseTableModel[Event]):
+    OPTIONS = (
+        selectinload(Event.type),
+        selectinload(Event.reservations).selectinload(Reservation.location),
+    )
     GENERATORS = {
         "Заголовок": lambda e: e.title,
         "Пространство": lambda e: SCOPES[e.scope],
@@ -230,9 +678,22 @@ class EventTableModel(BaseTableModel[Event]):
         "Дата создания": lambda e: e.created_at.strftime(DATE_FORMAT),
         "Описание": lambda e: e.description,
     }
+    SORTING = {
+        "Заголовок": Event.title,
+        "Пространство": Event.scope,
+        "Разновидность": _name_of(EventType, Event.type_id),
+        "Дата начала": Event.start_at,
+        "Дата создания": Event.created_at,
+        "Описание": func.coalesce(Event.description, ""),
+    }
 
 
 class AssignmentTableModel(BaseTableModel[Assignment]):
+    OPTIONS = (
+        selectinload(Assignment.location),
+        selectinload(Assignment.type),
+        selectinload(Assignment.event),
+    )
     GENERATORS = {
         "Помещение": lambda a: a.location.name if a.location else None,
         "Разновидность": lambda a: a.type.name,
@@ -242,6 +703,21 @@ class AssignmentTableModel(BaseTableModel[Assignment]):
         "Дата создания": lambda a: a.created_at.strftime(DATE_FORMAT),
         "Описание": lambda a: a.description,
     }
+    SORTING = {
+        "Помещение": _name_of(Location, Assignment.location_id),
+        "Разновидность": _name_of(AssignmentType, Assignment.type_id),
+        "Мероприятие": func.coalesce(
+            select(Event.title)
+            .where(Event.id == Assignment.event_id)
+            .correlate(Assignment)
+            .scalar_subquery(),
+            "",
+        ),
+        "Статус": Assignment.state,
+        "Дедлайн": Assignment.deadline,
+        "Дата создания": Assignment.created_at,
+        "Описание": func.coalesce(Assignment.description, ""),
+    }
 
     STATUS_COLORS = {
         Assignment.State.DRAFT: None,
@@ -258,6 +734,11 @@ class AssignmentTableModel(BaseTableModel[Assignment]):
 
 
 class ReservaionTableModel(BaseTableModel[Reservation]):
+    OPTIONS = (
+        selectinload(Reservation.location),
+        selectinload(Reservation.areas),
+        selectinload(Reservation.event),
+    )
     GENERATORS = {
         "Помещение": lambda r: r.location.name if r.location else None,
         "Зоны": lambda r: str.join(", ", (a.name for a in r.areas)) if any(r.areas) else None,
@@ -267,9 +748,29 @@ class ReservaionTableModel(BaseTableModel[Reservation]):
         "Комментарий": lambda r: r.comment,
         "Дата создания": lambda r: r.created_at.strftime(DATE_FORMAT),
     }
+    SORTING = {
+        "Помещение": _name_of(Location, Reservation.location_id),
+        "Мероприятие": func.coalesce(
+            select(Event.title)
+            .where(Event.id == Reservation.event_id)
+            .correlate(Reservation)
+            .scalar_subquery(),
+            "",
+        ),
+        "Дата начала": Reservation.start_at,
+        "Дата конца": Reservation.end_at,
+        "Комментарий": func.coalesce(Reservation.comment, ""),
+        "Дата создания": Reservation.created_at,
+    }
 
 
 class ClubTableModel(BaseTableModel[Club]):
+    OPTIONS = (
+        selectinload(Club.location),
+        selectinload(Club.teacher),
+        selectinload(Club.type),
+        selectinload(Club.days),
+    )
     GENERATORS = {
         "Заголовок": lambda c: c.title,
         "Помещение": lambda c: c.location.name if c.location else None,
@@ -279,6 +780,20 @@ class ClubTableModel(BaseTableModel[Club]):
         "Расписание": lambda c: f"{len(c.days)} раз(а) в неделю",
         "Дата создания": lambda c: c.created_at.strftime(DATE_FORMAT),
     }
+    SORTING = {
+        "Заголовок": Club.title,
+        "Помещение": _name_of(Location, Club.location_id),
+        "Преподаватель": _name_of(Teacher, Club.teacher_id),
+        "Вид": _name_of(ClubType, Club.type_id),
+        "Старт": Club.start_at,
+        "Расписание": (
+            select(func.count())
+            .where(DaySchedule.club_id == Club.id)
+            .correlate(Club)
+            .scalar_subquery()
+        ),
+        "Дата создания": Club.created_at,
+    }
 
 
 __all__ = [
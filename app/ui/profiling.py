@@ -0,0 +1,71 @@
+import sys
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import ContextManager, Iterator
+
+from PyQt6.QtCore import QEvent, QObject
+from PyQt6.QtWidgets import QWidget
+
+from app.config import PROFILE_STARTUP
+
+__all__ = ["start", "measure", "mark", "first_paint"]
+
+
+class StartupProfiler(QObject):
+    """
+    Prints when each component is built, painted and filled with data.
+
+    Times are counted from `start`, which the application calls before
+    creating anything; use `python -X importtime` for the imports.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._started = perf_counter()
+        self._painting = {}
+
+    def mark(self, component: str, event: str) -> None:
+        print(f"{(perf_counter() - self._started) * 1000:9.1f} ms  {component}: {event}", file=sys.stderr)
+
+    @contextmanager
+    def measure(self, component: str) -> Iterator[None]:
+        started = perf_counter()
+        yield
+        self.mark(component, f"built in {(perf_counter() - started) * 1000:.1f} ms")
+
+    def first_paint(self, widget: QWidget, component: str) -> None:
+        self._painting[widget] = component
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.Paint and watched in self._painting:
+            watched.removeEventFilter(self)
+            self.mark(self._painting.pop(watched), "first paint")
+        return False
+
+
+_profiler: StartupProfiler | None = None
+
+
+def start() -> None:
+    """Starts the profiler if `PROFILE_STARTUP` is set."""
+    global _profiler
+    if PROFILE_STARTUP:
+        _profiler = StartupProfiler()
+
+
+def measure(component: str) -> ContextManager[None]:
+    """Reports how long the block building the component takes."""
+    return _profiler.measure(component) if _profiler else nullcontext()
+
+
+def mark(component: str, event: str) -> None:
+    """Reports that something happened to the component, e.g. its data arrived."""
+    if _profiler:
+        _profiler.mark(component, event)
+
+
+def first_paint(widget: QWidget, component: str) -> None:
+    """Reports when the widget is painted for the first time."""
+    if _profiler:
+        _profiler.first_paint(widget, component)
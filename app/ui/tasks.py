@@ -0,0 +1,91 @@
+from typing import Any, Callable, Set
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from sqlmodel import Session
+
+from app.db import ENGINE, profiler
+
+__all__ = ["QueryTask", "run_query"]
+
+
+class QueryTaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    done = pyqtSignal()
+
+
+class QueryTask(QRunnable):
+    """
+    Runs a database job on the global thread pool.
+
+    The job receives its own session and must return plain data (tuples,
+    detached objects); results are delivered to the GUI thread through
+    queued signals. A cancelled task skips the job if it has not started
+    yet and never reports its result.
+    """
+
+    def __init__(self, job: Callable[[Session], Any]) -> None:
+        super().__init__()
+        self.signals = QueryTaskSignals()
+        self._job = job
+        self._cancelled = False
+        self._origin = profiler.call_stack()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def run(self) -> None:
+        try:
+            self._run()
+        finally:
+            self.signals.done.emit()
+
+    def _run(self) -> None:
+        if self._cancelled:
+            return
+        try:
+            with Session(ENGINE) as session, profiler.called_from(self._origin):
+                result = self._job(session)
+        except Exception as error:
+            if not self._cancelled:
+                self.signals.failed.emit(str(error))
+            return
+        if not self._cancelled:
+            self.signals.finished.emit(result)
+
+
+# Tasks whose signals are still to be delivered. Nothing else references a task
+# once the pool is done with it, and the garbage collector would otherwise free
+# its signals together with the slots while results are queued for them.
+_running: Set[QueryTask] = set()
+
+
+def run_query(
+    job: Callable[[Session], Any],
+    on_finished: Callable[[Any], None],
+    on_failed: Callable[[str], None] | None = None,
+) -> QueryTask:
+    """
+    Schedules a database job off the GUI thread.
+
+    Args:
+        job (Callable[[Session], Any]): The function to run with a fresh session.
+        on_finished (Callable[[Any], None]): Receives the job's result in the GUI thread.
+        on_failed (Callable[[str], None] | None): Receives the error message in the GUI thread.
+
+    Returns:
+        QueryTask: The scheduled task, which can be cancelled.
+    """
+    task = QueryTask(job)
+    _running.add(task)
+    task.signals.done.connect(lambda: _running.discard(task))
+    # The task may be cancelled after emitting but before the queued signal is delivered.
+    task.signals.finished.connect(lambda result: task.cancelled or on_finished(result))
+    if on_failed:
+        task.signals.failed.connect(lambda message: task.cancelled or on_failed(message))
+    QThreadPool.globalInstance().start(task)
+    return task
@@ -3,13 +3,14 @@ from sqlmodel import Session, select
 
 from PyQt6 import QtWidgets, QtCore
 
-from app.db import ENGINE
+from app.db import ENGINE, lookup
 from app.db.models import (
     Event,
     AssignmentType,
     Location,
     Assignment,
 )
+from app.ui.lookups import set_name_list
 from app.ui.widgets.dialogs.ext import DialogView
         
         
@@ -30,12 +31,10 @@ class AssignmentCreateDialog(DialogView):
         self.dateDateTimeEdit.setDateTime(QtCore.QDateTime.currentDateTime())
 
         with Session(ENGINE) as session:
-            workTypeNames = session.exec(select(AssignmentType.name)).all()
-            roomTypeNames = session.exec(select(Location.name)).all()
             eventNames = session.exec(select(Event.title)).all()
 
-        self.typeComboBox.addItems(eventTypeName for eventTypeName in workTypeNames)
-        self.roomComboBox.addItems(eventTypeName for eventTypeName in roomTypeNames)
+        set_name_list(self.typeComboBox, AssignmentType)
+        set_name_list(self.roomComboBox, Location)
         self.eventComboBox.addItems(eventTypeName for eventTypeName in eventNames)
 
     def accept(self) -> None:
@@ -45,8 +44,8 @@ class AssignmentCreateDialog(DialogView):
             assignment.deadline = self.dateDateTimeEdit.dateTime().toPyDateTime()
             assignment.description = self.descriptionTextEdit.toPlainText()
             assignment.event_id = session.exec(select(Event.id).where(Event.title == self.eventComboBox.currentText())).first()
-            assignment.location_id = session.exec(select(Location.id).where(Location.name == self.roomComboBox.currentText())).first()
-            assignment.type_id = session.exec(select(AssignmentType.id).where(AssignmentType.name == self.typeComboBox.currentText())).first()
+            assignment.location_id = lookup.id_of(Location, self.roomComboBox.currentText())
+            assignment.type_id = lookup.id_of(AssignmentType, self.typeComboBox.currentText())
 
             session.add(assignment)
             session.commit()
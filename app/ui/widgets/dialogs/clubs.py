@@ -1,18 +1,22 @@
-from sqlmodel import Session, select
+from sqlmodel import Session
 
 from PyQt6 import QtCore
 
-from app.db import ENGINE
+from app.db import ENGINE, lookup
+from app.db.clashes import describe, schedule_clashes
 from app.db.models import (
     Club,
     ClubType,
     Location,
     Teacher,
 )
+from app.ui.lookups import set_name_list
 from app.ui.widgets.dialogs.ext import DialogView
-from app.ui.widgets.alerts import validationError
+from app.ui.widgets.alerts import confirm, validationError
 from app.ui.widgets.schedule import DaysScheduleManagerDialog
 
+MAX_LISTED_CLASHES = 5
+
 
 class ClubCreateDialog(DialogView):
     model = Club
@@ -25,10 +29,9 @@ class ClubCreateDialog(DialogView):
 
         self.startDateEdit.setMinimumDate(QtCore.QDate.currentDate())
 
-        with Session(ENGINE) as session:
-            self.typeComboBox.addItems(session.exec(select(ClubType.name)).all())
-            self.locationComboBox.addItems(session.exec(select(Location.name)).all())
-            self.teacherComboBox.addItems(session.exec(select(Teacher.name)).all())
+        set_name_list(self.typeComboBox, ClubType)
+        set_name_list(self.locationComboBox, Location)
+        set_name_list(self.teacherComboBox, Teacher)
 
     def accept(self) -> None:
         if not self.titleLineEdit.text():
@@ -43,9 +46,17 @@ class ClubCreateDialog(DialogView):
             club.days = self.schedule_manager.days
             club.title = self.titleLineEdit.text()
             club.start_at = self.startDateEdit.date().toPyDate()
-            club.teacher_id = session.exec(select(Teacher.id).where(Teacher.name == self.teacherComboBox.currentText())).first()
-            club.location_id = session.exec(select(Location.id).where(Location.name == self.locationComboBox.currentText())).first()
-            club.type_id = session.exec(select(ClubType.id).where(ClubType.name == self.typeComboBox.currentText())).first()
+            club.teacher_id = lookup.id_of(Teacher, self.teacherComboBox.currentText())
+            club.location_id = lookup.id_of(Location, self.locationComboBox.currentText())
+            club.type_id = lookup.id_of(ClubType, self.typeComboBox.currentText())
+
+            clashes = schedule_clashes(session, club=club)
+            if clashes:
+                lines = "\n".join(describe(clash) for clash in clashes[:MAX_LISTED_CLASHES])
+                if len(clashes) > MAX_LISTED_CLASHES:
+                    lines += f"\n… и ещё {len(clashes) - MAX_LISTED_CLASHES}"
+                if not confirm(self, f"Расписание пересекается с другими занятиями:\n{lines}\n\nСохранить всё равно?"):
+                    return
 
             session.add(club)
             session.commit()
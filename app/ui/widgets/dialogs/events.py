@@ -3,7 +3,8 @@ from sqlmodel import Session, select
 
 from PyQt6 import QtWidgets, QtCore
 
-from app.db import ENGINE
+from app.db import ENGINE, lookup
+from app.db.conflicts import ReservationConflict
 from app.db.models import (
     EventType,
     Event,
@@ -11,6 +12,7 @@ from app.db.models import (
     Reservation,
     Scope,
 )
+from app.ui.lookups import set_name_list
 from app.ui.widgets.alerts import validationError
 from app.ui.widgets.wizards.reservation import ReservationWizard
 from app.ui.widgets.dialogs.ext import DialogView
@@ -31,10 +33,7 @@ class EventCreateDialog(DialogView):
     def setup_ui(self) -> None:
         self.reservationButton.clicked.connect(self.showReservationWizard)
 
-        with Session(ENGINE) as session:
-            eventTypeNames = session.exec(select(EventType.name)).all()
-
-        self.typeComboBox.addItems(eventTypeNames)
+        set_name_list(self.typeComboBox, EventType)
         self.dateDateTimeEdit.setMinimumDateTime(QtCore.QDateTime.currentDateTime())
 
     def create(self, commit=True) -> Event:
@@ -44,7 +43,7 @@ class EventCreateDialog(DialogView):
             event.title = self.titleLineEdit.text()
             event.start_at = self.dateDateTimeEdit.dateTime().toPyDateTime()
             event.description = self.descriptionTextEdit.toPlainText()
-            event.type_id = session.exec(select(EventType.id).where(EventType.name == self.typeComboBox.currentText())).first()
+            event.type_id = lookup.id_of(EventType, self.typeComboBox.currentText())
             event.scope = next(scope for scope, radio in self.scope_radios.items() if radio.isChecked())
             
             session.add(event)
@@ -77,7 +76,12 @@ class EventCreateDialog(DialogView):
             validationError(self, "Название мероприятия должно быть заполнено!")
             return
 
-        self.create()
+        try:
+            self.create()
+        except ReservationConflict as error:
+            # Someone booked the period after the wizard listed it as free.
+            validationError(self, f"{error}. Выберите другое время или помещение.")
+            return
         return super().accept()
 
 
@@ -1,13 +1,15 @@
 from sqlmodel import Session, select
 
-from PyQt6 import uic, QtWidgets
+from PyQt6 import QtWidgets
 
-from app.db import ENGINE
+from app.db import ENGINE, lookup
 from app.db.models import (
     Area,
     BaseModel,
     Location,
 )
+from app.ui.forms import load_ui
+from app.ui.lookups import set_name_list
 from app.ui.models import TypeListModel
 from app.ui.widgets.alerts import validationError
 from app.ui.widgets.mixins import WidgetMixin
@@ -16,7 +18,7 @@ from app.ui.widgets.mixins import WidgetMixin
 class TypeManagerDialog(QtWidgets.QDialog):
     def __init__(self, _type, parent = None) -> None:
         super().__init__(parent)
-        uic.loadUi("app/ui/assets/dialogs/type-manager.ui", self)
+        load_ui("app/ui/assets/dialogs/type-manager.ui", self)
 
         with Session(ENGINE) as session:
             data = session.exec(select(_type)).all()
@@ -49,21 +51,20 @@ class AreaManagerDialog(TypeManagerDialog):
         self.combobox = QtWidgets.QComboBox()
         self.combobox.currentTextChanged.connect(self.updateModel)
 
-        with Session(ENGINE) as session:
-            self.names = session.exec(select(Location.name)).all()
-
-        self.combobox.addItems(name for name in self.names)
+        set_name_list(self.combobox, Location)
         self.verticalLayout_4.addWidget(self.combobox)
 
     def exec(self) -> int:
-        if self.names:
+        if lookup.names(Location):
             return super().exec()
         validationError(self, "Вы должны создать хотя бы одно помещение!")
         return False
 
     def updateModel(self, name: str):
+        if not name:
+            return
         with Session(ENGINE) as session:
-            self.location = session.exec(select(Location).where(Location.name == name)).first()
+            self.location = session.get(Location, lookup.id_of(Location, name))
             self.listViewModel = TypeListModel[Area](self.location.areas, self)
 
         self.listView.setModel(self.listViewModel)
@@ -1,4 +1,4 @@
-from PyQt6 import uic
+from app.ui.forms import load_ui
 
 
 class WidgetMixin:
@@ -7,7 +7,7 @@ class WidgetMixin:
     
     def __init__(self) -> None:
         if self.ui_path:
-            uic.loadUi(self.ui_path, self)
+            load_ui(self.ui_path, self)
 
         title = self.get_title()
 
@@ -0,0 +1,83 @@
+from os.path import expanduser, splitext
+
+from PyQt6 import QtWidgets, QtCore
+
+from app.db.profiler import QueryProfiler, describe
+
+__all__ = ["QueryProfilerOverlay"]
+
+INTERVAL_MS = 1000
+HOT_SPOT_THRESHOLD = 10
+TRACE_FILTERS = "Flame graph (*.folded);;Chrome trace (*.json)"
+
+
+class QueryProfilerOverlay(QtWidgets.QWidget):
+    """
+    Shows in the status bar how many statements the last second executed.
+
+    A call site repeating the same statement `HOT_SPOT_THRESHOLD` times in
+    a second is highlighted as an N+1 hot spot; the tooltip lists the most
+    expensive actions and call sites so far. The button saves a trace.
+    """
+
+    def __init__(self, profiler: QueryProfiler, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._profiler = profiler
+
+        self.label = QtWidgets.QLabel("SQL: —")
+        self.traceButton = QtWidgets.QToolButton()
+        self.traceButton.setText("Трассировка…")
+        self.traceButton.setAutoRaise(True)
+        self.traceButton.clicked.connect(self.save_trace)
+
+        layout = QtWidgets.QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.label)
+        layout.addWidget(self.traceButton)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(INTERVAL_MS)
+        self._timer.timeout.connect(self.update_stats)
+        self._timer.start()
+
+    def update_stats(self) -> None:
+        statements = self._profiler.take()
+        if not statements:
+            return
+
+        duration = sum(statement.duration for statement in statements) * 1000
+        text = f"SQL: {len(statements)} запр., {duration:.0f} мс"
+        hot_spots = self._profiler.repeated(statements, HOT_SPOT_THRESHOLD)
+        if hot_spots:
+            site, sql, count = hot_spots[0]
+            text += f" · N+1: {site} ×{count} ({describe(sql)})"
+            self.label.setStyleSheet("color: #c0392b;")
+        else:
+            self.label.setStyleSheet("")
+        self.label.setText(text)
+        self.setToolTip(self._summary())
+
+    def _summary(self) -> str:
+        lines = []
+        for title, key in (("Действия", "action"), ("Места вызова", "site")):
+            lines.append(f"{title}:")
+            for group, summary in self._profiler.totals(key, 5).items():
+                lines.append(f"  {group}: {summary.count} запр., {summary.duration * 1000:.0f} мс")
+        lines.append("Самые медленные:")
+        for statement in self._profiler.slowest(5):
+            lines.append(f"  {statement.duration * 1000:.1f} мс · {statement.site} · {describe(statement.sql)}")
+        return "\n".join(lines)
+
+    def save_trace(self) -> None:
+        path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Укажите путь", expanduser("~"), TRACE_FILTERS
+        )
+        if not path:
+            return
+        if splitext(path)[1].lower() not in (".folded", ".json"):
+            path += selected_filter[selected_filter.index("*") + 1:-1]
+
+        try:
+            self._profiler.write_trace(path)
+        except OSError as error:
+            QtWidgets.QMessageBox.critical(self, "Ошибка сохранения", str(error))
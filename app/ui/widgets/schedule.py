@@ -1,7 +1,10 @@
 from datetime import time
+from typing import List
 
 from PyQt6 import QtWidgets, QtCore
 
+from app.config import SCHEDULE_HORIZON_WEEKS
+from app.db.clashes import Clash, ClashKind
 from app.db.models import Weekday, DaySchedule
 from app.ui.widgets.mixins import WidgetMixin
 
@@ -111,3 +114,44 @@ class DaysScheduleManagerDialog(QtWidgets.QDialog, WidgetMixin):
         for box in self.boxes:
             box.setChecked(box.weekday in self.weekdays)
         return super().reject()
+
+
+CLASH_COLUMNS = ("Первое совпадение", "Секция", "Пересекается с", "Общее", "Совпадений")
+
+
+class ScheduleClashesDialog(QtWidgets.QDialog):
+    def __init__(self, clashes: List[Clash], parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Проверка расписания")
+        self.resize(900, 500)
+
+        if clashes:
+            text = f"Найдено пересечений в ближайшие {SCHEDULE_HORIZON_WEEKS} нед.: {len(clashes)}"
+        else:
+            text = f"В ближайшие {SCHEDULE_HORIZON_WEEKS} нед. пересечений нет."
+        self.label = QtWidgets.QLabel(text, self)
+
+        self.tableWidget = QtWidgets.QTableWidget(len(clashes), len(CLASH_COLUMNS), self)
+        self.tableWidget.setHorizontalHeaderLabels(CLASH_COLUMNS)
+        self.tableWidget.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tableWidget.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.ResizeToContents)
+        for row, clash in enumerate(clashes):
+            other = f"бронирование «{clash.other}»" if clash.reservation_id is not None else clash.other
+            place = "Помещение" if clash.kind is ClashKind.LOCATION else "Преподаватель"
+            values = (
+                f"{clash.start_at:%d.%m.%Y %H:%M}–{clash.end_at:%H:%M}",
+                clash.club,
+                other,
+                f"{place}: {clash.place}",
+                str(clash.count),
+            )
+            for column, value in enumerate(values):
+                self.tableWidget.setItem(row, column, QtWidgets.QTableWidgetItem(value))
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close, self)
+        buttons.rejected.connect(self.reject)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.label)
+        layout.addWidget(self.tableWidget)
+        layout.addWidget(buttons)
@@ -0,0 +1,82 @@
+from typing import List
+
+from PyQt6 import QtWidgets, QtCore, QtGui
+from PyQt6.QtCore import pyqtSignal
+
+from app.db.models import Assignment, Club, Event, Reservation
+from app.db.search import MIN_LENGTH, SearchHit, search
+from app.ui.tasks import run_query
+
+__all__ = ["QuickSearch"]
+
+MODEL_NAMES = {
+    Event: "Мероприятие",
+    Assignment: "Заявка",
+    Reservation: "Бронирование",
+    Club: "Секция",
+}
+
+DEBOUNCE_MS = 250
+TEXT_LENGTH = 80
+
+
+class QuickSearch(QtWidgets.QLineEdit):
+    """
+    A search box that looks for the text in all indexed tables at once.
+
+    The search runs off the GUI thread once typing pauses; the ranked hits
+    are shown in a popup and `activated` is emitted with the chosen object.
+    """
+
+    activated = pyqtSignal(object, int)
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._task = None
+        self.setPlaceholderText("Поиск… (Ctrl+F)")
+        self.setClearButtonEnabled(True)
+        self.setMinimumWidth(240)
+        QtGui.QShortcut(QtGui.QKeySequence("Ctrl+F"), parent or self, self.setFocus)
+
+        self._hits = QtGui.QStandardItemModel(self)
+        self._completer = QtWidgets.QCompleter(self._hits, self)
+        self._completer.setWidget(self)
+        self._completer.setCompletionMode(QtWidgets.QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self._completer.activated[QtCore.QModelIndex].connect(self._on_activated)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DEBOUNCE_MS)
+        self._timer.timeout.connect(self._search)
+        self.textEdited.connect(self._timer.start)
+
+    def _search(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        text = self.text().strip()
+        if len(text) < MIN_LENGTH:
+            self._hits.clear()
+            self._completer.popup().hide()
+            return
+        self._task = run_query(lambda session: search(session, text), self._on_found)
+
+    def _on_found(self, hits: List[SearchHit]) -> None:
+        self._task = None
+        self._hits.clear()
+        for hit in hits:
+            text = " ".join(hit.text.split())
+            if len(text) > TEXT_LENGTH:
+                text = text[:TEXT_LENGTH - 1] + "…"
+            item = QtGui.QStandardItem(f"{MODEL_NAMES[hit.model]}: {text}")
+            item.setData((hit.model, hit.id), QtCore.Qt.ItemDataRole.UserRole)
+            self._hits.appendRow(item)
+        if hits:
+            self._completer.complete()
+        else:
+            self._completer.popup().hide()
+
+    def _on_activated(self, index: QtCore.QModelIndex) -> None:
+        model, id = index.data(QtCore.Qt.ItemDataRole.UserRole)
+        self.activated.emit(model, id)
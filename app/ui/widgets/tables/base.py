@@ -1,20 +1,26 @@
 import csv
-from functools import reduce
+from typing import Callable
 
 from os.path import expanduser
 
-from sqlmodel import Session, select, delete
+from sqlmodel import Session, select
 from sqlmodel.sql.expression import SelectOfScalar
 
 from PyQt6 import QtWidgets, QtGui
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import Qt, pyqtSlot
 from PyQt6.QtWidgets import QWidget, QDialog, QMessageBox, QFileDialog, QPushButton
-from app.ui.utils import export
-from app.ui.widgets.alerts import confirm
+from app.ui.export import export_table
+from app.ui.widgets.alerts import confirm, validationError
 
-from app.db import ENGINE
+from app.db.bulk import delete_by_ids, update_by_ids
+from app.db.changes import Changes
+from app.db.conflicts import ReservationConflict
+from app.db.query import where_related
+from app.ui import profiling
+from app.ui.changes import change_bus
 from app.ui.models import BaseTableModel
+from app.ui.tasks import QueryTask, run_query
 from app.db.models import BaseModel
 from app.ui.widgets.mixins import WidgetMixin
 from app.ui.widgets.tables.filters import Filter, FilterBox
@@ -37,18 +43,14 @@ class Table(QWidget, WidgetMixin):
     @property
     def statement(self):
         statement: SelectOfScalar = select(self.table)
-        if self._filter_box and self._filter_box.where is not None:
-            joins = (flt._statement.parent.class_ for flt in self.filters if not isinstance(flt._statement.parent.class_(), self.table))
-            statement = reduce(lambda s, j: s.join(j, isouter=True), joins, statement).where(self._filter_box.where)
+        if self._filter_box:
+            statement = where_related(statement, self.table, self._filter_box.conditions)
         return statement
         
-    @property
-    def data(self):
-        with Session(ENGINE) as session:
-            return session.exec(self.statement).all()
-    
     def __init__(self, parent: QWidget | None = None) -> None:
         self._extra_buttons = []
+        self._open_task: QueryTask | None = None
+        self.model: BaseTableModel | None = None
         super().__init__(parent)
         
     def setup_ui(self) -> None:
@@ -56,6 +58,8 @@ class Table(QWidget, WidgetMixin):
         self.tableView.setSelectionBehavior(QtWidgets.QTableView.SelectionBehavior.SelectRows)
         self.tableView.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
         self.tableView.verticalHeader().setVisible(False)
+        self.tableView.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.tableView.setSortingEnabled(True)
         
         if self.create_dialog:
             self.createButton.clicked.connect(self.create)
@@ -73,24 +77,35 @@ class Table(QWidget, WidgetMixin):
             self.deleteButton.setVisible(False)
         
         self.exportButton.clicked.connect(self.export)
+        change_bus().changed.connect(self.on_changes)
         self.refreshButton.clicked.connect(self.refresh)
         
-        self._filter_box = FilterBox(self.filters, self, self) if self.filters else None
+        # The filter panel is built when it is opened for the first time.
+        self._filter_box: FilterBox | None = None
         self.splitter = QtWidgets.QSplitter(Qt.Orientation.Horizontal)
         self.splitter.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
         self.splitter.addWidget(self.tableView)
-        self.splitter.addWidget(self._filter_box)
         self.splitter.setStretchFactor(0, 5)
         self.verticalLayout.addWidget(self.splitter)
         
-        self._filter_box.hide()
         hideFilterBtn = QtWidgets.QToolButton()
         hideFilterBtn.setIcon(QIcon("app/ui/resourses/filter.png"))
         self.toolbarLayout.addWidget(hideFilterBtn)
         shortcut = "Ctrl+B"
         hideFilterBtn.setToolTip(f"Отобразить панель с фитрами ({shortcut})")
         hideFilterBtn.setShortcut(QtGui.QKeySequence(shortcut))
-        hideFilterBtn.clicked.connect(lambda: self._filter_box.setHidden(not(self._filter_box.isHidden())))
+        hideFilterBtn.clicked.connect(self.toggle_filters)
+
+    @pyqtSlot()
+    def toggle_filters(self) -> None:
+        if not self.filters:
+            return
+        if self._filter_box is None:
+            with profiling.measure(f"{type(self).__name__} filters"):
+                self._filter_box = FilterBox(self.filters, self, self)
+                self.splitter.addWidget(self._filter_box)
+        else:
+            self._filter_box.setHidden(not(self._filter_box.isHidden()))
 
     def _add_button(self, layout, index, text: str, slot, icon=None) -> None:
         button = QPushButton(QIcon(icon), text, self)
@@ -101,61 +116,142 @@ class Table(QWidget, WidgetMixin):
 
     @pyqtSlot()
     def create(self):
-        if self.create_dialog(parent=self.parent()).exec():
-            self.refresh()
+        self.create_dialog(parent=self.parent()).exec()
 
     @pyqtSlot()
     def update(self):
-        self.update_dialog(self.model._data[self.selected_indexes[0]], self.parent()).exec()
+        # The dialog commits its object, so it gets a copy rather than the shared loaded one.
+        self.open_item(self.model._data[self.selected_indexes[0]].id)
+
+    def open_item(self, id: int) -> None:
+        if not self.update_dialog:
+            return
+        if self._open_task is not None:
+            self._open_task.cancel()
+        statement = select(self.table).where(self.table.id == id).options(*self.table_model.OPTIONS)
+        self._open_task = run_query(lambda session: session.exec(statement).first(), self.on_item_loaded, self.on_failed)
+
+    def on_item_loaded(self, item: BaseModel | None) -> None:
+        self._open_task = None
+        if item:
+            self.update_dialog(item, self.parent()).exec()
 
     @pyqtSlot()
     def delete(self):
         if not confirm(self.parent(), "Вы действительно хотите удалить выбранные объекты?"):
             return
 
-        with Session(ENGINE) as session:
-            ids = []
-            for i, j in enumerate(self.selected_indexes):
-                index = j - i
-                ids.append(self.model._data[index].id)
-                session.delete(self.model._data[index])
-                self.model.removeRow(index)
-            # session.exec(delete(self.table).where(self.table.id.in_(ids)))
+        # The rows are patched from the change bus once the transaction commits.
+        table, ids = self.table, [self.model._data[row].id for row in self.selected_indexes]
+
+        def job(session: Session) -> None:
+            delete_by_ids(session, table, ids)
             session.commit()
 
-        self.update_total_count()
+        run_query(job, lambda _: None, self.on_write_failed)
+
+    def update_selected(self, **values) -> None:
+        table, ids = self.table, [self.model._data[row].id for row in self.selected_indexes]
+
+        def job(session: Session) -> str | None:
+            # A conflict is for the user to resolve, so it is a result rather than a failure.
+            try:
+                update_by_ids(session, table, ids, **values)
+            except ReservationConflict as error:
+                return str(error)
+            session.commit()
+            return None
+
+        run_query(job, self.on_updated, self.on_write_failed)
+
+    def on_updated(self, conflict: str | None) -> None:
+        if conflict:
+            validationError(self.parent(), conflict)
+
+    def on_write_failed(self, message: str) -> None:
+        QMessageBox.critical(self.parent(), "Ошибка сохранения", message)
+
+    @pyqtSlot(object)
+    def on_changes(self, committed: Changes) -> None:
+        # Hidden tables are refreshed when their tab is opened.
+        if self.model is None or not self.isVisible():
+            return
+        if self.table in committed and committed[self.table].whole:
+            self.model.reloadLoaded()
+            return
+        if self.table in committed:
+            self.model.patchRows(sorted(committed[self.table].ids))
+        # The rows also show the related objects loaded by the model's options.
+        self.model.reloadRelated(committed)
 
     @pyqtSlot()
     def export(self):
-        export(self.model, self)
+        export_table(self.model, self)
+
+    def apply_filter(self, accepts: Callable[[BaseModel], bool] | None = None) -> None:
+        # Rows of a narrowed filter are a subset of the loaded ones if nothing is left to fetch.
+        if self.model is None:
+            self.refresh(filter=False)
+        elif accepts is not None and self.model.complete:
+            self.model.narrow(self.statement, accepts)
+            self.on_loading_changed(False)
+        else:
+            self.model.setStatement(self.statement)
 
     @pyqtSlot()
     def refresh(self, filter=True):
-        self.model: BaseTableModel = self.table_model(self.data)
+        if self.model is not None:
+            self.model.cancel()
+
+        header = self.tableView.horizontalHeader()
+        self.model: BaseTableModel = self.table_model(
+            self.statement,
+            column=header.sortIndicatorSection(),
+            order=header.sortIndicatorOrder(),
+        )
+        self.model.loadingChanged.connect(self.on_loading_changed)
+        self.model.rowsRemoved.connect(self.update_total_count)
+        self.model.totalChanged.connect(self.update_total_count)
+        self.model.failed.connect(self.on_failed)
         self.tableView.setModel(self.model)
         self.tableView.selectionModel().selectionChanged.connect(
             self.on_selection_changed
         )
         
-        if filter:
+        if filter and self._filter_box:
             self._filter_box.refresh()
 
+        self.on_loading_changed(self.model.loading)
+
+    @pyqtSlot(bool)
+    def on_loading_changed(self, loading: bool):
+        if loading:
+            self.tableView.setCursor(Qt.CursorShape.BusyCursor)
+        else:
+            self.tableView.unsetCursor()
+            if self.model.total is not None:
+                profiling.mark(type(self).__name__, f"{self.model.rowCount()} of {self.model.total} rows loaded")
         self.on_selection_changed()
         self.update_total_count()
 
+    @pyqtSlot(str)
+    def on_failed(self, message: str):
+        QMessageBox.critical(self.parent(), "Ошибка загрузки", message)
+
     @pyqtSlot()
     def on_selection_changed(self):
         count = len(self.selected_indexes)
         self.selectedRowsCountLabel.setText(str(count))
         self.deleteButton.setEnabled(count)
         self.updateButton.setEnabled(count == 1)
-        self.exportButton.setEnabled(self.model.rowCount())
+        self.exportButton.setEnabled(bool(self.model.total))
 
         for button in self._extra_buttons:
             button.setEnabled(count)
 
     def update_total_count(self):
-        self.totalRowsCountLabel.setText(str(self.model.rowCount()))
+        total = self.model.total
+        self.totalRowsCountLabel.setText("Загрузка…" if total is None else str(total))
 
     def add_top_button(self, text: str, slot, icon=None) -> None:
         self._add_button(self.horizontalLayout, 2, text, slot, icon)
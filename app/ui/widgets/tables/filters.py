@@ -1,21 +1,31 @@
 from abc import ABC, abstractmethod
-from sqlalchemy import BinaryExpression
+from datetime import datetime
+from typing import Any, Callable, List, Tuple, Type
+
+from sqlalchemy import ColumnElement
 from sqlalchemy.orm.attributes import InstrumentedAttribute
-from sqlmodel import Session, select, and_
+from sqlmodel import and_
 
 from PyQt6 import QtWidgets, QtCore
 
-from app.db import ENGINE
+from app.db.models import BaseModel
+from app.db.query import RelationshipPath, relationship_path
+from app.db.search import contains, is_indexed
+from app.ui.lookups import keep_current_text, name_list_model
 from app.ui.widgets.dialogs.ext import TypeManagerDialog
 from app.ui.widgets.mixins import WidgetMixin
 
 __all__ = ["FilterBox", "ComboboxFilter", "DateTimeRangeFilter"]
 
+DEBOUNCE_MS = 300
+
 
 class Filter(ABC):
-    def __init__(self, label_text, statement: InstrumentedAttribute) -> None:
+    def __init__(self, label_text, statement: InstrumentedAttribute, via: Tuple[str, ...] | None = None) -> None:
         self._label_text = label_text
         self._statement = statement
+        # The relationships leading from the table's model to the filtered column, found if omitted.
+        self._via = via
 
     @abstractmethod
     def setup(self, form: QtWidgets.QFormLayout) -> None:
@@ -32,11 +42,37 @@ class Filter(ABC):
     def refresh(self) -> None:
         pass
 
+    def connect(self, slot: Callable[[], None]) -> None:
+        """Calls the slot whenever the user changes the filter."""
+
+    def state(self) -> Any:
+        return None
+
+    def narrows(self, state: Any) -> bool:
+        """Tells whether the current filter matches a subset of what it matched in `state`."""
+        return self.state() == state
+
+    def accepts(self, item: BaseModel) -> bool:
+        """Evaluates the current filter on a loaded object, used with `narrows`."""
+        return True
+
+    def path(self, model: Type[BaseModel]) -> RelationshipPath:
+        """Returns the relationships leading from the table's model to the filtered column."""
+        return relationship_path(model, self._statement.class_, self._via)
+
+    def _value_of(self, item: BaseModel) -> Any:
+        # FilterBox narrows only filters whose path holds one object per hop.
+        for relationship in self.path(type(item)):
+            item = getattr(item, relationship.key)
+            if item is None:
+                return None
+        return getattr(item, self._statement.key)
+
 
 class FilterBox(QtWidgets.QGroupBox, WidgetMixin):
     ui_path = "app/ui/assets/filter.ui"
     title = None
-    where: BinaryExpression | None = None
+    conditions: List[Tuple[RelationshipPath, ColumnElement[bool]]] = []
 
     def __init__(self, filters: tuple[Filter], table, parent) -> None:
         self._filters = filters
@@ -47,24 +83,52 @@ class FilterBox(QtWidgets.QGroupBox, WidgetMixin):
         self.resetButton.clicked.connect(self.reset)
         self.applyButton.clicked.connect(self.apply)
 
+        self.liveCheckBox = QtWidgets.QCheckBox("Применять при вводе")
+        self.liveCheckBox.setChecked(True)
+        self.horizontalLayout.insertWidget(0, self.liveCheckBox)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DEBOUNCE_MS)
+        self._timer.timeout.connect(self._apply_changes)
+
         for filter in self._filters:
             filter.setup(self.formLayout)
+            filter.connect(self._on_filter_changed)
+        self._states: List[Any] = [filter.state() for filter in self._filters]
+
+    def _on_filter_changed(self) -> None:
+        if self.liveCheckBox.isChecked():
+            self._timer.start()
+
+    def _apply_changes(self) -> None:
+        if [filter.state() for filter in self._filters] != self._states:
+            self.apply()
+
+    def _narrows(self, filter: Filter, state: Any) -> bool:
+        path = filter.path(self._table.table)
+        return filter.narrows(state) and not any(relationship.uselist for relationship in path)
 
     def reset(self):
-        self.where = None
         for filter in self._filters:
             filter.reset()
-        self._table.refresh(filter=False)
+        self.apply()
 
     def apply(self):
-        statements = []
+        self._timer.stop()
+        narrowing = all(self._narrows(filter, state) for filter, state in zip(self._filters, self._states))
+        self._states = [filter.state() for filter in self._filters]
+
+        self.conditions = []
         for filter in self._filters:
-            statement = filter.apply()
-            if statement is not None:
-                statements.append(statement)
-        if len(statements) != 0:
-            self.where = and_(*statements)
-        self._table.refresh(filter=False)
+            condition = filter.apply()
+            if condition is not None:
+                self.conditions.append((filter.path(self._table.table), condition))
+
+        if narrowing:
+            self._table.apply_filter(lambda item: all(filter.accepts(item) for filter in self._filters))
+        else:
+            self._table.apply_filter()
         
     def refresh(self):
         for filter in self._filters:
@@ -79,22 +143,38 @@ class TextFilter(Filter):
         form.addRow(QtWidgets.QLabel(self._label_text), self.lineEdit)
         
     def apply(self):
-        return self._statement.contains(self.lineEdit.text())
+        text = self.lineEdit.text()
+        if text:
+            return contains(self._statement, text)
     
     def reset(self) -> None:
         self.lineEdit.clear()
 
+    def connect(self, slot: Callable[[], None]) -> None:
+        self.lineEdit.textChanged.connect(slot)
+
+    def state(self) -> str:
+        return self.lineEdit.text()
+
+    def narrows(self, state: str) -> bool:
+        text = self.state()
+        # Only indexed matching folds case the way `accepts` does.
+        return text == state or (state in text and is_indexed(self._statement, text))
+
+    def accepts(self, item: BaseModel) -> bool:
+        text = self.state()
+        return not text or text.casefold() in (self._value_of(item) or "").casefold()
+
 
 class ComboboxFilter(Filter):
     @property
-    def data(self):
-        with Session(ENGINE) as session:
-            return session.exec(select(self._statement)).all()
-        
-    def __init__(self, label_text, statement: InstrumentedAttribute, is_maximize: bool = False, _t = TypeManagerDialog) -> None:
+    def model(self) -> QtCore.QAbstractItemModel:
+        return name_list_model(self._statement.class_)
+
+    def __init__(self, label_text, statement: InstrumentedAttribute, is_maximize: bool = False, _t = TypeManagerDialog, via: Tuple[str, ...] | None = None) -> None:
         self._is_maximize = is_maximize
         self._t = _t
-        super().__init__(label_text, statement)
+        super().__init__(label_text, statement, via)
 
     def get_comparer(self, text):
         return text
@@ -102,7 +182,9 @@ class ComboboxFilter(Filter):
     def setup(self, form: QtWidgets.QFormLayout) -> None:
         self.combobox = QtWidgets.QComboBox()
         self.combobox.setEditable(True)
-        self.refresh()
+        self.combobox.setModel(self.model)
+        keep_current_text(self.combobox)
+        self.combobox.lineEdit().clear()
         self.combobox.lineEdit().setPlaceholderText("Не выбрано")
         self.combobox.lineEdit().setClearButtonEnabled(True)
         self.combobox.completer().setFilterMode(QtCore.Qt.MatchFlag.MatchContains)
@@ -115,17 +197,22 @@ class ComboboxFilter(Filter):
             hbox.addWidget(self.combobox)
             self.maximize = QtWidgets.QToolButton()
             self.maximize.setText("…")
-            if self._t == TypeManagerDialog:
-                self.mng = self._t(self._statement.parent.class_)
-            else:
-                self.mng = self._t()
-            self.maximize.clicked.connect(self.mng.exec)
-            self.mng.accepted.connect(self.refresh)
+            self.mng = None
+            self.maximize.clicked.connect(self.show_manager)
             hbox.addWidget(self.maximize)
             form.addRow(QtWidgets.QLabel(self._label_text), hbox)
         else:
             form.addRow(QtWidgets.QLabel(self._label_text), self.combobox)
 
+    def show_manager(self) -> None:
+        # The manager dialog queries its objects, so it is built on first use.
+        if self.mng is None:
+            if self._t == TypeManagerDialog:
+                self.mng = self._t(self._statement.parent.class_)
+            else:
+                self.mng = self._t()
+        self.mng.exec()
+
     def apply(self):
         text = self.combobox.currentText()
         if text:
@@ -133,22 +220,32 @@ class ComboboxFilter(Filter):
 
     def reset(self) -> None:
         self.combobox.setCurrentIndex(-1)
-        
-    def refresh(self) -> None:
-        self.combobox.clear()
-        self.combobox.addItems(self.data)
-        self.combobox.lineEdit().clear()
-        self.combobox.lineEdit().setPlaceholderText("Не выбрано")
+
+    def connect(self, slot: Callable[[], None]) -> None:
+        # Typing a name fires on every key, wait until it matches an item or is cleared.
+        self.combobox.currentTextChanged.connect(
+            lambda text: (not text or self.combobox.findText(text) >= 0) and slot()
+        )
+
+    def state(self) -> str:
+        return self.combobox.currentText()
+
+    def narrows(self, state: str) -> bool:
+        return not state or self.state() == state
+
+    def accepts(self, item: BaseModel) -> bool:
+        text = self.state()
+        return not text or self._value_of(item) == self.get_comparer(text)
 
 
 class EnumFilter(ComboboxFilter):
-    def __init__(self, label_text, statement: InstrumentedAttribute, mapping: dict) -> None:
+    def __init__(self, label_text, statement: InstrumentedAttribute, mapping: dict, via: Tuple[str, ...] | None = None) -> None:
         self.names = mapping
-        super().__init__(label_text, statement)
+        super().__init__(label_text, statement, via=via)
         
     @property
-    def data(self):
-        return self.names.values()
+    def model(self) -> QtCore.QAbstractItemModel:
+        return QtCore.QStringListModel(list(self.names.values()), self.combobox)
     
     def get_comparer(self, text):
         return next(key for key, value in self.names.items() if value == text)
@@ -157,9 +254,9 @@ class EnumFilter(ComboboxFilter):
 MINIMUM_DATE_TIME = QtCore.QDateTime(2000, 1, 1, 0, 0)
 
 class DateTimeRangeFilter(Filter):
-    def __init__(self, label_text, statement: InstrumentedAttribute, enable_shortcuts: bool = False) -> None:
+    def __init__(self, label_text, statement: InstrumentedAttribute, enable_shortcuts: bool = False, via: Tuple[str, ...] | None = None) -> None:
         self.enable_shortcuts = enable_shortcuts
-        super().__init__(label_text, statement)
+        super().__init__(label_text, statement, via)
     
     def setup(self, form: QtWidgets.QFormLayout) -> None:
         line = QtWidgets.QFrame()
@@ -204,7 +301,31 @@ class DateTimeRangeFilter(Filter):
 
         self.fr.setSpecialValueText("Не выбрано")
         self.to.setSpecialValueText("Не выбрано")
-        
+
+    def connect(self, slot: Callable[[], None]) -> None:
+        self.fr.dateTimeChanged.connect(slot)
+        self.to.dateTimeChanged.connect(slot)
+
+    def state(self) -> tuple[datetime | None, datetime | None]:
+        return tuple(
+            None if edit.dateTime() == edit.minimumDateTime() else edit.dateTime().toPyDateTime()
+            for edit in (self.fr, self.to)
+        )
+
+    def narrows(self, state: tuple[datetime | None, datetime | None]) -> bool:
+        (fr, to), (old_fr, old_to) = self.state(), state
+        # SQLite compares dates and datetimes as strings, which Python cannot mirror.
+        return self.state() == state or (
+            self._statement.type.python_type is datetime
+            and (old_fr is None or fr is not None and fr >= old_fr)
+            and (old_to is None or to is not None and to <= old_to)
+        )
+
+    def accepts(self, item: BaseModel) -> bool:
+        fr, to = self.state()
+        value = self._value_of(item)
+        return (fr is None or value is not None and value > fr) and (to is None or value is not None and value < to)
+
     def _add_shortcuts(self, form: QtWidgets.QFormLayout):
         self.shortcuts = {
             "Завтра": 1,
@@ -1,10 +1,7 @@
-from sqlmodel import Session
-
 from app.ui.models import *
 from app.ui.models.models import SCOPES, STATES
 from app.ui.widgets.dialogs import *
 
-from app.db import ENGINE
 from app.db.models import *
 from app.ui.widgets.tables.base import *
 from app.ui.widgets.tables.filters import *
@@ -60,18 +57,7 @@ class DesktopTable(AssignmentTable):
         self.add_extra_button("Пометить как выполненное", self.mark_as_completed, "app/ui/resourses/check.png")
         
     def mark_as_completed(self) -> None:
-        with Session(ENGINE) as session:
-            assignments = []
-            for i, j in enumerate(self.selected_indexes):
-                index = j - i
-                assignment: Assignment = self.model._data[index]
-                assignment.state = Assignment.State.COMPLETED
-                assignments.append(assignment)
-                self.model.removeRow(index)
-            session.bulk_save_objects(assignments)
-            session.commit()
-
-        self.update_total_count()
+        self.update_selected(state=Assignment.State.COMPLETED)
   
   
 class ReservationTable(Table):
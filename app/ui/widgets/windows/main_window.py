@@ -1,13 +1,23 @@
-from PyQt6.QtCore import pyqtSlot
-from PyQt6.QtWidgets import QMainWindow, QTableView, QHeaderView
-from sqlmodel import Session, select
-from app.db import ENGINE
-from app.db.models import Club
+from typing import Dict
+
+from PyQt6.QtCore import Qt, pyqtSlot
+from PyQt6.QtWidgets import QMainWindow, QMessageBox, QTableView, QHeaderView
+from app.db import profiler
+from app.db.changes import Changes
+from app.db.clashes import schedule_clashes
+from app.db.models import Club, DaySchedule, Location, Teacher
 from app.ui.models.models import ScheduleTableModel
+from app.ui import profiling
+from app.ui.changes import change_bus
+from app.ui.tasks import run_query
 from app.ui.utils import export
 
+from app.ui.widgets.tables.base import Table
 from app.ui.widgets.tables.tables import AssignmentTable, EducationTable, EventTable, ReservationTable, DesktopTable
 from app.ui.widgets.mixins import WidgetMixin
+from app.ui.widgets.profiler import QueryProfilerOverlay
+from app.ui.widgets.schedule import ScheduleClashesDialog
+from app.ui.widgets.search import QuickSearch
 
 
 class MainWindow(QMainWindow, WidgetMixin):
@@ -17,45 +27,97 @@ class MainWindow(QMainWindow, WidgetMixin):
     
     ui_path = "app/ui/assets/windows/main-window.ui"
 
+    # The tables in the order of the tabs, with the layouts they are placed in.
+    TABS = (
+        ("desktop", DesktopTable, "desktopLayout"),
+        ("assignments", AssignmentTable, "assignmentsLayout"),
+        ("events", EventTable, "eventsLayout"),
+        ("clubs", EducationTable, "verticalLayout"),
+        ("reservations", ReservationTable, "locationsLayout"),
+    )
+
     def setup_ui(self) -> None:
-        self.events = EventTable(self)
-        self.assignments = AssignmentTable(self)
-        self.reservations = ReservationTable(self)
-        self.clubs = EducationTable(self)
-        self.desktop = DesktopTable(self)
-        
-        self.views = [
-            self.desktop,
-            self.assignments,
-            self.events,
-            self.clubs,
-            self.reservations,
-        ]
-        
+        self._schedule_task = None
+        self._clashes_task = None
+        self._views: Dict[int, Table] = {}
+
         self.schedule = QTableView(self)
         self.schedule.setWordWrap(True)
         self.schedule.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.schedule.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        self.refresh_schedule()
-        self.pushButton.clicked.connect(lambda: export(self.model, self, True))
-
-        self.desktopLayout.addWidget(self.desktop)
-        self.assignmentsLayout.addWidget(self.assignments)
-        self.eventsLayout.addWidget(self.events)
-        self.verticalLayout.addWidget(self.clubs)
+        self.pushButton.clicked.connect(lambda: self.schedule.model() and export(self.schedule.model(), self, True))
         self.verticalLayout_2.addWidget(self.schedule)
-        self.locationsLayout.addWidget(self.reservations)
+        self.validateScheduleButton.clicked.connect(self.validate_schedule)
+
+        self.quick_search = QuickSearch(self)
+        self.quick_search.activated.connect(self.open_search_hit)
+        self.tabWidget.setCornerWidget(self.quick_search, Qt.Corner.TopRightCorner)
+
+        if profiler.current() is not None:
+            self.statusBar().addPermanentWidget(QueryProfilerOverlay(profiler.current(), self))
 
         self.tabWidget.currentChanged.connect(self.refresh_current_tab)
         self.tabWidget_2.currentChanged.connect(self.refresh_schedule)
+        change_bus().changed.connect(self.on_changes)
         self.refresh_current_tab(self.tabWidget.currentIndex())
 
+    def view(self, index: int) -> Table:
+        """
+        Returns the table of a tab, building it when the tab is opened for the first time.
+        """
+        if index not in self._views:
+            name, table, layout = self.TABS[index]
+            with profiling.measure(name):
+                view = table(self)
+                getattr(self, layout).addWidget(view)
+            profiling.first_paint(view.tableView, name)
+            setattr(self, name, view)
+            self._views[index] = view
+        return self._views[index]
+
     @pyqtSlot(int)
     def refresh_current_tab(self, index: int) -> None:
-        self.views[index].refresh()
+        self.view(index).refresh()
+        self.refresh_schedule()
+
+    def open_search_hit(self, model, id: int) -> None:
+        # The desktop also lists assignments, prefer the tab with the full table.
+        index = next(i for i, (_, table, _) in reversed(list(enumerate(self.TABS))) if table.table is model)
+        self.tabWidget.setCurrentIndex(index)
+        self.view(index).open_item(id)
+
+    @pyqtSlot(object)
+    def on_changes(self, committed: Changes) -> None:
+        if committed.keys() & {Club, DaySchedule, Location, Teacher}:
+            self.refresh_schedule()
 
     def refresh_schedule(self) -> None:
-        with Session(ENGINE) as session:
-            self.schedule.setModel(ScheduleTableModel(session.exec(select(Club)).all()))
+        # The schedule is loaded only while its tab is visible.
+        if self.tabWidget.currentWidget() is not self.tab_3 or self.tabWidget_2.currentWidget() is not self.tab_5:
+            return
+        if self._schedule_task is not None:
+            self._schedule_task.cancel()
+        self._schedule_task = run_query(ScheduleTableModel.query, self._on_schedule_loaded)
+
+    def validate_schedule(self) -> None:
+        if self._clashes_task is not None:
+            return
+        self.validateScheduleButton.setEnabled(False)
+        self._clashes_task = run_query(schedule_clashes, self._on_clashes_loaded, self._on_clashes_failed)
+
+    def _on_clashes_loaded(self, clashes) -> None:
+        self._clashes_task = None
+        self.validateScheduleButton.setEnabled(True)
+        ScheduleClashesDialog(clashes, self).exec()
+
+    def _on_clashes_failed(self, message: str) -> None:
+        self._clashes_task = None
+        self.validateScheduleButton.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка проверки расписания", message)
+
+    def _on_schedule_loaded(self, grid) -> None:
+        self._schedule_task = None
+        self.schedule.setModel(ScheduleTableModel(*grid))
+        profiling.mark("schedule", "loaded")
 
 __all__ = ["MainWindow"]
@@ -1,10 +1,16 @@
+from datetime import datetime, time, timedelta
 from enum import StrEnum, auto
-from sqlmodel import Session, select, exists
+from typing import Any, Callable, List, Set, Tuple
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
 
-from PyQt6 import QtWidgets, QtCore, uic
+from PyQt6 import QtWidgets, QtCore
 
-from app.db import ENGINE
+from app.db.availability import busy_area_ids, free_locations
 from app.db.models import Area, Event, Location, Reservation
+from app.db.slots import Slot, find_slots
+from app.ui.forms import load_ui
+from app.ui.tasks import QueryTask, run_query
 
 
 class Fields(StrEnum):
@@ -18,7 +24,7 @@ class Fields(StrEnum):
 class WelcomePage(QtWidgets.QWizardPage):    
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
-        uic.loadUi("app/ui/assets/wizards/welcome-page.ui", self)
+        load_ui("app/ui/assets/wizards/welcome-page.ui", self)
         self.registerField(Fields.START_AT, self.startDateTimeEdit)
         self.registerField(Fields.END_AT, self.endDateTimeEdit)
 
@@ -36,10 +42,51 @@ class WelcomePage(QtWidgets.QWizardPage):
         return super().validatePage()
 
 
-class ResultsPage(QtWidgets.QWizardPage):
+class QueryPage(QtWidgets.QWizardPage):
+    """
+    A page filled from a query run off the GUI thread.
+
+    A new query cancels the one still running, and so does leaving the page
+    or closing the wizard.
+    """
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._task: QueryTask | None = None
+
+    def runQuery(self, job: Callable[[Session], Any], on_finished: Callable[[Any], None]) -> None:
+        self.cancelQuery()
+
+        def finished(result: Any) -> None:
+            self._task = None
+            self.unsetCursor()
+            on_finished(result)
+
+        self._task = run_query(job, finished, self._onFailed)
+        self.setCursor(QtCore.Qt.CursorShape.BusyCursor)
+
+    def cancelQuery(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.unsetCursor()
+
+    def cleanupPage(self) -> None:
+        self.cancelQuery()
+        super().cleanupPage()
+
+    def _onFailed(self, message: str) -> None:
+        self._task = None
+        self.unsetCursor()
+        QtWidgets.QMessageBox.critical(self, "Ошибка поиска", message)
+
+
+class ResultsPage(QueryPage):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
-        uic.loadUi("app/ui/assets/wizards/results-page.ui", self)
+        load_ui("app/ui/assets/wizards/results-page.ui", self)
+        # The locations with areas, which lead to the areas page.
+        self.locationsWithAreas: Set[int] = set()
         
         # self.registerField(Fields.PLACE_ID, self.listWidget)
         spin = QtWidgets.QSpinBox(self)
@@ -52,58 +99,20 @@ class ResultsPage(QtWidgets.QWizardPage):
 
         start_at = self.field(Fields.START_AT).toPyDateTime()
         end_at = self.field(Fields.END_AT).toPyDateTime()
-        
-        # Так писать нельзя, позже отрефакторю! Но оно работает :)
-        with Session(ENGINE) as session:
-            locations = session.exec(select(Location)).all()
-            free = []
-            for location in locations:
-
-                # Полностью пустое
-                if not(any(location.areas) or any(location.reservations)):
-                    free.append(location)
-                    continue
-
-                # Бронирование не пересекается
-                if (any(reservation.start_at < reservation.end_at < start_at < end_at for reservation in location.reservations)
-                    or any(start_at < end_at < reservation.start_at < reservation.end_at for reservation in location.reservations)):
-
-                    # Нет зон
-                    if not(any(location.areas)):
-                        free.append(location)
-                        continue
-                    
-                    for area in location.areas:
-                        
-                        # Полностью пустое
-                        if not any(area.reservations):
-                            free.append(location)
-                            break
-                        
-                        # Бронирование не пересекается
-                        if (any(reservation.start_at < reservation.end_at < start_at < end_at for reservation in area.reservations)
-                            or any(start_at < end_at < reservation.start_at < reservation.end_at for reservation in area.reservations)):
-                            free.append(location)
-                            break
-
-                    continue
-
-                for area in location.areas:
-                        
-                    # Полностью пустое
-                    if not any(area.reservations):
-                        free.append(location)
-                        break
-                    
-                    # Бронирование не пересекается
-                    if (any(reservation.start_at < reservation.end_at < start_at < end_at for reservation in area.reservations)
-                        or any(start_at < end_at < reservation.start_at < reservation.end_at for reservation in area.reservations)):
-                        free.append(location)
-                        break
-
-            names = list(location.name for location in free)
-
-        self.listWidget.addItems(names)
+
+        def job(session: Session) -> Tuple[List[Tuple[int, str]], Set[int]]:
+            locations = [(location.id, location.name) for location in free_locations(session, start_at, end_at)]
+            with_areas = set(session.exec(select(Area.location_id).where(Area.location_id.is_not(None)).distinct()))
+            return locations, with_areas
+
+        self.runQuery(job, self._onLoaded)
+
+    def _onLoaded(self, result: Tuple[List[Tuple[int, str]], Set[int]]) -> None:
+        locations, self.locationsWithAreas = result
+        for id, name in locations:
+            item = QtWidgets.QListWidgetItem(name)
+            item.setData(QtCore.Qt.ItemDataRole.UserRole, id)
+            self.listWidget.addItem(item)
 
         # print(start_at)
         # end_at = self.field("end_at").toPyDateTime().strftime("%d.%m.%Y %H:%M")
@@ -114,18 +123,82 @@ class ResultsPage(QtWidgets.QWizardPage):
         return bool(self.listWidget.selectedIndexes())
         
     def validatePage(self) -> bool:        
-        with Session(ENGINE) as session:
-            name = self.listWidget.currentItem().data(QtCore.Qt.ItemDataRole.DisplayRole)
-            location_id = session.exec(select(Location.id).where(Location.name == name)).first()
-            self.setField(Fields.PLACE_ID, location_id)
+        self.setField(Fields.PLACE_ID, self.listWidget.currentItem().data(QtCore.Qt.ItemDataRole.UserRole))
 
         return super().validatePage()
 
 
-class AreasPage(QtWidgets.QWizardPage):
+class SlotsPage(QueryPage):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
-        uic.loadUi("app/ui/assets/wizards/areas-page.ui", self)
+        load_ui("app/ui/assets/wizards/slots-page.ui", self)
+        self.slots = []
+        self.searchButton.clicked.connect(self.search)
+        self.listWidget.itemSelectionChanged.connect(lambda: self.completeChanged.emit())
+
+    def initializePage(self) -> None:
+        self.search()
+
+    def search(self) -> None:
+        self.listWidget.clear()
+        self.slots = []
+
+        duration = timedelta(minutes=self.durationTimeEdit.time().msecsSinceStartOfDay() // 60000)
+        # The reservation must not end before the event starts.
+        start_at = max(
+            self.field(Fields.START_AT).toPyDateTime(), self.wizard()._event.start_at - duration
+        )
+        end_at = self.field(Fields.END_AT).toPyDateTime()
+        areas = self.areasSpinBox.value()
+        day_start = self.dayStartTimeEdit.time().toPyTime()
+        day_end = self.dayEndTimeEdit.time().toPyTime()
+        # Closing before opening means past midnight; midnight to midnight is round the clock.
+        if day_start == day_end and day_start != time.min:
+            self.cancelQuery()
+            self.completeChanged.emit()
+            QtWidgets.QMessageBox.critical(self, "Ошибка валидации!", "Время открытия и закрытия совпадает!")
+            return
+
+        self.runQuery(
+            lambda session: find_slots(
+                session, start_at, end_at, duration, areas=areas, day_start=day_start, day_end=day_end
+            ),
+            self._onFound,
+        )
+        self.completeChanged.emit()
+
+    def _onFound(self, slots: List[Slot]) -> None:
+        self.slots = slots
+        for slot in self.slots:
+            text = f"{slot.start_at:%d.%m.%Y %H:%M} – {slot.end_at:%H:%M} · {slot.location}"
+            if slot.free_area_ids:
+                text += f" · свободных зон: {len(slot.free_area_ids)}"
+            self.listWidget.addItem(text)
+        self.completeChanged.emit()
+
+    def selectedSlot(self) -> Slot | None:
+        row = self.listWidget.currentRow()
+        if row < 0 or row >= len(self.slots) or not self.listWidget.selectedIndexes():
+            return None
+        return self.slots[row]
+
+    def isComplete(self) -> bool:
+        return self.selectedSlot() is not None
+
+    def validatePage(self) -> bool:
+        slot = self.selectedSlot()
+        if slot is None:
+            return False
+        self.setField(Fields.START_AT, QtCore.QDateTime(slot.start_at))
+        self.setField(Fields.END_AT, QtCore.QDateTime(slot.end_at))
+        self.setField(Fields.PLACE_ID, slot.location_id)
+        return super().validatePage()
+
+
+class AreasPage(QueryPage):
+    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        load_ui("app/ui/assets/wizards/areas-page.ui", self)
         self.location = None
         lst = QtWidgets.QListWidget(self)
         lst.setVisible(False)
@@ -149,29 +222,28 @@ class AreasPage(QtWidgets.QWizardPage):
         start_at = self.field(Fields.START_AT).toPyDateTime()
         end_at = self.field(Fields.END_AT).toPyDateTime()
         location_id: int = self.field(Fields.PLACE_ID)
+        self.location = None
 
-        with Session(ENGINE) as session:
-            self.location = session.get(Location, location_id)
-            for area in self.location.areas:
-                item = QtWidgets.QListWidgetItem(area.name)
-                
-                is_busy = True
-                
-                # Полностью пустое
-                if not any(area.reservations):
-                    is_busy = False
-    
-                # Бронирование не пересекается
-                if (any(reservation.start_at < reservation.end_at < start_at < end_at for reservation in area.reservations)
-                    or any(start_at < end_at < reservation.start_at < reservation.end_at for reservation in area.reservations)):
-                    is_busy = False
-                
-                flags = QtCore.Qt.ItemFlag.NoItemFlags if is_busy else QtCore.Qt.ItemFlag.ItemIsEnabled
-
-                item.setFlags(flags | QtCore.Qt.ItemFlag.ItemIsUserCheckable)
-                item.setCheckState(QtCore.Qt.CheckState.Unchecked)
-                self.listWidget.addItem(item)
+        def job(session: Session) -> Tuple[Location, Set[int]]:
+            # The wizard reserves the areas after the session is closed.
+            location = session.exec(
+                select(Location).where(Location.id == location_id).options(selectinload(Location.areas))
+            ).one()
+            return location, busy_area_ids(session, location_id, start_at, end_at)
+
+        self.runQuery(job, self._onLoaded)
         return super().initializePage()
+
+    def _onLoaded(self, result: Tuple[Location, Set[int]]) -> None:
+        self.location, busy = result
+        for area in self.location.areas:
+            item = QtWidgets.QListWidgetItem(area.name)
+
+            flags = QtCore.Qt.ItemFlag.NoItemFlags if area.id in busy else QtCore.Qt.ItemFlag.ItemIsEnabled
+
+            item.setFlags(flags | QtCore.Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(QtCore.Qt.CheckState.Unchecked)
+            self.listWidget.addItem(item)
     
     def isComplete(self) -> bool:
         return any(self.listWidget.item(i).checkState() == QtCore.Qt.CheckState.Checked for i in range(self.listWidget.count()))
@@ -191,7 +263,7 @@ class AreasPage(QtWidgets.QWizardPage):
 class FinalPage(QtWidgets.QWizardPage):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
-        uic.loadUi("app/ui/assets/wizards/final-page.ui", self)
+        load_ui("app/ui/assets/wizards/final-page.ui", self)
         self.registerField(Fields.COMMENT, self.commentTextEdit)
         
     def validatePage(self) -> bool:
@@ -210,23 +282,36 @@ class ReservationWizard(QtWidgets.QWizard):
         self.resultsPage = ResultsPage()
         self.areasPage = AreasPage()
         self.finalPage = FinalPage()
+        self.slotsPage = SlotsPage()
 
         self.addPage(self.welcomePage)
         self.addPage(self.resultsPage)
-        self.addPage(self.areasPage)
-        self.addPage(self.finalPage)
+        self.areasPageId = self.addPage(self.areasPage)
+        self.finalPageId = self.addPage(self.finalPage)
+        self.slotsPageId = self.addPage(self.slotsPage)
 
         self.button(QtWidgets.QWizard.WizardButton.FinishButton).clicked.connect(self.createReservation)
+        self.finished.connect(self.cancelQueries)
+
+    def cancelQueries(self) -> None:
+        for page in (self.resultsPage, self.slotsPage, self.areasPage):
+            page.cancelQuery()
 
     def nextId(self) -> int:
-        if self.currentPage() != self.resultsPage:
+        page = self.currentPage()
+        if page == self.welcomePage and self.welcomePage.searchCheckBox.isChecked():
+            return self.slotsPageId
+        if page == self.finalPage:
+            return -1
+        if page == self.slotsPage:
+            slot = self.slotsPage.selectedSlot()
+            # A slot of the whole location is reserved without areas.
+            return self.areasPageId if slot is not None and slot.free_area_ids else self.finalPageId
+        if page != self.resultsPage:
             return super().nextId()
 
         location_id: int = self.field(Fields.PLACE_ID)
-        with Session(ENGINE) as session:
-            (ret, ), = session.query(exists().where(Area.location_id == location_id))
-        
-        if ret:
+        if location_id in self.resultsPage.locationsWithAreas:
             return super().nextId()
         return self.currentId() + 2
 
@@ -239,5 +324,5 @@ class ReservationWizard(QtWidgets.QWizard):
             location_id=self.field(Fields.PLACE_ID),
         )
         
-        if self.areasPage.location:
+        if self.areasPage.location and self.hasVisitedPage(self.areasPageId):
             self.reservation.areas = list(area for area in self.areasPage.location.areas if area.id in self.field(Fields.AREA_IDS))
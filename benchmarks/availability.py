@@ -0,0 +1,107 @@
+"""
+Times the set-based availability queries against a per-location Python scan.
+
+Usage:
+    python -m benchmarks.availability [--locations 300] [--reservations 12000]
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from sqlmodel import Session, create_engine, insert, select
+
+from app.db.availability import busy_area_ids, free_locations
+from app.db.models import Area, AreaReservationLink, BaseModel, Location, Reservation
+
+EPOCH = datetime(2020, 1, 1)
+HORIZON_HOURS = 2 * 365 * 24
+
+
+def seed(session: Session, locations: int, reservations: int) -> None:
+    # Bulk inserts skip the flush-time conflict check; the random reservations overlap.
+    rnd = random.Random(0)
+    session.execute(insert(Location), [{"id": i, "name": f"Помещение {i}"} for i in range(1, locations + 1)])
+    area_ids = {}
+    areas = []
+    for location_id in range(1, locations + 1):
+        area_ids[location_id] = []
+        for j in range(rnd.randint(0, 4)):
+            areas.append({"id": len(areas) + 1, "name": f"Зона {j}", "location_id": location_id})
+            area_ids[location_id].append(len(areas))
+    if areas:
+        session.execute(insert(Area), areas)
+    rows, links = [], []
+    for reservation_id in range(1, reservations + 1):
+        location_id = rnd.randint(1, locations)
+        start_at = EPOCH + timedelta(hours=rnd.randrange(HORIZON_HOURS))
+        rows.append(
+            {
+                "id": reservation_id,
+                "start_at": start_at,
+                "end_at": start_at + timedelta(hours=rnd.randint(1, 6)),
+                "location_id": location_id,
+            }
+        )
+        location_areas = area_ids[location_id]
+        for area_id in rnd.sample(location_areas, rnd.randint(1, len(location_areas)) if location_areas else 0):
+            links.append({"area_id": area_id, "reservation_id": reservation_id})
+    session.execute(insert(Reservation), rows)
+    if links:
+        session.execute(insert(AreaReservationLink), links)
+    session.commit()
+
+
+def scan(session: Session, start_at: datetime, end_at: datetime) -> list[str]:
+    def is_free(reservations):
+        return all(r.end_at <= start_at or r.start_at >= end_at for r in reservations)
+
+    free = []
+    for location in session.exec(select(Location).order_by(Location.name)).all():
+        whole = [r for r in location.reservations if not r.areas]
+        if not is_free(whole):
+            continue
+        if not location.areas or any(is_free(area.reservations) for area in location.areas):
+            free.append(location.name)
+    return free
+
+
+def measure(label: str, func, repeat: int):
+    started = perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (perf_counter() - started) / repeat
+    print(f"{label:<24}{elapsed * 1000:>10.1f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--locations", type=int, default=300)
+    parser.add_argument("--reservations", type=int, default=12000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    BaseModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, args.locations, args.reservations)
+
+    start_at = EPOCH + timedelta(days=400, hours=10)
+    end_at = start_at + timedelta(hours=3)
+
+    with Session(engine) as session:
+        measure("python scan", lambda: scan(session, start_at, end_at), 1)
+    with Session(engine) as session:
+        free = measure(
+            "free_locations",
+            lambda: [l.name for l in free_locations(session, start_at, end_at)],
+            args.repeat,
+        )
+        measure("busy_area_ids", lambda: busy_area_ids(session, 1, start_at, end_at), args.repeat)
+
+    print(f"{len(free)} of {args.locations} locations are free")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compares insert and query throughput of the default and the tuned SQLite engine.
+
+Usage:
+    python -m benchmarks.engine [--rows 20000] [--batch 100]
+"""
+import argparse
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from sqlmodel import Session, create_engine, select, func
+
+from app.db import make_engine
+from app.db.models import BaseModel, Event, EventType, Scope
+
+
+def run(label: str, engine, rows: int, batch: int) -> None:
+    BaseModel.metadata.create_all(engine)
+    rnd = random.Random(0)
+
+    with Session(engine) as session:
+        session.add_all(EventType(id=i, name=f"Тип {i}") for i in range(1, 11))
+        session.commit()
+
+    started = perf_counter()
+    for offset in range(0, rows, batch):
+        with Session(engine) as session:
+            session.add_all(
+                Event(
+                    title=f"Мероприятие {offset + i}",
+                    start_at=datetime(2024, 1, 1) + timedelta(hours=rnd.randrange(20000)),
+                    scope=Scope.ENTERTAINMENT,
+                    type_id=rnd.randint(1, 10),
+                )
+                for i in range(batch)
+            )
+            session.commit()
+    inserted = perf_counter() - started
+
+    started = perf_counter()
+    queries = 200
+    for i in range(queries):
+        with Session(engine) as session:
+            session.exec(
+                select(func.count())
+                .select_from(Event)
+                .join(EventType)
+                .where(EventType.name == f"Тип {i % 10 + 1}", Event.title.contains(str(i)))
+            ).one()
+    queried = perf_counter() - started
+
+    print(f"{label:<10}{rows / inserted:>12.0f} rows/s inserted{queries / queried:>12.1f} queries/s")
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        default = f"sqlite:///{os.path.join(directory, 'default.sqlite3')}"
+        tuned = f"sqlite:///{os.path.join(directory, 'tuned.sqlite3')}"
+        run("default", create_engine(default), args.rows, args.batch)
+        run("tuned", make_engine(tuned), args.rows, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Times the statements built by `where_related` against the joins tables used before.
+
+For every case the number of emitted SQL statements, returned rows and
+distinct objects is printed; `tests/test_filters.py` checks the results.
+
+Usage:
+    python -m benchmarks.filters [--events 5000]
+"""
+import argparse
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Iterator, List
+
+from sqlalchemy import event
+from sqlmodel import Session, create_engine, select
+
+from app.db.models import BaseModel, Event, EventType, Location, Reservation, Scope
+from app.db.query import relationship_path, where_related
+
+
+def seed(session: Session, events: int) -> None:
+    rnd = random.Random(0)
+    session.add_all(EventType(id=i, name=f"Тип {i}") for i in range(1, 11))
+    session.add_all(Location(id=i, name=f"Помещение {i}") for i in range(1, 21))
+    session.flush()
+    for id in range(1, events + 1):
+        start_at = datetime(2024, 1, 1) + timedelta(hours=rnd.randrange(10000))
+        session.add(
+            Event(
+                id=id,
+                title=f"Мероприятие {id}",
+                start_at=start_at,
+                scope=Scope.ENTERTAINMENT,
+                type_id=rnd.randint(1, 10),
+            )
+        )
+        for _ in range(rnd.randint(0, 3)):
+            session.add(
+                Reservation(
+                    start_at=start_at,
+                    end_at=start_at + timedelta(hours=2),
+                    event_id=id,
+                    location_id=rnd.randint(1, 20),
+                )
+            )
+    session.commit()
+
+
+@contextmanager
+def counted(engine) -> Iterator[List[str]]:
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def run(engine, label: str, statement) -> None:
+    with Session(engine) as session, counted(engine) as statements:
+        started = perf_counter()
+        ids = session.exec(statement.with_only_columns(Event.id)).all()
+        elapsed = perf_counter() - started
+    print(
+        f"{label:<40}{len(statements):>3} statements{str(statement).count('JOIN'):>3} joins"
+        f"{len(ids):>7} rows{len(set(ids)):>7} distinct{elapsed * 1000:>8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    BaseModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, args.events)
+
+    title = Event.title.contains("1")
+    type_name = EventType.name == "Тип 3"
+    location_id = Reservation.location_id == 7
+
+    print("before:")
+    run(engine, "title, inactive type filter", select(Event).join(EventType, isouter=True).where(title))
+    run(engine, "title and type", select(Event).join(EventType, isouter=True).where(title, type_name))
+    run(engine, "location through reservations", select(Event).join(Reservation).where(location_id))
+
+    print("planned:")
+    cases = {
+        "title, inactive type filter": [((), title)],
+        "title and type": [((), title), (relationship_path(Event, EventType), type_name)],
+        "location through reservations": [(relationship_path(Event, Reservation), location_id)],
+    }
+    for label, conditions in cases.items():
+        run(engine, label, where_related(select(Event), Event, conditions))
+
+
+if __name__ == "__main__":
+    main()
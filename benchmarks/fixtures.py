@@ -0,0 +1,275 @@
+"""
+Fills a database with synthetic data in the volumes of a large installation.
+
+At `--scale 1` the database holds 1k locations with 10k areas, 250k events
+with 1M reservations and their area links, 500k assignments and 5k clubs
+with their schedules. Reservations of a location never overlap, like the
+ones booked through the wizard. The rows are inserted with bulk statements,
+then the database is migrated the way the application does on startup.
+
+Usage:
+    python -m benchmarks.fixtures bench.sqlite3 [--scale 1] [--seed 0]
+"""
+import argparse
+import os
+import random
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import Engine, func, insert, select
+from sqlmodel import Session
+
+from app.db import make_engine
+from app.db.changes import ChangeLog
+from app.db.migrations import migrate
+from app.db.models import (
+    Area,
+    AreaReservationLink,
+    Assignment,
+    AssignmentType,
+    BaseModel,
+    Club,
+    ClubType,
+    DaySchedule,
+    Event,
+    EventType,
+    Location,
+    Reservation,
+    Scope,
+    Teacher,
+    Weekday,
+)
+
+VOLUMES: Dict[str, int] = {
+    "locations": 1000,
+    "events": 250000,
+    "reservations": 1000000,
+    "assignments": 500000,
+    "clubs": 5000,
+}
+"""The number of rows of the large tables at `--scale 1`."""
+
+REFERENCES: Dict[str, int] = {
+    "areas_per_location": 10,
+    "event_types": 20,
+    "assignment_types": 20,
+    "club_types": 10,
+    "teachers": 200,
+}
+"""The sizes of the reference data, which do not depend on the scale."""
+
+EPOCH = datetime(2022, 1, 1)
+BATCH = 10000
+
+WORDS = (
+    "концерт выставка лекция мастер-класс спектакль встреча фестиваль вечер "
+    "кино танцы хор музыка живопись история поэзия шахматы театр детский "
+    "семейный весенний летний осенний зимний городской праздничный открытый"
+).split()
+
+
+def _text(rnd: random.Random, words: int) -> str:
+    return " ".join(rnd.choices(WORDS, k=words)).capitalize()
+
+
+def _insert(engine: Engine, table, rows: Iterable[dict], batch: int = BATCH) -> int:
+    count = 0
+    chunk: List[dict] = []
+    with engine.begin() as connection:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == batch:
+                connection.execute(insert(table), chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            connection.execute(insert(table), chunk)
+            count += len(chunk)
+    return count
+
+
+def _named(count: int, prefix: str) -> Iterator[dict]:
+    for id in range(1, count + 1):
+        yield {"id": id, "created_at": EPOCH, "name": f"{prefix} {id}"}
+
+
+def _areas(locations: int, per_location: int) -> Iterator[dict]:
+    for location_id in range(1, locations + 1):
+        for j in range(per_location):
+            yield {
+                "id": (location_id - 1) * per_location + j + 1,
+                "created_at": EPOCH,
+                "name": f"Зона {j + 1}",
+                "location_id": location_id,
+            }
+
+
+def _events(rnd: random.Random, count: int, types: int, locations: int) -> Iterator[dict]:
+    for id in range(1, count + 1):
+        start_at = EPOCH + timedelta(hours=rnd.randrange(3 * 365 * 24))
+        yield {
+            "id": id,
+            "created_at": start_at - timedelta(days=rnd.randint(1, 60)),
+            "title": f"{_text(rnd, 3)} №{id}",
+            "description": _text(rnd, 12),
+            "start_at": start_at,
+            "scope": rnd.choice((Scope.ENTERTAINMENT, Scope.ENLIGHTENMENT)),
+            "type_id": rnd.randint(1, types),
+            "location_id": rnd.randint(1, locations) if rnd.random() < 0.3 else None,
+        }
+
+
+def _reservations(
+    rnd: random.Random, count: int, locations: int, events: int, booked: List[Tuple[int, int]]
+) -> Iterator[dict]:
+    # Every location gets an equal share, booked back to back with random gaps.
+    per_location = count // locations
+    id = 0
+    for location_id in range(1, locations + 1):
+        start_at = EPOCH
+        for _ in range(per_location + (location_id <= count % locations)):
+            id += 1
+            start_at += timedelta(hours=rnd.randint(0, 48))
+            end_at = start_at + timedelta(hours=rnd.randint(1, 6))
+            yield {
+                "id": id,
+                "created_at": start_at - timedelta(days=rnd.randint(1, 30)),
+                "start_at": start_at,
+                "end_at": end_at,
+                "comment": _text(rnd, 4) if rnd.random() < 0.2 else None,
+                "event_id": rnd.randint(1, events),
+                "location_id": location_id,
+            }
+            start_at = end_at
+            booked.append((id, location_id))
+
+
+def _links(rnd: random.Random, booked: List[Tuple[int, int]], per_location: int) -> Iterator[dict]:
+    # Half of the reservations take one to three areas, the rest the whole location.
+    for reservation_id, location_id in booked:
+        if per_location and rnd.random() < 0.5:
+            first = (location_id - 1) * per_location + 1
+            for area_id in rnd.sample(range(first, first + per_location), min(rnd.randint(1, 3), per_location)):
+                yield {"area_id": area_id, "reservation_id": reservation_id}
+
+
+def _assignments(rnd: random.Random, count: int, types: int, locations: int, events: int) -> Iterator[dict]:
+    states = list(Assignment.State)
+    for id in range(1, count + 1):
+        created_at = EPOCH + timedelta(minutes=rnd.randrange(3 * 365 * 24 * 60))
+        yield {
+            "id": id,
+            "created_at": created_at,
+            "state": rnd.choice(states),
+            "deadline": created_at + timedelta(days=rnd.randint(1, 90)),
+            "description": _text(rnd, 8),
+            "type_id": rnd.randint(1, types),
+            "location_id": rnd.randint(1, locations),
+            "event_id": rnd.randint(1, events) if rnd.random() < 0.7 else None,
+        }
+
+
+def _clubs(rnd: random.Random, count: int, types: int, teachers: int, locations: int, days: List[dict]) -> Iterator[dict]:
+    for id in range(1, count + 1):
+        for weekday in rnd.sample(list(Weekday), rnd.randint(1, 3)):
+            start_at = rnd.randint(9, 19)
+            days.append(
+                {
+                    "created_at": EPOCH,
+                    "weekday": weekday,
+                    "start_at": time(start_at),
+                    "end_at": time(start_at + rnd.randint(1, 3)),
+                    "club_id": id,
+                }
+            )
+        yield {
+            "id": id,
+            "created_at": EPOCH,
+            "title": f"{_text(rnd, 2)} №{id}",
+            "start_at": date(2022, 9, 1) + timedelta(days=rnd.randint(0, 700)),
+            "type_id": rnd.randint(1, types),
+            "teacher_id": rnd.randint(1, teachers),
+            "location_id": rnd.randint(1, locations),
+        }
+
+
+def volumes(scale: float) -> Dict[str, int]:
+    """Returns `VOLUMES` scaled down or up, keeping at least one row of every table."""
+    return {name: max(1, round(count * scale)) for name, count in VOLUMES.items()} | REFERENCES
+
+
+def seed(engine: Engine, scale: float = 1, seed: int = 0) -> Dict[str, int]:
+    """
+    Creates the schema and fills it with synthetic data.
+
+    Args:
+        engine (Engine): The engine of an empty database.
+        scale (float): The fraction of `VOLUMES` to insert.
+        seed (int): The seed of the random generator; equal seeds give equal data.
+
+    Returns:
+        Dict[str, int]: The number of inserted rows per table.
+    """
+    rnd = random.Random(seed)
+    v = volumes(scale)
+    BaseModel.metadata.create_all(engine)
+
+    counts = {
+        "Location": _insert(engine, Location, _named(v["locations"], "Помещение")),
+        "EventType": _insert(engine, EventType, _named(v["event_types"], "Тип мероприятия")),
+        "AssignmentType": _insert(engine, AssignmentType, _named(v["assignment_types"], "Тип работы")),
+        "ClubType": _insert(engine, ClubType, _named(v["club_types"], "Направление")),
+        "Teacher": _insert(engine, Teacher, _named(v["teachers"], "Преподаватель")),
+        "Area": _insert(engine, Area, _areas(v["locations"], v["areas_per_location"])),
+        "Event": _insert(engine, Event, _events(rnd, v["events"], v["event_types"], v["locations"])),
+    }
+
+    booked: List[Tuple[int, int]] = []
+    counts["Reservation"] = _insert(
+        engine, Reservation, _reservations(rnd, v["reservations"], v["locations"], v["events"], booked)
+    )
+    counts["AreaReservationLink"] = _insert(engine, AreaReservationLink, _links(rnd, booked, v["areas_per_location"]))
+    counts["Assignment"] = _insert(
+        engine, Assignment, _assignments(rnd, v["assignments"], v["assignment_types"], v["locations"], v["events"])
+    )
+
+    days: List[dict] = []
+    counts["Club"] = _insert(
+        engine, Club, _clubs(rnd, v["clubs"], v["club_types"], v["teachers"], v["locations"], days)
+    )
+    counts["DaySchedule"] = _insert(engine, DaySchedule, days)
+
+    migrate(engine)
+    return counts
+
+
+def row_counts(engine: Engine) -> Dict[str, int]:
+    """Returns the number of rows of every table of the application."""
+    with Session(engine) as session:
+        return {
+            table.name: session.execute(select(func.count()).select_from(table)).scalar()
+            for table in BaseModel.metadata.sorted_tables
+            if table is not ChangeLog
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="the SQLite database to create")
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+
+    started = perf_counter()
+    counts = seed(make_engine(f"sqlite:///{args.path}"), args.scale, args.seed)
+    for table, count in counts.items():
+        print(f"{table:<24}{count:>10}")
+    print(f"seeded in {perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compares parsing `.ui` files with `uic.loadUi` against the compiled forms cache.
+
+Every form of the event dialog and the reservation wizard is built
+`--repeat` times with both loaders, then the whole wizard is constructed
+with each of them.
+
+Usage:
+    python -m benchmarks.forms [--repeat 50]
+"""
+import argparse
+import os
+import sys
+from time import perf_counter
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import QtWidgets, uic
+
+from app.db.models import Event
+from app.ui import forms
+from app.ui.widgets.wizards import reservation
+
+FORMS = {
+    "app/ui/assets/dialogs/event-update.ui": QtWidgets.QDialog,
+    "app/ui/assets/wizards/welcome-page.ui": QtWidgets.QWizardPage,
+    "app/ui/assets/wizards/results-page.ui": QtWidgets.QWizardPage,
+    "app/ui/assets/wizards/areas-page.ui": QtWidgets.QWizardPage,
+    "app/ui/assets/wizards/final-page.ui": QtWidgets.QWizardPage,
+}
+
+
+def measure(func, repeat: int) -> float:
+    started = perf_counter()
+    for _ in range(repeat):
+        func()
+    return (perf_counter() - started) / repeat
+
+
+def report(label: str, parsed: float, compiled: float) -> float:
+    print(f"{label:<40}{parsed * 1000:>10.2f} ms{compiled * 1000:>10.2f} ms{parsed / compiled:>8.1f}x")
+    return parsed / compiled
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)
+    started = perf_counter()
+    forms.build()
+    print(f"built the cache in {(perf_counter() - started) * 1000:.0f} ms")
+    print(f"{'':<40}{'loadUi':>13}{'compiled':>13}{'speedup':>9}")
+
+    speedups = []
+    for ui_path, widget in FORMS.items():
+        speedups.append(
+            report(
+                os.path.basename(ui_path),
+                measure(lambda: uic.loadUi(ui_path, widget()), args.repeat),
+                measure(lambda: forms.load_ui(ui_path, widget()), args.repeat),
+            )
+        )
+
+    event = Event(title="Мероприятие")
+    with mock.patch.object(reservation, "load_ui", uic.loadUi):
+        parsed = measure(lambda: reservation.ReservationWizard(event), args.repeat)
+    compiled = measure(lambda: reservation.ReservationWizard(event), args.repeat)
+    speedups.append(report("ReservationWizard", parsed, compiled))
+    app.quit()
+
+    assert min(speedups) > 1, "the compiled forms are not faster"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Times the LIKE scan against the full-text index for substring filters on events.
+
+Usage:
+    python -m benchmarks.search [--rows 1000000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import tempfile
+from datetime import datetime
+from time import perf_counter
+from unittest import mock
+
+from sqlmodel import Session, insert, select, func
+
+from app.db import make_engine
+from app.db import search as search_module
+from app.db.migrations import migrate
+from app.db.models import BaseModel, Event, Scope
+
+SYLLABLES = "ка ло ми ре ту ви зо на пе ры да ше лю го бо ст кр мар тин лек".split()
+VOCABULARY = sorted({
+    "".join(random.Random(i).choices(SYLLABLES, k=random.Random(-i).randint(2, 4))) for i in range(20000)
+})
+QUERIES = (
+    VOCABULARY[100],
+    VOCABULARY[5000][1:5],
+    VOCABULARY[300].capitalize(),
+    f"{VOCABULARY[7]} {VOCABULARY[8]}",
+    "несуществующее",
+)
+
+
+def seed(engine, rows: int, batch: int = 10000) -> None:
+    rnd = random.Random(0)
+    created_at = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        for offset in range(0, rows, batch):
+            connection.execute(
+                insert(Event),
+                [
+                    {
+                        "created_at": created_at,
+                        "title": " ".join(rnd.choices(VOCABULARY, k=3)) + f" №{offset + i}",
+                        "description": " ".join(rnd.choices(VOCABULARY, k=12)),
+                        "start_at": created_at,
+                        "scope": Scope.ENTERTAINMENT,
+                    }
+                    for i in range(min(batch, rows - offset))
+                ],
+            )
+
+
+def measure(label: str, func, repeat: int):
+    started = perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (perf_counter() - started) / repeat
+    print(f"{label:<40}{elapsed * 1000:>10.1f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(f"sqlite:///{os.path.join(directory, 'search.sqlite3')}")
+        BaseModel.metadata.create_all(engine)
+        started = perf_counter()
+        seed(engine, args.rows)
+        print(f"seeded {args.rows} events in {perf_counter() - started:.1f} s")
+        started = perf_counter()
+        migrate(engine)
+        print(f"built the index in {perf_counter() - started:.1f} s")
+
+        with Session(engine) as session, mock.patch.object(search_module, "ENGINE", engine):
+            def count(condition):
+                return session.exec(select(func.count()).select_from(Event).where(condition)).one()
+
+            for text in QUERIES:
+                for column in (Event.title, Event.description):
+                    measure(f"LIKE  {column.key:<12}{text!r}", lambda: count(column.contains(text)), args.repeat)
+                    measure(
+                        f"FTS5  {column.key:<12}{text!r}",
+                        lambda: count(search_module.contains(column, text)),
+                        args.repeat,
+                    )
+            measure(f"quick search {QUERIES[0]!r}", lambda: search_module.search(session, QUERIES[0]), args.repeat)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
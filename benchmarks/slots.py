@@ -0,0 +1,56 @@
+"""
+Times the search of free slots across all locations.
+
+Usage:
+    python -m benchmarks.slots bench.sqlite3 [--scale 1] [--days 7] [--repeat 5]
+"""
+import argparse
+import os
+from datetime import datetime, time, timedelta
+from time import perf_counter
+
+from sqlmodel import Session
+
+from app.db import make_engine
+from app.db.migrations import migrate
+from app.db.slots import find_slots
+from benchmarks import fixtures
+
+START_AT = datetime(2023, 3, 1, 8)
+DAY_START, DAY_END = time(9), time(21)
+CASES = (
+    ("whole location, 2 h", timedelta(hours=2), 0),
+    ("1 area, 3 h", timedelta(hours=3), 1),
+    ("5 areas, 4 h", timedelta(hours=4), 5),
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("database", help="the SQLite database, seeded with `benchmarks.fixtures` if missing")
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--days", type=int, default=7, help="the length of the search window")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = make_engine(f"sqlite:///{os.path.abspath(args.database)}")
+    if not os.path.exists(args.database):
+        fixtures.seed(engine, args.scale)
+    migrate(engine)
+
+    end_at = START_AT + timedelta(days=args.days)
+    with Session(engine) as session:
+        for label, duration, areas in CASES:
+            search = lambda: find_slots(
+                session, START_AT, end_at, duration, areas, DAY_START, DAY_END, limit=10000
+            )
+            search()
+            started = perf_counter()
+            for _ in range(args.repeat):
+                slots = search()
+            elapsed = (perf_counter() - started) / args.repeat
+            print(f"{label:<24}{elapsed * 1000:>10.1f} ms{len(slots):>8} locations")
+
+
+if __name__ == "__main__":
+    main()
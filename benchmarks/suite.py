@@ -0,0 +1,296 @@
+"""
+Times the main window's operations on a large database and writes the results as JSON.
+
+The window runs headless. Each case is repeated `--repeat` times and
+reported with its median, so two result files can be compared to find
+regressions between commits:
+
+    python -m benchmarks.suite bench.sqlite3 --output before.json
+    git checkout feature
+    python -m benchmarks.suite bench.sqlite3 --output after.json --compare before.json
+
+A missing database is seeded with `benchmarks.fixtures` at `--scale` first.
+The command fails if a case of `--compare` became slower by more than
+`--tolerance`.
+
+Usage:
+    python -m benchmarks.suite bench.sqlite3 [--scale 1] [--repeat 5] [--only table]
+        [--output results.json] [--compare baseline.json] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Tuple
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# The cases and the values they filter by, in the order they are run.
+FILTERS = (
+    ("events", "Заголовок:", "концерт"),
+    ("events", "Вид:", "Тип мероприятия 3"),
+    ("assignments", "Локация:", "Помещение 7"),
+    ("reservations", "Локация:", "Помещение 7"),
+    ("clubs", "Преподаватель:", "Преподаватель 12"),
+)
+EXPORTS = (("events", ".csv"), ("events", ".json"), ("clubs", ".xlsx"))
+WIZARD_START = datetime(2023, 3, 1, 10)
+CLASHES_SINCE = date(2023, 9, 1)
+TIMEOUT = 600
+
+Case = Tuple[str, Callable[[], Callable[[], None]]]
+
+
+def wait(done: Callable[[], bool]) -> None:
+    """Runs the event loop until the queries on the pool are finished and `done` holds."""
+    from PyQt6.QtCore import QThreadPool
+    from PyQt6.QtWidgets import QApplication
+
+    started = perf_counter()
+    while True:
+        QThreadPool.globalInstance().waitForDone()
+        QApplication.processEvents()
+        if done():
+            return
+        if perf_counter() - started > TIMEOUT:
+            raise TimeoutError("the case did not finish")
+
+
+def cases(window, directory: str) -> Iterator[Case]:
+    """
+    Yields the cases with their setups.
+
+    A setup prepares a run and returns the function to time.
+    """
+    from PyQt6.QtCore import QDateTime
+    from sqlmodel import Session
+
+    from app.db import ENGINE, clashes
+    from app.db.models import Event, Scope
+    from app.ui.export import export_statement
+    from app.ui.models.models import ScheduleTableModel
+    from app.ui.widgets.tables.filters import ComboboxFilter, TextFilter
+    from app.ui.widgets.wizards.reservation import Fields, ReservationWizard
+
+    tabs = {name: index for index, (name, _, _) in enumerate(window.TABS)}
+
+    def loaded(view) -> bool:
+        return not view.model.loading and view.model.total is not None
+
+    for name, index in tabs.items():
+        view = window.view(index)
+
+        def refresh(view=view):
+            def run():
+                view.refresh()
+                wait(lambda: loaded(view))
+            return run
+
+        yield f"table.refresh.{type(view).__name__}", refresh
+
+    window.tabWidget.setCurrentWidget(window.tab_3)
+    window.tabWidget_2.setCurrentWidget(window.tab_5)
+
+    def schedule_query():
+        def run():
+            with Session(ENGINE) as session:
+                ScheduleTableModel.query(session)
+        return run
+
+    def schedule_render():
+        with Session(ENGINE) as session:
+            grid = ScheduleTableModel.query(session)
+
+        def run():
+            window.schedule.setModel(ScheduleTableModel(*grid))
+            window.schedule.grab()
+        return run
+
+    def schedule_clashes():
+        def run():
+            with Session(ENGINE) as session:
+                clashes.schedule_clashes(session, since=CLASHES_SINCE)
+        return run
+
+    yield "schedule.query", schedule_query
+    yield "schedule.render", schedule_render
+    yield "schedule.clashes", schedule_clashes
+
+    for name, label, value in FILTERS:
+        view = window.view(tabs[name])
+        if view._filter_box is None:
+            view.toggle_filters()
+        filter = next(filter for filter in view.filters if filter._label_text == label)
+
+        def apply(view=view, filter=filter, value=value):
+            view._filter_box.reset()
+            wait(lambda: loaded(view))
+            if isinstance(filter, TextFilter):
+                filter.lineEdit.setText(value)
+            elif isinstance(filter, ComboboxFilter):
+                filter.combobox.setCurrentText(value)
+
+            def run():
+                view._filter_box.apply()
+                wait(lambda: loaded(view))
+            return run
+
+        yield f"filter.apply.{type(view).__name__}.{label.rstrip(':')}", apply
+
+    for view in window._views.values():
+        if view._filter_box is not None:
+            view._filter_box.reset()
+    wait(lambda: all(loaded(view) for view in window._views.values()))
+
+    event = Event(id=0, title="Мероприятие", start_at=WIZARD_START, scope=Scope.ENTERTAINMENT)
+    wizard = ReservationWizard(event)
+    wizard.setField(Fields.START_AT, QDateTime(WIZARD_START))
+    wizard.setField(Fields.END_AT, QDateTime(WIZARD_START + timedelta(hours=3)))
+
+    def results():
+        return wizard.resultsPage.initializePage
+
+    def areas():
+        wizard.resultsPage.initializePage()
+        wizard.resultsPage.listWidget.setCurrentRow(0)
+        wizard.resultsPage.validatePage()
+        return wizard.areasPage.initializePage
+
+    def slots():
+        return wizard.slotsPage.search
+
+    yield "wizard.results", results
+    yield "wizard.areas", areas
+    yield "wizard.slots", slots
+
+    for name, extension in EXPORTS:
+        model = window.view(tabs[name]).model
+
+        def export(model=model, extension=extension):
+            path = os.path.join(directory, f"export{extension}")
+            return lambda: export_statement(type(model), model.query, path)
+
+        yield f"export.{type(model).__name__}.{extension[1:]}", export
+
+
+def measure(setup: Callable[[], Callable[[], None]], repeat: int) -> List[float]:
+    runs = []
+    for _ in range(repeat):
+        run = setup()
+        started = perf_counter()
+        run()
+        runs.append((perf_counter() - started) * 1000)
+    return runs
+
+
+def commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    Prints the change of every case against a previous run.
+
+    Returns:
+        List[str]: The cases slower than the baseline by more than `tolerance`.
+    """
+    regressions = []
+    print(f"\n{'':<56}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median"], result["median"]
+        change = after / before - 1 if before else 0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  slower"
+        print(f"{name:<56}{before:>9.1f} ms{after:>9.1f} ms{change:>+8.0%}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("database", help="the SQLite database to run against")
+    parser.add_argument("--scale", type=float, default=1, help="the size of a newly seeded database")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default="", help="run only the cases whose name contains this text")
+    parser.add_argument("--output", help="the JSON file to write the results to")
+    parser.add_argument("--compare", help="a JSON file of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    # The engines are created from the settings when `app.db` is imported.
+    url = f"sqlite:///{os.path.abspath(args.database)}"
+    os.environ["DATABASE_URL"] = os.environ["READONLY_DATABASE_URL"] = url
+    os.environ["CHANGE_POLL_INTERVAL"] = "0"
+
+    from PyQt6.QtWidgets import QApplication
+
+    from app.db import ENGINE
+    from app.db.migrations import migrate
+    from benchmarks import fixtures
+
+    if not os.path.exists(args.database):
+        started = perf_counter()
+        fixtures.seed(ENGINE, args.scale)
+        print(f"seeded {args.database} in {perf_counter() - started:.1f} s")
+    migrate(ENGINE)
+
+    app = QApplication(sys.argv)
+    from app.ui.widgets.windows import MainWindow
+
+    window = MainWindow()
+    window.resize(1280, 800)
+    window.show()
+    wait(lambda: True)
+
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, setup in cases(window, directory):
+            if args.only not in name:
+                continue
+            runs = measure(setup, args.repeat)
+            results[name] = {
+                "median": statistics.median(runs),
+                "min": min(runs),
+                "max": max(runs),
+                "runs": runs,
+            }
+            print(f"{name:<56}{results[name]['median']:>9.1f} ms")
+    window.close()
+    app.quit()
+
+    report = {
+        "commit": commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "rows": fixtures.row_counts(ENGINE),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="UTF-8") as file:
+            regressions = compare(results, json.load(file)["results"], args.tolerance)
+        if regressions:
+            sys.exit(f"{len(regressions)} cases are slower than the baseline")
+
+
+if __name__ == "__main__":
+    main()
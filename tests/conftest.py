@@ -0,0 +1,88 @@
+"""
+Fixtures shared by the tests.
+
+The application reads its configuration on import, so the environment is
+set up first: Qt runs headless and the global engines open in-memory
+databases. Every test gets its own in-memory database seeded with
+`benchmarks.fixtures` at `SCALE`.
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["READONLY_DATABASE_URL"] = "sqlite://"
+
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import Engine, event
+from sqlmodel import Session
+
+from app.db import make_engine
+from benchmarks import fixtures
+
+SCALE = 0.004
+"""The fraction of the benchmark volumes seeded: 4 locations, 1k events, 4k reservations."""
+
+
+@contextmanager
+def captured(engine: Engine) -> Iterator[List[Tuple[str, tuple]]]:
+    """Collects the SQL statements and parameters the engine sends to the database."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def _seeded() -> Iterator[Engine]:
+    engine = make_engine("sqlite://")
+    fixtures.seed(engine, SCALE)
+    yield engine
+    engine.dispose()
+
+
+engine = pytest.fixture(_seeded, name="engine")
+shared_engine = pytest.fixture(_seeded, scope="module", name="shared_engine")
+"""A seeded database shared by the tests of a module, which must not change it."""
+
+
+@pytest.fixture
+def session(engine: Engine) -> Iterator[Session]:
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def ui_engine(engine: Engine, qapp, monkeypatch) -> Engine:
+    """The seeded engine, used by the queries the models run on the thread pool."""
+    from app.ui import tasks
+
+    monkeypatch.setattr(tasks, "ENGINE", engine)
+    return engine
+
+
+@pytest.fixture
+def settle(qapp) -> Callable[[], None]:
+    """Returns a function that waits for the queries on the pool and delivers their results."""
+    from PyQt6.QtCore import QThreadPool
+
+    def settle() -> None:
+        for _ in range(10):
+            QThreadPool.globalInstance().waitForDone()
+            qapp.processEvents()
+
+    return settle
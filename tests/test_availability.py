@@ -0,0 +1,37 @@
+import random
+from datetime import timedelta
+
+from sqlmodel import select
+from sqlalchemy.orm import selectinload
+
+from app.db.availability import busy_area_ids, free_locations
+from app.db.models import Location, Reservation
+from benchmarks.fixtures import EPOCH
+
+
+def _intersects(reservation, start_at, end_at) -> bool:
+    return reservation.start_at < end_at and reservation.end_at > start_at
+
+
+def test_queries_match_a_scan(session):
+    locations = session.exec(
+        select(Location)
+        .options(selectinload(Location.reservations).selectinload(Reservation.areas), selectinload(Location.areas))
+        .order_by(Location.name)
+    ).all()
+    rnd = random.Random(0)
+    for _ in range(100):
+        start_at = EPOCH + timedelta(minutes=15 * rnd.randrange(4 * 24 * 365))
+        end_at = start_at + timedelta(minutes=15 * rnd.randint(1, 48))
+
+        free = []
+        for location in locations:
+            reserved = [r for r in location.reservations if _intersects(r, start_at, end_at)]
+            whole = any(not r.areas for r in reserved)
+            busy = {area.id for area in location.areas} if whole else {area.id for r in reserved for area in r.areas}
+            assert busy_area_ids(session, location.id, start_at, end_at) == busy
+            if whole:
+                continue
+            if not location.areas or any(area.id not in busy for area in location.areas):
+                free.append(location.id)
+        assert [location.id for location in free_locations(session, start_at, end_at)] == free
@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import func, inspect
+from sqlalchemy.orm import RelationshipDirection
+from sqlmodel import select
+
+from app.db.bulk import chunked, delete_by_ids, update_by_ids
+from app.db.models import Area, Club, Event, EventType, Location, Reservation, Teacher
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+
+
+def _children(session, model, ids):
+    # The rows referencing the given ones through every relationship declared on the model.
+    children = {}
+    for relationship in inspect(model).relationships:
+        (_, column), = relationship.synchronize_pairs
+        if relationship.secondary is not None:
+            count = select(func.count()).select_from(relationship.secondary).where(column.in_(ids))
+            children[relationship.key] = session.exec(count).one()
+        elif relationship.direction == RelationshipDirection.ONETOMANY:
+            child = relationship.mapper.class_
+            children[relationship.key] = set(session.exec(select(child.id).where(column.in_(ids))).all())
+    return children
+
+
+@pytest.mark.parametrize("model", [Location, Area, EventType, Event, Reservation, Teacher, Club])
+def test_delete_by_ids_cascades(session, model):
+    ids = session.exec(select(model.id).order_by(model.id).limit(3)).all()
+    before = _children(session, model, ids)
+
+    delete_by_ids(session, model, ids)
+    session.commit()
+
+    assert not session.exec(select(model.id).where(model.id.in_(ids))).all()
+    for relationship in inspect(model).relationships:
+        if relationship.key not in before:
+            continue
+        (_, column), = relationship.synchronize_pairs
+        if relationship.secondary is not None:
+            count = select(func.count()).select_from(relationship.secondary).where(column.in_(ids))
+            assert session.exec(count).one() == 0, relationship.key
+            continue
+        child = relationship.mapper.class_
+        children = before[relationship.key]
+        kept = session.exec(select(child.id, column).where(child.id.in_(children))).all()
+        if relationship.cascade.delete:
+            assert not kept, relationship.key
+        else:
+            assert {id for id, _ in kept} == children, relationship.key
+            assert all(value is None for _, value in kept), relationship.key
+    assert not session.connection().exec_driver_sql("PRAGMA foreign_key_check").all()
+
+
+def test_delete_by_ids_many_chunks(session):
+    ids = session.exec(select(Event.id)).all()
+
+    delete_by_ids(session, Event, ids)
+    session.commit()
+
+    assert session.exec(select(func.count()).select_from(Event)).one() == 0
+    assert session.exec(select(func.count()).select_from(Reservation).where(Reservation.event_id.is_not(None))).one() == 0
+    assert not session.connection().exec_driver_sql("PRAGMA foreign_key_check").all()
+
+
+def test_update_by_ids(session):
+    ids = session.exec(select(Event.id).order_by(Event.id).limit(1200)).all()
+
+    update_by_ids(session, Event, ids, description="обновлено")
+    session.commit()
+
+    updated = select(func.count()).select_from(Event).where(Event.description == "обновлено")
+    assert session.exec(updated).one() == len(ids)
@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from app.db import changes, make_engine
+from app.db.bulk import delete_by_ids, update_by_ids
+from app.db.changes import LOG_ROWS_LIMIT, ChangeFeed, ChangeLog, ModelChanges
+from app.db.models import Assignment, BaseModel, Event, Reservation
+
+
+@pytest.fixture
+def log_session():
+    engine = make_engine("sqlite://")
+    BaseModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _log(session, version: int, row_id: int, kind: str = "updated", client: str = "other") -> None:
+    session.execute(
+        insert(ChangeLog),
+        [{"version": version, "table": "Event", "row_id": row_id, "kind": kind, "client": client}],
+    )
+    session.commit()
+
+
+def test_feed_skips_own_changes(log_session):
+    feed = ChangeFeed(0)
+    _log(log_session, 1, 1)
+    _log(log_session, 2, 2, client=changes.CLIENT_ID)
+    _log(log_session, 3, 3, "inserted")
+
+    assert feed.read(log_session) == {Event: ModelChanges({3}, {1}, set())}
+    assert feed.version == 3
+    assert feed.read(log_session) == {}
+
+
+def test_feed_rereads_the_window(log_session):
+    feed = ChangeFeed(0, window=10)
+    _log(log_session, 1, 1)
+    _log(log_session, 4, 4)
+    assert feed.read(log_session) == {Event: ModelChanges(set(), {1, 4}, set())}
+
+    # A transaction allocating a lower version commits late.
+    _log(log_session, 3, 3, "deleted")
+    assert feed.read(log_session) == {Event: ModelChanges(set(), set(), {3})}
+    assert feed.read(log_session) == {}
+
+    _log(log_session, 20, 20)
+    assert feed.read(log_session) == {Event: ModelChanges(set(), {20}, set())}
+    # Versions older than the window are not read again.
+    _log(log_session, 5, 5)
+    assert feed.read(log_session) == {}
+
+
+def test_feed_starts_at_its_version(log_session):
+    _log(log_session, 1, 1)
+    _log(log_session, 2, 2)
+    feed = ChangeFeed(1, window=10)
+
+    assert feed.read(log_session) == {Event: ModelChanges(set(), {2}, set())}
+
+
+def _entries(session):
+    return session.execute(select(ChangeLog.c.table, ChangeLog.c.row_id, ChangeLog.c.kind)).all()
+
+
+def test_rows_are_logged_one_by_one(session):
+    ids = session.exec(select(Event.id).limit(3)).all()
+
+    update_by_ids(session, Event, ids, description="обновлено")
+    session.commit()
+
+    assert sorted(_entries(session)) == sorted(("Event", id, "updated") for id in ids)
+
+
+def test_bulk_changes_log_whole_tables(session, monkeypatch):
+    ids = session.exec(select(Event.id).limit(LOG_ROWS_LIMIT * 2)).all()
+
+    delete_by_ids(session, Event, ids)
+    session.commit()
+
+    entries = _entries(session)
+    assert len(entries) == len({table for table, _, _ in entries})
+    assert ("Event", 0, "table") in entries
+
+    monkeypatch.setattr(changes, "CLIENT_ID", "reader")
+    read = ChangeFeed(0).read(session)
+    assert read[Event].whole
+    assert read[Reservation].whole
+    assert read[Assignment].whole
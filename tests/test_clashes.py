@@ -0,0 +1,89 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlmodel import Session
+
+from app.db import make_engine
+from app.db.clashes import ClashKind, schedule_clashes, sweep
+from app.db.migrations import migrate
+from app.db.models import BaseModel, Club, DaySchedule, Location, Reservation, Teacher, Weekday
+
+MONDAY = date(2024, 1, 1)
+
+
+def test_sweep_matches_brute_force():
+    rnd = random.Random(0)
+    intervals = []
+    for index in range(300):
+        start_at = datetime(2024, 1, 1) + timedelta(minutes=15 * rnd.randrange(500))
+        intervals.append((rnd.randrange(3), start_at, start_at + timedelta(minutes=15 * rnd.randint(1, 12)), index))
+
+    found = [frozenset(pair) for pair in sweep(intervals)]
+    expected = {
+        frozenset((a[3], b[3]))
+        for a in intervals
+        for b in intervals
+        if a[3] < b[3] and a[0] == b[0] and a[1] < b[2] and b[1] < a[2]
+    }
+    assert len(found) == len(set(found))
+    assert set(found) == expected
+
+
+@pytest.fixture
+def schedule():
+    engine = make_engine("sqlite://")
+    BaseModel.metadata.create_all(engine)
+    migrate(engine)
+    with Session(engine) as session:
+        hall, studio = Location(name="Зал"), Location(name="Студия")
+        first, second, third = Teacher(name="Первый"), Teacher(name="Второй"), Teacher(name="Третий")
+
+        def club(title, location, teacher, weekday, start_at, end_at):
+            return Club(
+                title=title,
+                start_at=MONDAY,
+                location=location,
+                teacher=teacher,
+                days=[DaySchedule(weekday=weekday, start_at=time(*start_at), end_at=time(*end_at))],
+            )
+
+        clubs = {
+            "choir": club("Хор", hall, first, Weekday.MONDAY, (10,), (12,)),
+            "dance": club("Танцы", hall, second, Weekday.MONDAY, (11,), (13,)),
+            "chess": club("Шахматы", studio, first, Weekday.MONDAY, (11, 30), (12, 30)),
+            "drama": club("Театр", hall, third, Weekday.TUESDAY, (10,), (12,)),
+        }
+        reservation = Reservation(
+            start_at=datetime(2024, 1, 8, 12, 30), end_at=datetime(2024, 1, 8, 14), location=hall
+        )
+        session.add_all([*clubs.values(), reservation])
+        session.commit()
+        ids = {name: club.id for name, club in clubs.items()} | {"reservation": reservation.id}
+        yield session, ids
+    engine.dispose()
+
+
+def test_schedule_clashes(schedule):
+    session, ids = schedule
+
+    clashes = schedule_clashes(session, MONDAY, weeks=2)
+
+    found = {(c.kind, c.club_id, c.other_club_id, c.reservation_id, c.start_at, c.count) for c in clashes}
+    assert found == {
+        (ClashKind.LOCATION, ids["choir"], ids["dance"], None, datetime(2024, 1, 1, 10), 2),
+        (ClashKind.TEACHER, ids["choir"], ids["chess"], None, datetime(2024, 1, 1, 10), 2),
+        (ClashKind.LOCATION, ids["dance"], None, ids["reservation"], datetime(2024, 1, 8, 11), 1),
+    }
+
+
+def test_clashes_of_an_edited_club(schedule):
+    session, ids = schedule
+
+    clashes = schedule_clashes(session, MONDAY, weeks=2, club=session.get(Club, ids["dance"]))
+
+    found = {(c.kind, c.club_id, c.other_club_id, c.reservation_id, c.count) for c in clashes}
+    assert found == {
+        (ClashKind.LOCATION, ids["dance"], ids["choir"], None, 2),
+        (ClashKind.LOCATION, ids["dance"], None, ids["reservation"], 1),
+    }
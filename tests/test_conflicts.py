@@ -0,0 +1,99 @@
+import random
+from datetime import timedelta
+
+import pytest
+from sqlmodel import func, select
+
+from app.db.availability import overlaps
+from app.db.bulk import delete_by_ids, update_by_ids
+from app.db.conflicts import SPANS, ReservationConflict, conflicts, overlapping
+from app.db.models import AreaReservationLink, Reservation
+from benchmarks.fixtures import EPOCH
+
+
+def _assert_index_agrees(session, seed: int = 0):
+    connection = session.connection()
+    rnd = random.Random(seed)
+    for _ in range(50):
+        start_at = EPOCH + timedelta(hours=rnd.randrange(2 * 365 * 24))
+        end_at = start_at + timedelta(minutes=rnd.randint(1, 48 * 60))
+        for location_id in (None, rnd.randint(1, 4)):
+            found = connection.execute(overlapping(connection, start_at, end_at, location_id)).all()
+            location = (
+                Reservation.location_id.is_not(None) if location_id is None else Reservation.location_id == location_id
+            )
+            expected = connection.execute(select(Reservation.id).where(location, overlaps(start_at, end_at))).all()
+            assert sorted(row.id for row in found) == sorted(id for id, in expected)
+
+
+def _whole_location(session, offset: int = 0) -> Reservation:
+    linked = select(AreaReservationLink.reservation_id)
+    return session.exec(
+        select(Reservation).where(Reservation.id.not_in(linked)).order_by(Reservation.id).offset(offset).limit(1)
+    ).one()
+
+
+def test_index_follows_the_reservations(session):
+    _assert_index_agrees(session)
+    spans = select(func.count()).select_from(SPANS)
+    assert session.exec(spans).one() == session.exec(select(func.count()).select_from(Reservation)).one()
+
+    moved = _whole_location(session)
+    start_at = moved.start_at + timedelta(days=3000)
+    update_by_ids(session, Reservation, [moved.id], start_at=start_at, end_at=start_at + timedelta(hours=1))
+    unplaced = _whole_location(session, 1)
+    update_by_ids(session, Reservation, [unplaced.id], location_id=None)
+    delete_by_ids(session, Reservation, [_whole_location(session, 2).id])
+    session.add(Reservation(start_at=start_at, end_at=start_at + timedelta(hours=1), location_id=2))
+    session.commit()
+
+    _assert_index_agrees(session, 1)
+    placed = select(func.count()).select_from(Reservation).where(Reservation.location_id.is_not(None))
+    assert session.exec(spans).one() == session.exec(placed).one()
+    found = session.connection().execute(overlapping(session.connection(), start_at, start_at + timedelta(hours=1)))
+    assert moved.id in {row.id for row in found}
+
+
+def test_overlapping_insert_is_rejected(session):
+    booked = _whole_location(session)
+    session.add(
+        Reservation(
+            start_at=booked.start_at + timedelta(minutes=30),
+            end_at=booked.end_at + timedelta(hours=1),
+            location_id=booked.location_id,
+        )
+    )
+    with pytest.raises(ReservationConflict):
+        session.flush()
+
+
+def test_adjacent_insert_is_accepted(session):
+    booked = _whole_location(session)
+    later = session.exec(
+        select(func.min(Reservation.start_at)).where(
+            Reservation.location_id == booked.location_id, Reservation.start_at >= booked.end_at
+        )
+    ).one()
+    if later == booked.end_at:
+        pytest.skip("the next reservation starts right away")
+    gap = Reservation(start_at=booked.end_at, end_at=later, location_id=booked.location_id)
+    session.add(gap)
+    session.commit()
+
+    assert not conflicts(session.connection(), gap.location_id, gap.start_at, gap.end_at, exclude_id=gap.id)
+
+
+def test_bulk_move_is_checked(session):
+    booked, moved = _whole_location(session), _whole_location(session, 5)
+
+    update_by_ids(session, Reservation, [moved.id], comment="перенесено")
+    session.flush()
+    with pytest.raises(ReservationConflict):
+        update_by_ids(
+            session,
+            Reservation,
+            [moved.id],
+            start_at=booked.start_at,
+            end_at=booked.end_at,
+            location_id=booked.location_id,
+        )
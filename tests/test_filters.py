@@ -0,0 +1,55 @@
+import pytest
+from sqlmodel import select
+from sqlalchemy.orm import selectinload
+
+from app.db.models import Area, Event, EventType, Reservation
+from app.db.query import relationship_path, where_related
+from tests.conftest import captured
+
+TITLE = Event.title.contains("1")
+TYPE_NAME = EventType.name == "Тип мероприятия 3"
+LOCATION_ID = Reservation.location_id == 2
+AREA_ID = Area.id == 5
+
+CASES = {
+    "title, inactive type filter": (
+        [((), TITLE)],
+        lambda e: "1" in e.title,
+    ),
+    "title and type": (
+        [((), TITLE), (relationship_path(Event, EventType), TYPE_NAME)],
+        lambda e: "1" in e.title and e.type.name == "Тип мероприятия 3",
+    ),
+    "location through reservations": (
+        [(relationship_path(Event, Reservation), LOCATION_ID)],
+        lambda e: any(r.location_id == 2 for r in e.reservations),
+    ),
+    "area through reservations": (
+        [(relationship_path(Event, Area, ("reservations", "areas")), AREA_ID)],
+        lambda e: any(a.id == 5 for r in e.reservations for a in r.areas),
+    ),
+    "type and location": (
+        [(relationship_path(Event, EventType), TYPE_NAME), (relationship_path(Event, Reservation), LOCATION_ID)],
+        lambda e: e.type.name == "Тип мероприятия 3" and any(r.location_id == 2 for r in e.reservations),
+    ),
+}
+
+
+@pytest.mark.parametrize("label", CASES)
+def test_where_related(engine, session, label):
+    conditions, accepts = CASES[label]
+    events = session.exec(
+        select(Event).options(
+            selectinload(Event.type), selectinload(Event.reservations).selectinload(Reservation.areas)
+        )
+    ).all()
+    expected = {e.id for e in events if accepts(e)}
+    assert expected
+
+    statement = where_related(select(Event), Event, conditions)
+    with captured(engine) as statements:
+        ids = session.exec(statement.with_only_columns(Event.id)).all()
+
+    assert len(statements) == 1
+    assert len(ids) == len(set(ids))
+    assert set(ids) == expected
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from app.db import make_engine
+from app.db.migrations import migrate
+from app.db.models import BaseModel, Reservation
+
+
+def _foreign_keys(url):
+    engine = make_engine(url)
+    with engine.connect() as connection:
+        enforced = connection.exec_driver_sql("PRAGMA foreign_keys").scalar()
+    engine.dispose()
+    return bool(enforced)
+
+
+def _database(tmp_path, orphan):
+    url = f"sqlite:///{tmp_path / 'db.sqlite3'}"
+    engine = make_engine(url)
+    BaseModel.metadata.create_all(engine)
+    if orphan:
+        with engine.begin() as connection:
+            connection.execute(insert(Reservation).values(
+                start_at=datetime(2024, 1, 1, 10), end_at=datetime(2024, 1, 1, 12), location_id=404
+            ))
+    return url, engine
+
+
+def test_foreign_keys_are_enforced_once_checked(tmp_path):
+    url, engine = _database(tmp_path, orphan=False)
+    assert not _foreign_keys(url)
+
+    migrate(engine)
+
+    assert _foreign_keys(url)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar()
+    engine.dispose()
+
+
+def test_violated_foreign_keys_stay_off(tmp_path):
+    url, engine = _database(tmp_path, orphan=True)
+
+    with pytest.warns(RuntimeWarning, match="Reservation"):
+        migrate(engine)
+
+    assert not _foreign_keys(url)
+    engine.dispose()
@@ -0,0 +1,66 @@
+import pytest
+from PyQt6.QtCore import Qt
+from sqlmodel import Session, select
+
+from app.db.models import Assignment, Club, Event, Reservation
+from app.ui.models.models import AssignmentTableModel, ClubTableModel, EventTableModel, ReservaionTableModel
+from tests.conftest import captured
+
+MODELS = {
+    EventTableModel: Event,
+    AssignmentTableModel: Assignment,
+    ReservaionTableModel: Reservation,
+    ClubTableModel: Club,
+}
+ORDERS = (Qt.SortOrder.AscendingOrder, Qt.SortOrder.DescendingOrder)
+
+CASES = [
+    (model, column, order)
+    for model in MODELS
+    for column in [-1, *range(len(model.GENERATORS))]
+    if column < 0 or list(model.GENERATORS)[column] in model.SORTING
+    for order in ORDERS
+]
+
+
+@pytest.fixture
+def engine(shared_engine):
+    return shared_engine
+
+
+def _load_all(table_model, settle):
+    settle()
+    while table_model.canFetchMore():
+        table_model.fetchMore()
+        settle()
+
+
+@pytest.mark.parametrize(
+    "model, column, order",
+    CASES,
+    ids=[f"{model.__name__}-{column}-{order.name}" for model, column, order in CASES],
+)
+def test_pages_follow_the_ordering(ui_engine, settle, monkeypatch, model, column, order):
+    # Pages end between rows with equal keys, e.g. the NULLs sorting as an empty string.
+    monkeypatch.setattr(model, "PAGE_SIZE", 97)
+    entity = MODELS[model]
+    table_model = model(select(entity).where(entity.id <= 1000), column=column, order=order)
+
+    _load_all(table_model, settle)
+
+    with Session(ui_engine) as session:
+        expected = [item.id for item in session.exec(table_model.query).all()]
+    assert [item.id for item in table_model._data] == expected
+    assert table_model.total == len(expected)
+    assert table_model.complete
+
+
+def test_a_page_takes_one_query(ui_engine, settle, monkeypatch):
+    monkeypatch.setattr(EventTableModel, "PAGE_SIZE", 97)
+    table_model = EventTableModel(select(Event).where(Event.id <= 1000), column=0)
+
+    with captured(ui_engine) as statements:
+        _load_all(table_model, settle)
+
+    pages = [statement for statement, _ in statements if 'FROM "Event"' in statement and "count(*)" not in statement]
+    assert len(pages) == len(table_model._data) // 97 + 1, pages
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, func, select
+
+from app.db.bulk import delete_by_ids, update_by_ids
+from app.db.models import Event, Scope
+from app.ui.models.models import EventTableModel
+
+PAGE_SIZE = 50
+STATEMENT = select(Event).where(Event.scope == Scope.ENTERTAINMENT)
+
+
+@pytest.fixture
+def table_model(ui_engine, settle, monkeypatch):
+    monkeypatch.setattr(EventTableModel, "PAGE_SIZE", PAGE_SIZE)
+    # Sorted by title, of which only the first page is loaded.
+    table_model = EventTableModel(STATEMENT, column=0)
+    settle()
+    assert len(table_model._data) == PAGE_SIZE and table_model.canFetchMore()
+    return table_model
+
+
+def _assert_fresh(table_model, engine):
+    with Session(engine) as session:
+        expected = session.exec(table_model.query.limit(len(table_model._data))).all()
+        total = session.exec(select(func.count()).select_from(STATEMENT.subquery())).one()
+        assert [item.id for item in table_model._data] == [item.id for item in expected]
+        assert table_model._rows == [table_model.render(item) for item in expected]
+    assert table_model.total == total
+
+
+def _event(title: str, scope: Scope = Scope.ENTERTAINMENT) -> Event:
+    return Event(title=title, start_at=datetime(2024, 1, 1), scope=scope)
+
+
+def test_patch_in_place(ui_engine, settle, table_model):
+    id = table_model._data[5].id
+    with Session(ui_engine) as session:
+        update_by_ids(session, Event, [id], description="обновлено")
+        session.commit()
+
+    table_model.patchRows([id])
+    settle()
+
+    assert table_model._data[5].id == id
+    assert table_model._data[5].description == "обновлено"
+    _assert_fresh(table_model, ui_engine)
+
+
+def test_patch_moves_inserts_and_removes(ui_engine, settle, table_model):
+    loaded = [item.id for item in table_model._data]
+    with Session(ui_engine) as session:
+        unloaded = session.exec(table_model.query.offset(PAGE_SIZE + 10).limit(1)).one().id
+        update_by_ids(session, Event, [loaded[10]], title="!!! первый")
+        update_by_ids(session, Event, [loaded[20]], scope=Scope.ENLIGHTENMENT)
+        delete_by_ids(session, Event, [loaded[30]])
+        update_by_ids(session, Event, [unloaded], title="!!! третий")
+        inserted, later = _event("!!! второй"), _event("яяя")
+        session.add_all([inserted, later])
+        session.commit()
+        ids = [loaded[10], loaded[20], loaded[30], unloaded, inserted.id, later.id]
+
+    table_model.patchRows(ids)
+    settle()
+
+    patched = [item.id for item in table_model._data]
+    assert patched[:3] == [inserted.id, loaded[10], unloaded]
+    assert loaded[20] not in patched and loaded[30] not in patched
+    # A row sorting after the loaded ones comes with its page.
+    assert later.id not in patched
+    _assert_fresh(table_model, ui_engine)
+
+    while table_model.canFetchMore():
+        table_model.fetchMore()
+        settle()
+    assert later.id in [item.id for item in table_model._data]
+    _assert_fresh(table_model, ui_engine)
+
+
+def test_patch_of_many_rows_reloads(ui_engine, settle, table_model):
+    with Session(ui_engine) as session:
+        ids = session.exec(STATEMENT.with_only_columns(Event.id).order_by(Event.id.desc()).limit(PAGE_SIZE + 1)).all()
+        for id in ids:
+            update_by_ids(session, Event, [id], title=f"!{id}")
+        session.commit()
+
+    table_model.patchRows(ids)
+    settle()
+
+    assert len(table_model._data) == PAGE_SIZE
+    assert all(item.title.startswith("!") for item in table_model._data)
+    _assert_fresh(table_model, ui_engine)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import inspect
+from sqlmodel import Session, select
+
+from app.db import make_engine
+from app.db.availability import busy_area_ids, free_locations
+from app.db.migrations import migrate
+from app.db.models import Assignment, BaseModel, Reservation
+from app.ui.models.models import ScheduleTableModel
+from benchmarks.fixtures import EPOCH
+from tests.conftest import captured
+
+START_AT = EPOCH + timedelta(days=400, hours=10)
+END_AT = START_AT + timedelta(hours=3)
+
+QUERIES = {
+    "free_locations": (
+        lambda session: free_locations(session, START_AT, END_AT),
+        ["ix_AreaReservationLink_reservation_id_area_id"],
+    ),
+    "busy_area_ids": (
+        lambda session: busy_area_ids(session, 1, START_AT, END_AT),
+        ["ix_AreaReservationLink_reservation_id_area_id"],
+    ),
+    "active assignments page": (
+        lambda session: session.exec(
+            select(Assignment)
+            .where(Assignment.state == Assignment.State.ACTIVE)
+            .order_by(Assignment.created_at, Assignment.id)
+            .limit(256)
+        ).all(),
+        ["ix_Assignment_state_created_at"],
+    ),
+    "assignments by deadline": (
+        lambda session: session.exec(
+            select(Assignment).where(Assignment.state == Assignment.State.ACTIVE, Assignment.deadline < END_AT)
+        ).all(),
+        ["ix_Assignment_state_deadline"],
+    ),
+    "event reservations": (
+        lambda session: session.exec(select(Reservation).where(Reservation.event_id.in_([1, 2, 3]))).all(),
+        ["ix_Reservation_event_id"],
+    ),
+    "schedule": (ScheduleTableModel.query, ["ix_DaySchedule_club_id_weekday"]),
+}
+
+
+def explain(engine, statements):
+    details = []
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            details.extend(row[-1] for row in rows)
+    return details
+
+
+def test_migration_creates_declared_indexes():
+    engine = make_engine("sqlite://")
+    BaseModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for table in BaseModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(connection)
+
+    migrate(engine)
+
+    inspector = inspect(engine)
+    created = {index["name"] for table in inspector.get_table_names() for index in inspector.get_indexes(table)}
+    declared = {index.name for table in BaseModel.metadata.sorted_tables for index in table.indexes}
+    assert declared <= created
+
+
+@pytest.mark.parametrize("label", QUERIES)
+def test_query_uses_index(engine, label):
+    query, indexes = QUERIES[label]
+    with Session(engine) as session, captured(engine) as statements:
+        query(session)
+
+    details = explain(engine, statements)
+    for index in indexes:
+        assert any(index in detail for detail in details), details
@@ -0,0 +1,47 @@
+import pytest
+from sqlmodel import func, select
+
+from app.db import search
+from app.db.models import Event
+
+
+@pytest.fixture
+def indexed(engine, monkeypatch):
+    monkeypatch.setattr(search, "ENGINE", engine)
+    return engine
+
+
+@pytest.mark.parametrize("text", ["концерт", "онце", "Выставка", "летний вечер", "несуществующее", "ки"])
+@pytest.mark.parametrize("field", ["title", "description"])
+def test_index_matches_substrings(indexed, session, field, text):
+    column = getattr(Event, field)
+    values = session.exec(select(Event.id, column)).all()
+    expected = {id for id, value in values if value and text.casefold() in value.casefold()}
+
+    found = session.exec(select(Event.id).where(search.contains(column, text))).all()
+
+    assert search.is_indexed(column, text) == (len(text) >= search.MIN_LENGTH)
+    if search.is_indexed(column, text):
+        assert set(found) == expected
+    else:
+        # LIKE folds ASCII letters only.
+        assert set(found) <= expected
+
+
+def test_index_follows_the_rows(indexed, session):
+    event = session.get(Event, 1)
+    event.title = "Уникальный заголовок"
+    session.commit()
+
+    assert session.exec(select(Event.id).where(search.contains(Event.title, "уникальн"))).all() == [1]
+    session.delete(event)
+    session.commit()
+    assert not session.exec(select(Event.id).where(search.contains(Event.title, "уникальн"))).all()
+
+
+def test_search(indexed, session):
+    hits = search.search(session, "концерт", limit=5)
+
+    assert len(hits) == 5
+    assert all("концерт" in hit.text.casefold() for hit in hits)
+    assert hits == sorted(hits, key=lambda hit: hit.rank)
@@ -0,0 +1,94 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from app.db.conflicts import conflicts
+from app.db.slots import find_slots, gaps, merge
+
+START_AT = datetime(2022, 3, 1, 8)
+END_AT = START_AT + timedelta(days=7)
+DAY_START, DAY_END = time(9), time(21)
+STEP = timedelta(minutes=15)
+
+
+def at(hour: float) -> datetime:
+    return datetime(2024, 1, 1) + timedelta(hours=hour)
+
+
+def test_merge():
+    intervals = [(at(5), at(6)), (at(1), at(3)), (at(2), at(4)), (at(6), at(7)), (at(2), at(3))]
+    assert merge(intervals) == [(at(1), at(4)), (at(5), at(7))]
+    assert merge([]) == []
+
+
+def test_gaps():
+    busy = [(at(0), at(2)), (at(3), at(4)), (at(6), at(9))]
+    assert gaps(busy, at(1), at(8)) == [(at(2), at(3)), (at(4), at(6))]
+    assert gaps(busy, at(9), at(10)) == [(at(9), at(10))]
+    assert gaps([], at(1), at(2)) == [(at(1), at(2))]
+
+
+@pytest.mark.parametrize("duration, areas", [(timedelta(hours=2), 0), (timedelta(hours=3), 1), (timedelta(hours=4), 5)])
+def test_slots_are_free(session, duration, areas):
+    slots = find_slots(session, START_AT, END_AT, duration, areas, DAY_START, DAY_END, STEP, limit=100)
+    assert slots
+
+    connection = session.connection()
+    for slot in slots:
+        assert START_AT <= slot.start_at and slot.end_at <= END_AT
+        assert slot.end_at - slot.start_at == duration
+        assert DAY_START <= slot.start_at.time() and slot.end_at.time() <= DAY_END
+        assert len(slot.free_area_ids) >= areas
+        for area_ids in [(area_id,) for area_id in slot.free_area_ids] or [()]:
+            assert not conflicts(connection, slot.location_id, slot.start_at, slot.end_at, area_ids), slot
+
+
+def test_slots_are_the_earliest(session):
+    duration = timedelta(hours=2)
+    slots = {slot.location_id: slot for slot in find_slots(session, START_AT, END_AT, duration, 0, DAY_START, DAY_END, STEP)}
+
+    connection = session.connection()
+    for location_id in range(1, 5):
+        start_at = START_AT
+        while start_at + duration <= END_AT:
+            free = (
+                DAY_START <= start_at.time()
+                and start_at.date() == (start_at + duration).date()
+                and (start_at + duration).time() <= DAY_END
+                and not conflicts(connection, location_id, start_at, start_at + duration)
+            )
+            if free:
+                break
+            start_at += STEP
+        else:
+            assert location_id not in slots
+            continue
+        assert slots[location_id].start_at == start_at
+
+
+# No reservation reaches this far, every location is free but for its hours.
+FREE_DAY = datetime(2030, 1, 1)
+
+
+@pytest.mark.parametrize(
+    "day_start, day_end, duration, start",
+    [
+        (time(20), time(2), timedelta(hours=5), FREE_DAY + timedelta(hours=20)),
+        (time(22), time(4), timedelta(hours=2), FREE_DAY + timedelta(minutes=30)),
+        (time(20), time(2), timedelta(hours=7), None),
+        (time(9), time(0), timedelta(hours=15), FREE_DAY + timedelta(hours=9)),
+        (time(0), time(0), timedelta(hours=30), FREE_DAY + timedelta(minutes=30)),
+        (None, None, timedelta(hours=30), FREE_DAY + timedelta(minutes=30)),
+    ],
+)
+def test_hours_past_midnight(session, day_start, day_end, duration, start):
+    start_at = FREE_DAY + timedelta(minutes=30)
+
+    slots = find_slots(session, start_at, start_at + timedelta(days=2), duration, 0, day_start, day_end, STEP)
+
+    assert [slot.start_at for slot in slots] == ([start] * 4 if start else [])
+
+
+def test_equal_hours_are_rejected(session):
+    with pytest.raises(ValueError):
+        find_slots(session, FREE_DAY, FREE_DAY + timedelta(days=1), timedelta(hours=1), 0, time(9), time(9))